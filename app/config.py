@@ -3,6 +3,7 @@ Configuration settings for Azure AI Multi-Environment Manager.
 
 Contains application configuration, constants, and environment settings.
 """
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -12,8 +13,38 @@ load_dotenv()
 # Directory configuration
 BASE_DIR = Path(__file__).resolve().parent.parent  # Go up to project root
 TERRAFORM_DIR = BASE_DIR / "terraform"
-DEPLOYMENT_STATES_DIR = BASE_DIR / "deployment_states"
+DEPLOYMENT_STATES_DIR = Path(os.getenv("DEPLOYMENT_STATES_DIR", str(BASE_DIR / "deployment_states")))
 DEPLOYMENTS_DB_FILE = DEPLOYMENT_STATES_DIR / "deployments.json"
+DEPLOYMENTS_SQLITE_FILE = DEPLOYMENT_STATES_DIR / "deployments.db"
+
+# Per-deployment log file (line-indexed) and number of recent lines kept in memory
+LOG_FILE_NAME = "deployment.log"
+LOG_MEMORY_LINES = int(os.getenv("LOG_MEMORY_LINES", "500"))
+
+# Approximate memory budget for full deployment records cached in memory (bytes)
+DEPLOYMENT_CACHE_MAX_BYTES = int(os.getenv("DEPLOYMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Seconds an id with no metadata.json is remembered as missing (0 = always re-check the disk)
+DEPLOYMENT_CACHE_MISS_TTL = float(os.getenv("DEPLOYMENT_CACHE_MISS_TTL", "5"))
+
+# Central deployments index backend: "sqlite" (default) or "json" (legacy single file)
+DEPLOYMENTS_DB_BACKEND = os.getenv("DEPLOYMENTS_DB_BACKEND", "sqlite").strip().lower()
+
+# JSON library for metadata.json, the index, API responses and log frames: "auto" (orjson if installed), "orjson" or "json"
+PERSISTENCE_SERIALIZER = os.getenv("PERSISTENCE_SERIALIZER", "auto").strip().lower()
+# Indent persisted JSON files for reading by hand (compact by default)
+PERSISTENCE_PRETTY_JSON = os.getenv("PERSISTENCE_PRETTY_JSON", "").lower() in {"1", "true", "yes"}
+
+# Shared terraform provider cache (filesystem mirror + plugin cache + lock file)
+TERRAFORM_CACHE_DIR = Path(os.getenv("TERRAFORM_CACHE_DIR", str(BASE_DIR / ".terraform-cache")))
+TERRAFORM_PROVIDER_MIRROR_DIR = TERRAFORM_CACHE_DIR / "mirror"
+TERRAFORM_PLUGIN_CACHE_DIR = TERRAFORM_CACHE_DIR / "plugin-cache"
+TERRAFORM_LOCK_FILE = TERRAFORM_CACHE_DIR / ".terraform.lock.hcl"
+# Content-addressed, initialized copies of the terraform module that workspaces symlink to
+TERRAFORM_MODULE_SNAPSHOT_DIR = TERRAFORM_CACHE_DIR / "modules"
+# Comma-separated provider platforms to mirror (empty = current platform only)
+TERRAFORM_PROVIDER_PLATFORMS = [p.strip() for p in os.getenv("TERRAFORM_PROVIDER_PLATFORMS", "").split(",") if p.strip()]
+# Populate the provider mirror in the background when the app starts
+TERRAFORM_PREWARM_ON_STARTUP = os.getenv("TERRAFORM_PREWARM_ON_STARTUP", "").lower() in {"1", "true", "yes"}
 
 # Application configuration
 APP_TITLE = "Azure AI Provisioner"
@@ -32,5 +63,71 @@ DEFAULT_MODEL_DEPLOYMENT_ENABLED = True
 MIN_RESOURCE_GROUP_LENGTH = 3
 MAX_RESOURCE_GROUP_LENGTH = 15
 
-# WebSocket update interval (seconds)
-WEBSOCKET_UPDATE_INTERVAL = 1
\ No newline at end of file
+# Maximum number of environments created by one batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+
+# Max log lines buffered per WebSocket client before slow-consumer drops kick in
+WEBSOCKET_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SUBSCRIBER_QUEUE_SIZE", "1000"))
+
+# Log lines are coalesced into one WebSocket frame until either limit is reached
+WEBSOCKET_BATCH_INTERVAL = float(os.getenv("WEBSOCKET_BATCH_INTERVAL", "0.1"))  # seconds
+WEBSOCKET_BATCH_MAX_LINES = int(os.getenv("WEBSOCKET_BATCH_MAX_LINES", "200"))
+
+# Run terraform apply/destroy with -json and build a structured progress model from its events
+TERRAFORM_JSON_EVENTS = os.getenv("TERRAFORM_JSON_EVENTS", "1").lower() in {"1", "true", "yes"}
+
+# Transient apply failures (409 Conflict) are retried with exponential backoff + jitter (seconds)
+TERRAFORM_RETRY_BASE_DELAY = float(os.getenv("TERRAFORM_RETRY_BASE_DELAY", "5"))
+TERRAFORM_RETRY_MAX_DELAY = float(os.getenv("TERRAFORM_RETRY_MAX_DELAY", "120"))
+
+# Split plan/apply: save a plan per workspace and apply it; pre-plan deployments while they wait in the queue
+TERRAFORM_SPLIT_PLAN = os.getenv("TERRAFORM_SPLIT_PLAN", "1").lower() in {"1", "true", "yes"}
+TERRAFORM_PREPLAN_QUEUED = os.getenv("TERRAFORM_PREPLAN_QUEUED", "1").lower() in {"1", "true", "yes"}
+TERRAFORM_MAX_PREPLANS = int(os.getenv("TERRAFORM_MAX_PREPLANS", "2"))
+
+# Warm pool: environments kept applied per "region:model[:search]" spec, claimed by deploy requests
+WARM_POOL_SIZE = int(os.getenv("WARM_POOL_SIZE", "0"))
+WARM_POOL_SPECS = [s.strip() for s in os.getenv("WARM_POOL_SPECS", "").split(",") if s.strip()]
+WARM_POOL_NAME_PREFIX = os.getenv("WARM_POOL_NAME_PREFIX", "warm")
+WARM_POOL_SERVICE_PRINCIPAL = os.getenv("WARM_POOL_SERVICE_PRINCIPAL", "sp-warm-pool")
+WARM_POOL_SECRET_DAYS = int(os.getenv("WARM_POOL_SECRET_DAYS", "30"))
+WARM_POOL_REFILL_INTERVAL = float(os.getenv("WARM_POOL_REFILL_INTERVAL", "300"))  # seconds
+
+# Auto-expiry: default lifetime of new deployments (0 = never expire) and the reaper that destroys expired ones
+DEFAULT_DEPLOYMENT_TTL_HOURS = float(os.getenv("DEFAULT_DEPLOYMENT_TTL_HOURS", "0"))
+REAPER_INTERVAL = float(os.getenv("REAPER_INTERVAL", "300"))  # seconds between scans (0 = reaper disabled)
+REAPER_MAX_CONCURRENT_DESTROYS = int(os.getenv("REAPER_MAX_CONCURRENT_DESTROYS", "4"))
+REAPER_FAST_DESTROY = os.getenv("REAPER_FAST_DESTROY", "").lower() in {"1", "true", "yes"}
+REAPER_STATE_FILE = DEPLOYMENT_STATES_DIR / "reaper.json"
+
+# Seconds the details (fast, created_at) of a finished bulk destroy are kept in memory; progress is read from the index
+BULK_DESTROY_RETENTION = float(os.getenv("BULK_DESTROY_RETENTION", "3600"))
+
+# Most timeline spans kept per deployment record (oldest are dropped first)
+TIMELINE_MAX_SPANS = int(os.getenv("TIMELINE_MAX_SPANS", "200"))
+
+# Deployment scheduler limits (0 = unlimited)
+MAX_CONCURRENT_DEPLOYMENTS = int(os.getenv("MAX_CONCURRENT_DEPLOYMENTS", "4"))
+MAX_DEPLOYMENTS_PER_SUBSCRIPTION = int(os.getenv("MAX_DEPLOYMENTS_PER_SUBSCRIPTION", "4"))
+MAX_DEPLOYMENTS_PER_REGION = int(os.getenv("MAX_DEPLOYMENTS_PER_REGION", "2"))
+
+# Azure CLI auth context cache (seconds); also invalidated when the az profile files change
+AZ_AUTH_CACHE_TTL = int(os.getenv("AZ_AUTH_CACHE_TTL", "600"))
+AZURE_CONFIG_DIR = Path(os.getenv("AZURE_CONFIG_DIR", str(Path.home() / ".azure")))
+
+# Key retrieval backend: "auto" = ARM REST via httpx with az fallback, "az" = always az CLI
+AZURE_KEYS_BACKEND = os.getenv("AZURE_KEYS_BACKEND", "auto").lower()
+# ARM / Entra endpoints (override to point at sovereign clouds or a local fake ARM server)
+AZURE_ARM_ENDPOINT = os.getenv("AZURE_ARM_ENDPOINT", "https://management.azure.com")
+AZURE_AUTHORITY_HOST = os.getenv("AZURE_AUTHORITY_HOST", "https://login.microsoftonline.com")
+AZURE_STORAGE_ENDPOINT_SUFFIX = os.getenv("AZURE_STORAGE_ENDPOINT_SUFFIX", "core.windows.net")
+ARM_HTTP_TIMEOUT = float(os.getenv("ARM_HTTP_TIMEOUT", "30"))
+
+# Thread pool for blocking subprocess / file I/O kept off the event loop
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "8"))
+# Event loop debug mode: report callbacks blocking the loop longer than the threshold
+LOOP_DEBUG = os.getenv("LOOP_DEBUG", "").lower() in {"1", "true", "yes"}
+LOOP_SLOW_CALLBACK_MS = int(os.getenv("LOOP_SLOW_CALLBACK_MS", "100"))
+
+# /metrics: seconds between event loop lag samples (0 = lag sampling disabled)
+METRICS_LOOP_LAG_INTERVAL = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "1"))
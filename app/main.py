@@ -1,11 +1,10 @@
 import asyncio
-import os
 import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -13,40 +12,91 @@ from fastapi.templating import Jinja2Templates
 from .config import (
     APP_TITLE, STATIC_DIR, TEMPLATES_DIR,
     TERRAFORM_DIR, DEPLOYMENT_STATES_DIR,
-    DEFAULT_MODEL_VERSION, DEFAULT_DEPLOYMENT_SKU, DEFAULT_MODEL_DEPLOYMENT_ENABLED,
-    WEBSOCKET_UPDATE_INTERVAL
+    TERRAFORM_PREWARM_ON_STARTUP, MAX_BATCH_SIZE, REAPER_INTERVAL, METRICS_LOOP_LAG_INTERVAL
 )
 
 # Import utilities
 from .utils.naming import build_names
 from .utils.env_generator import generate_env_content, generate_env_filename
+from .models.deployment import DeploymentStatus
 
 # Import services  
 from .services.persistence_service import (
-    load_all_deployments, get_all_deployments, save_deployment_state
+    load_deployment_record, get_all_deployments, count_deployments, save_deployment_state_async,
+    get_deployment_logs, reset_deployment_logs, query_deployments
 )
-from .services.deployment_service import run_full_deployment, run_full_destroy
-from .services.validation_service import validate_deployment_form, render_form_error
+from .services.deployment_cache import DeploymentCache
+from .services.log_stream_service import stream_deployment_logs
+from .services.deployment_service import (
+    cancel_queued_deployment, enqueue_deployment, enqueue_destroy, resume_queued_deployments,
+    new_deployment_record, refresh_deployment_outputs
+)
+from .services.batch_service import start_batch_deployment, get_batch_progress
+from .services.bulk_destroy_service import (
+    select_destroy_targets, start_bulk_destroy, get_bulk_destroy_progress
+)
+from .services.reaper_service import run_reaper
+from .services.warm_pool_service import (
+    claim_warm_environment, get_warm_pool_status, run_warm_pool, warm_pool_enabled
+)
+from .services.scheduler_service import deployment_scheduler
+from .services.validation_service import (
+    validate_deployment_form, validate_batch_form, validate_bulk_destroy_filters, render_form_error
+)
+from .services.terraform_service import prewarm_provider_cache, provider_mirror_ready
+from .services.executor_service import enable_loop_debug, shutdown_executor
+from .services.arm_client import arm_client
+from .services.terraform_progress import get_progress
+from .services.metrics_service import render_metrics, run_loop_lag_monitor
+from .services.timeline_service import aggregate_phase_timings, waterfall_rows
+from .services.serialization import JSONResponse
 
-# Global deployments store (in-memory cache of persistent state)
-DEPLOYMENTS: Dict[str, Dict] = {}
+# Global deployments store (LRU cache of persistent state, hydrated on demand)
+DEPLOYMENTS = DeploymentCache(load_deployment_record)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Handle application startup and shutdown events"""
-    # Startup: Load persisted deployments
-    global DEPLOYMENTS
-    persisted_deployments = load_all_deployments()
-    DEPLOYMENTS.update(persisted_deployments)
-    print(f"Loaded {len(persisted_deployments)} persisted deployments")
+    enable_loop_debug()
+    # Startup: only the index is read; full records are loaded when first requested
+    indexed = count_deployments()
+    print(f"Indexed {indexed} persisted deployments (records load on demand)")
+    resumed = await resume_queued_deployments(DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR)
+    if resumed:
+        print(f"Re-queued {resumed} deployments waiting for a scheduler slot")
+    if TERRAFORM_PREWARM_ON_STARTUP and not provider_mirror_ready():
+        asyncio.create_task(_prewarm_providers())
+    warm_pool_task = None
+    if warm_pool_enabled():
+        warm_pool_task = asyncio.create_task(run_warm_pool(DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR))
+    reaper_task = None
+    if REAPER_INTERVAL > 0:
+        reaper_task = asyncio.create_task(run_reaper(DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR))
+    loop_lag_task = None
+    if METRICS_LOOP_LAG_INTERVAL > 0:
+        loop_lag_task = asyncio.create_task(run_loop_lag_monitor())
     
     yield  # Application runs here
     
-    # Shutdown: Could add cleanup logic here if needed
+    # Shutdown: stop background loops, the blocking-work pool and pooled ARM connections
+    for task in (warm_pool_task, reaper_task, loop_lag_task):
+        if task:
+            task.cancel()
+    shutdown_executor()
+    await arm_client.aclose()
     print("Application shutting down")
 
 
+async def _prewarm_providers() -> None:
+    """Populate the shared terraform provider mirror without delaying startup"""
+    try:
+        await prewarm_provider_cache()
+        print("Terraform provider mirror prewarmed")
+    except Exception as e:
+        print(f"Terraform provider prewarm failed: {e}")
+
+
 # FastAPI application setup with lifespan
 app = FastAPI(title=APP_TITLE, lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -65,12 +115,14 @@ async def deployments_dashboard(request: Request):
         deployments = get_all_deployments()
         return templates.TemplateResponse("deployments.html", {
             "request": request, 
-            "deployments": deployments
+            "deployments": deployments,
+            "max_batch_size": MAX_BATCH_SIZE
         })
     except Exception as e:
         return templates.TemplateResponse("deployments.html", {
             "request": request, 
             "deployments": {},
+            "max_batch_size": MAX_BATCH_SIZE,
             "error": f"Error loading deployments: {e}"
         })
 
@@ -85,90 +137,244 @@ async def start_deploy(
     subscription_id: Optional[str] = Form(None),
     service_principal_name: str = Form(...),
     secret_expiration_date: str = Form(...),
+    expires_at: Optional[str] = Form(None),
 ):
     # Validate form inputs
     is_valid, error_message, validated_params = validate_deployment_form(
         resource_group_base, location, openai_model_name, 
         service_principal_name, secret_expiration_date,
-        include_search, subscription_id
+        include_search, subscription_id, expires_at
     )
     
     if not is_valid:
         return render_form_error(templates, request, error_message)
     
+    # A ready environment from the warm pool takes seconds instead of a full apply
+    claimed_id = await claim_warm_environment(validated_params, DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR)
+    if claimed_id:
+        return RedirectResponse(url=f"/deployment/{claimed_id}", status_code=302)
+    
     # Generate resource names and deployment ID
     names = build_names(validated_params["resource_group_base_clean"])
     deployment_id = str(uuid.uuid4())
     
     # Create deployment record with configuration defaults
-    DEPLOYMENTS[deployment_id] = {
-        "status": "starting",
-        "logs": [],
-        "outputs": {},
-        "names": names,
-        "params": {
-            "resource_group_base": validated_params["resource_group_base_clean"],
-            "location": validated_params["location"],
-            "include_search": validated_params["include_search"],
-            "enable_model_deployment": DEFAULT_MODEL_DEPLOYMENT_ENABLED,
-            "openai_model_name": validated_params["openai_model_name"],
-            "openai_model_version": DEFAULT_MODEL_VERSION,
-            "openai_deployment_sku": DEFAULT_DEPLOYMENT_SKU,
-            "model_deployment_name": validated_params["openai_model_name"],  # Use model name as deployment name
-            "subscription_id": validated_params["subscription_id"] or os.getenv("AZ_SUBSCRIPTION_ID", "").strip(),
-            "service_principal_name": validated_params["service_principal_name"],
-            "secret_expiration_date": validated_params["secret_expiration_date"],
-        },
-    }
-    asyncio.create_task(run_full_deployment(deployment_id, DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR))
+    DEPLOYMENTS[deployment_id] = new_deployment_record(validated_params, names)
+    await enqueue_deployment(deployment_id, DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR)
     return RedirectResponse(url=f"/deployment/{deployment_id}", status_code=302)
 
 
+@app.post("/deploy/batch")
+async def start_batch_deploy(
+    resource_group_base: str = Form(...),
+    count: str = Form(...),
+    location: str = Form(...),
+    include_search: Optional[str] = Form(None),
+    openai_model_name: str = Form("gpt-4.1"),
+    subscription_id: Optional[str] = Form(None),
+    service_principal_name: str = Form(...),
+    secret_expiration_date: str = Form(...),
+    expires_at: Optional[str] = Form(None),
+):
+    """Create N identical environments queued through the deployment scheduler"""
+    is_valid, error_message, validated_params = validate_batch_form(
+        resource_group_base, count, location, openai_model_name,
+        service_principal_name, secret_expiration_date,
+        include_search, subscription_id, expires_at
+    )
+    if not is_valid:
+        return JSONResponse({"error": error_message}, status_code=400)
+    
+    batch_id, deployment_ids = await start_batch_deployment(
+        validated_params, validated_params["count"], DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR
+    )
+    return JSONResponse({
+        "batch_id": batch_id,
+        "deployment_ids": deployment_ids,
+        "progress_url": f"/deploy/batch/{batch_id}",
+    })
+
+
+@app.get("/deploy/batch/{batch_id}")
+async def batch_deploy_progress(batch_id: str):
+    """Aggregate progress of a batch deployment"""
+    progress = get_batch_progress(batch_id)
+    if progress is None:
+        return JSONResponse({"error": "Batch not found"}, status_code=404)
+    return JSONResponse(progress)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (text exposition format)"""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/timeline/summary")
+async def timeline_summary(group_by: str = "region,model", status: Optional[str] = None):
+    """Phase timing percentiles and dominant phase per group of deployments"""
+    fields = [field.strip() for field in group_by.split(",") if field.strip()]
+    return JSONResponse(aggregate_phase_timings(query_deployments(status=status), fields))
+
+
+@app.get("/timeline/{deployment_id}")
+async def deployment_timeline(deployment_id: str):
+    """Recorded phase and terraform command spans of one deployment"""
+    data = await DEPLOYMENTS.aget(deployment_id)
+    if not data:
+        return JSONResponse({"error": "Deployment not found"}, status_code=404)
+    spans = data.get("timeline", [])
+    return JSONResponse({"deployment_id": deployment_id, "spans": spans, "waterfall": waterfall_rows(spans)})
+
+
+@app.get("/warm-pool")
+async def warm_pool_status():
+    """Ready and filling environments per warm pool spec"""
+    return JSONResponse(get_warm_pool_status())
+
+
+@app.post("/destroy/bulk")
+async def start_bulk_destroy_route(request: Request):
+    """Destroy many deployments: {"deployment_ids": [...]} or a status/region/created_before filter"""
+    try:
+        body = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "Request body must be JSON"}, status_code=400)
+    if not isinstance(body, dict):
+        return JSONResponse({"error": "Request body must be a JSON object"}, status_code=400)
+    deployment_ids = body.get("deployment_ids")
+    filters = {key: body.get(key) or None for key in ("status", "region", "created_before")}
+    if deployment_ids is None and not any(filters.values()):
+        return JSONResponse({"error": "Provide deployment_ids or at least one filter"}, status_code=400)
+    if deployment_ids is not None and not (
+        isinstance(deployment_ids, list) and all(isinstance(d, str) for d in deployment_ids)
+    ):
+        return JSONResponse({"error": "deployment_ids must be a list of strings"}, status_code=400)
+    if any(value is not None and not isinstance(value, str) for value in filters.values()):
+        return JSONResponse({"error": "status, region and created_before must be strings"}, status_code=400)
+    is_valid, error_message, filters = validate_bulk_destroy_filters(**filters)
+    if not is_valid:
+        return JSONResponse({"error": error_message}, status_code=400)
+    
+    selected, skipped = select_destroy_targets(deployment_ids, **filters)
+    if not selected:
+        return JSONResponse({"error": "No destroyable deployments matched", "skipped": skipped}, status_code=400)
+    bulk_id = await start_bulk_destroy(
+        selected, DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR, fast=bool(body.get("fast"))
+    )
+    return JSONResponse({
+        "bulk_id": bulk_id,
+        "deployment_ids": selected,
+        "skipped": skipped,
+        "progress_url": f"/destroy/bulk/{bulk_id}",
+    })
+
+
+@app.get("/destroy/bulk/{bulk_id}")
+async def bulk_destroy_progress(bulk_id: str):
+    """Aggregate progress of a bulk destroy"""
+    progress = get_bulk_destroy_progress(bulk_id)
+    if progress is None:
+        return JSONResponse({"error": "Bulk destroy not found"}, status_code=404)
+    return JSONResponse(progress)
+
+
 @app.post("/destroy/{deployment_id}")
 async def start_destroy(deployment_id: str, request: Request):
     """Start the destroy process for a deployment"""
-    data = DEPLOYMENTS.get(deployment_id)
+    data = await DEPLOYMENTS.aget(deployment_id)
     if not data:
         return JSONResponse({"error": "Deployment not found"}, status_code=404)
     
+    # Nothing exists yet for a deployment still waiting in the queue; just take it off
+    if await cancel_queued_deployment(deployment_id, DEPLOYMENTS, DEPLOYMENT_STATES_DIR):
+        return JSONResponse({"success": True, "redirect": f"/deployment/{deployment_id}"})
+    
     # Check if deployment has terraform state
     deployment_dir = DEPLOYMENT_STATES_DIR / deployment_id
     state_file = deployment_dir / "terraform.tfstate"
     if not state_file.exists():
         return JSONResponse({"error": "No terraform state found for this deployment"}, status_code=400)
     
+    if (deployment_scheduler.is_running(deployment_id) or deployment_scheduler.position(deployment_id)
+            or data.get("status") == DeploymentStatus.CLAIMING):
+        return JSONResponse({"error": "Another operation is already running or queued for this deployment"}, status_code=409)
+    
     # Update status to destroying
-    DEPLOYMENTS[deployment_id]["status"] = "destroying"
-    DEPLOYMENTS[deployment_id]["logs"] = []  # Clear old logs
-    save_deployment_state(deployment_id, DEPLOYMENTS[deployment_id])
+    DEPLOYMENTS[deployment_id]["status"] = DeploymentStatus.DESTROYING
+    reset_deployment_logs(deployment_id)  # Start a fresh log (previous one archived)
+    await save_deployment_state_async(deployment_id, DEPLOYMENTS[deployment_id])
     
-    # Start destroy task
-    asyncio.create_task(run_full_destroy(deployment_id, DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR))
+    # Queue destroy task on the shared scheduler
+    enqueue_destroy(deployment_id, DEPLOYMENTS, DEPLOYMENT_STATES_DIR, TERRAFORM_DIR)
     return JSONResponse({"success": True, "redirect": f"/deployment/{deployment_id}"})
 
 
+@app.post("/refresh-outputs/{deployment_id}")
+async def refresh_outputs(deployment_id: str):
+    """Re-read terraform outputs from the deployment's state file"""
+    data = await DEPLOYMENTS.aget(deployment_id)
+    if not data:
+        return JSONResponse({"error": "Deployment not found"}, status_code=404)
+    if deployment_scheduler.is_running(deployment_id):
+        return JSONResponse({"error": "Deployment is still running"}, status_code=409)
+    
+    outputs = await refresh_deployment_outputs(deployment_id, DEPLOYMENTS, DEPLOYMENT_STATES_DIR)
+    if not outputs:
+        return JSONResponse({"error": "No terraform outputs found in state"}, status_code=400)
+    return JSONResponse({"success": True, "outputs": len(outputs)})
+
+
 @app.get("/deployment/{deployment_id}", response_class=HTMLResponse)
 async def deployment_status(deployment_id: str, request: Request):
-    data = DEPLOYMENTS.get(deployment_id)
+    data = await DEPLOYMENTS.aget(deployment_id)
     if not data:
         return HTMLResponse("Deployment not found", status_code=404)
-    return templates.TemplateResponse("deployment.html", {"request": request, "deployment_id": deployment_id, "data": data})
+    return templates.TemplateResponse("deployment.html", {
+        "request": request,
+        "deployment_id": deployment_id,
+        "data": data,
+        "queue_position": deployment_scheduler.position(deployment_id),
+    })
+
+
+@app.get("/status/{deployment_id}")
+async def deployment_status_json(deployment_id: str):
+    """Current status of a deployment, including queue position and terraform progress"""
+    data = await DEPLOYMENTS.aget(deployment_id)
+    if not data:
+        return JSONResponse({"error": "Deployment not found"}, status_code=404)
+    progress = get_progress(deployment_id)
+    return JSONResponse({
+        "deployment_id": deployment_id,
+        "status": data.get("status"),
+        "expires_at": data.get("expires_at"),
+        "queue_position": deployment_scheduler.position(deployment_id),
+        "queued_total": deployment_scheduler.queued_count,
+        "running_total": deployment_scheduler.running_count,
+        "progress": progress.to_dict() if progress else None,
+    })
 
 
 @app.get("/results/{deployment_id}", response_class=HTMLResponse)
 async def deployment_results(deployment_id: str, request: Request):
-    data = DEPLOYMENTS.get(deployment_id)
+    data = await DEPLOYMENTS.aget(deployment_id)
     if not data:
         return HTMLResponse("Deployment not found", status_code=404)
-    if data.get("status") != "completed":
+    if data.get("status") != DeploymentStatus.COMPLETED:
         return RedirectResponse(url=f"/deployment/{deployment_id}")
-    return templates.TemplateResponse("results.html", {"request": request, "deployment_id": deployment_id, "data": data})
+    return templates.TemplateResponse("results.html", {
+        "request": request,
+        "deployment_id": deployment_id,
+        "data": data,
+        "timeline": waterfall_rows(data.get("timeline", [])),
+    })
 
 
 @app.get("/download-env/{deployment_id}")
 async def download_env_file(deployment_id: str):
     """Generate and download a .env file with all deployment outputs"""
-    data = DEPLOYMENTS.get(deployment_id)
+    data = await DEPLOYMENTS.aget(deployment_id)
     if not data:
         return JSONResponse({"error": "Deployment not found"}, status_code=404)
     
@@ -196,25 +402,30 @@ async def download_env_file(deployment_id: str):
 
 
 @app.websocket("/ws/{deployment_id}")
-async def ws_logs(websocket: WebSocket, deployment_id: str):
-    """WebSocket endpoint for streaming deployment logs in real-time"""
+async def ws_logs(websocket: WebSocket, deployment_id: str, since: int = 0):
+    """WebSocket endpoint for streaming deployment logs in real-time.
+
+    Sends batched JSON frames; ``since`` resumes from a previously received cursor.
+    """
     await websocket.accept()
-    if deployment_id not in DEPLOYMENTS:
-        await websocket.send_text("Invalid deployment id")
+    if await DEPLOYMENTS.aget(deployment_id) is None:
+        await websocket.send_json({"type": "error", "message": "Invalid deployment id"})
         await websocket.close()
         return
         
-    last_index = 0
+    # Lines are pushed by the log hub; this loop only watches for disconnects
+    pump = asyncio.create_task(
+        stream_deployment_logs(websocket, deployment_id, get_deployment_logs, since=since)
+    )
     try:
         while True:
-            logs = DEPLOYMENTS[deployment_id]["logs"]
-            if last_index < len(logs):
-                for entry in logs[last_index:]:
-                    await websocket.send_text(entry)
-                last_index = len(logs)
-            await asyncio.sleep(WEBSOCKET_UPDATE_INTERVAL)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
     except WebSocketDisconnect:
-        return
+        pass
+    finally:
+        pump.cancel()
 
 
 if __name__ == "__main__":
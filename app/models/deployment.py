@@ -4,26 +4,145 @@ Data models and types for Azure AI Multi-Environment Manager.
 This module defines the core data structures, enums, and constants used
 throughout the application for type safety and documentation.
 """
-from dataclasses import dataclass
+import copy
+import operator
+from dataclasses import dataclass, fields
 from enum import Enum
-from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Any, Callable, ClassVar, Dict, Iterator, List, Optional, Tuple
 
 
-class DeploymentStatus(Enum):
-    """Possible states of a deployment."""
+class DeploymentStatus(str, Enum):
+    """Possible states of a deployment.
+
+    Members are strings, so they compare equal to (and hash like) the plain
+    status values stored in metadata.json, the index and the templates.
+    """
+    STARTING = "starting"
+    QUEUED = "queued"
     TERRAFORM = "terraform"
     FOUNDRY = "foundry"
     COMPLETED = "completed"
+    WARM = "warm"
+    CLAIMING = "claiming"
     DESTROYING = "destroying"
     DESTROYED = "destroyed"
     ERROR = "error"
     DESTROY_ERROR = "destroy_error"
 
+    def __str__(self) -> str:
+        return self.value
+
+
+class RecordFields:
+    """Dict-style access to the fields of a slotted dataclass.
+
+    Services and templates address records as ``record["status"]`` and
+    ``record.get("outputs")``. A field holding None counts as absent (like a
+    missing key); unknown keys raise KeyError instead of adding attributes.
+    """
+    __slots__ = ()
+
+    # Field name -> converter applied when a field is assigned or loaded
+    _converters: ClassVar[Dict[str, Callable[[Any], Any]]] = {}
+    # Filled on first use per class (fields() only works once @dataclass has run)
+    _field_names: ClassVar[Tuple[str, ...]] = ()
+    _field_values: ClassVar[Callable[[Any], Tuple[Any, ...]]]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_names = ()
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        if not cls._field_names:
+            names = tuple(f.name for f in fields(cls))
+            getter = operator.attrgetter(*names)
+            # staticmethod: a plain function stored on the class would bind to the instance
+            cls._field_values = staticmethod(getter if len(names) > 1 else lambda record: (getter(record),))
+            cls._field_names = names
+        return cls._field_names
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build from a plain dict (e.g. metadata.json); unknown keys are dropped."""
+        kwargs = {name: data[name] for name in cls.field_names() if name in data}
+        for name, converter in cls._converters.items():
+            if kwargs.get(name) is not None:
+                kwargs[name] = converter(kwargs[name])
+        return cls(**kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the fields that are set (nested records converted, containers shared)."""
+        return {
+            name: value.to_dict() if isinstance(value, RecordFields) else value
+            for name, value in zip(self.field_names(), self._field_values(self))
+            if value is not None
+        }
+
+    def to_shallow_dict(self, exclude: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """Like to_dict, but nested records stay dataclasses for orjson to encode natively.
+
+        Nested records keep their unset fields, which are written as null.
+        """
+        return {
+            name: value
+            for name, value in zip(self.field_names(), self._field_values(self))
+            if value is not None and name not in exclude
+        }
+
+    def __deepcopy__(self, memo: Dict[int, Any]):
+        # Much cheaper than the generic __reduce_ex__ path for slotted classes
+        self.field_names()
+        return type(self)(*(copy.deepcopy(value, memo) for value in self._field_values(self)))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.field_names():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.field_names():
+            raise KeyError(key)
+        converter = self._converters.get(key)
+        setattr(self, key, converter(value) if converter and value is not None else value)
 
-@dataclass
-class ResourceNames:
+    def __contains__(self, key: object) -> bool:
+        return key in self.field_names() and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self.field_names() else None
+        return default if value is None else value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            self[key] = default
+            value = getattr(self, key)
+        return value
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            self[key] = value
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in self.field_names() if getattr(self, name) is not None)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name)) for name in self.keys())
+
+
+def _as_record(cls):
+    return lambda value: value if isinstance(value, cls) else cls.from_dict(value)
+
+
+def _as_enum(cls):
+    # Value map lookup skips Enum.__call__; cls(value) still raises ValueError for unknown values
+    members = cls._value2member_map_
+    return lambda value: value if type(value) is cls else members.get(value) or cls(value)
+
+
+@dataclass(slots=True)
+class ResourceNames(RecordFields):
     """Generated Azure resource names for a deployment."""
     storage_account_name: str
     search_service_name: str
@@ -35,8 +154,8 @@ class ResourceNames:
     suffix: str
 
 
-@dataclass
-class DeploymentParams:
+@dataclass(slots=True)
+class DeploymentParams(RecordFields):
     """Parameters for creating a new deployment."""
     resource_group_base: str
     location: str
@@ -49,32 +168,33 @@ class DeploymentParams:
     service_principal_name: str
     secret_expiration_date: str
     subscription_id: Optional[str] = None
+    tags: Optional[Dict[str, str]] = None
+
 
+@dataclass(slots=True)
+class DeploymentState(RecordFields):
+    """Runtime record of a deployment (the ``DEPLOYMENTS`` values and metadata.json ``deployment_data``).
 
-@dataclass
-class DeploymentState:
-    """Complete state of a deployment."""
-    id: str
-    name: str
+    Logs live in the per-deployment log file and index-only fields (created_at,
+    has_state, ...) in the central index, so neither is kept here.
+    """
     status: DeploymentStatus
-    created_at: datetime
-    completed_at: Optional[datetime] = None
-    has_state: bool = False
-    outputs_available: bool = False
-    region: str = ""
-    include_search: bool = False
-    params: Optional[DeploymentParams] = None
-    names: Optional[ResourceNames] = None
-    outputs: Dict = None
-    logs: List[str] = None
-    error: Optional[str] = None
-
-    def __post_init__(self):
-        """Initialize mutable defaults."""
-        if self.outputs is None:
-            self.outputs = {}
-        if self.logs is None:
-            self.logs = []
+    params: DeploymentParams
+    names: ResourceNames
+    outputs: Dict[str, Any]
+    batch_id: Optional[str] = None
+    bulk_id: Optional[str] = None
+    module_version: Optional[str] = None
+    warm_pool: Optional[str] = None
+    expires_at: Optional[str] = None
+    claimed_at: Optional[str] = None
+    timeline: Optional[List[Dict[str, Any]]] = None
+
+    _converters: ClassVar[Dict[str, Callable[[Any], Any]]] = {
+        "status": _as_enum(DeploymentStatus),
+        "params": _as_record(DeploymentParams),
+        "names": _as_record(ResourceNames),
+    }
 
 
 # Application constants
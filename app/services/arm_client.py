@@ -0,0 +1,211 @@
+"""
+Azure Resource Manager REST client for Azure AI Multi-Environment Manager.
+
+Key retrieval (listKeys / listQueryKeys) is a single ARM POST, so instead of
+starting the Python-based az CLI per call we fetch an ARM token once and reuse
+a pooled keep-alive async HTTP connection (httpx, pinned in requirements.txt).
+With AZURE_KEYS_BACKEND=az, when a REST call fails, or on an install without
+httpx, azure_service uses the az subprocess path instead.
+benchmarks/fake_arm_server.py serves these endpoints locally for testing.
+
+Token sources, in order:
+    1. AZURE_ARM_TOKEN (static bearer token, handy against a fake ARM server)
+    2. AZURE_CLIENT_ID / AZURE_CLIENT_SECRET / AZURE_TENANT_ID (client credentials)
+    3. ``az account get-access-token`` (one CLI call, reuses the CLI token cache)
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is in requirements.txt
+    httpx = None
+
+from ..config import (
+    AZURE_ARM_ENDPOINT, AZURE_AUTHORITY_HOST, AZURE_KEYS_BACKEND, ARM_HTTP_TIMEOUT
+)
+
+COGNITIVE_API_VERSION = "2023-05-01"
+STORAGE_API_VERSION = "2023-01-01"
+SEARCH_API_VERSION = "2023-11-01"
+RESOURCES_API_VERSION = "2021-04-01"
+
+# Refresh tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
+
+class ArmError(RuntimeError):
+    """Raised when an ARM request or token acquisition fails."""
+
+
+def arm_backend_enabled() -> bool:
+    """Return True if key retrieval should try the REST client first."""
+    return httpx is not None and AZURE_KEYS_BACKEND != "az"
+
+
+class ArmClient:
+    """Async ARM client with a cached bearer token and a pooled HTTP connection."""
+
+    def __init__(self, endpoint: str = AZURE_ARM_ENDPOINT, timeout: float = ARM_HTTP_TIMEOUT):
+        self.endpoint = endpoint.rstrip("/")
+        self.timeout = timeout
+        self._client = None
+        self._client_loop = None
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    def _http(self) -> "httpx.AsyncClient":
+        # The connection pool is bound to the event loop it was created on
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.endpoint,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+            self._client_loop = loop
+            self._token_lock = asyncio.Lock()
+        return self._client
+
+    async def _get_token(self) -> str:
+        http = self._http()
+        if self._token and time.time() < self._token_expires - TOKEN_REFRESH_MARGIN:
+            return self._token
+        async with self._token_lock:
+            # Another caller may have refreshed it while we waited (single-flight)
+            if self._token and time.time() < self._token_expires - TOKEN_REFRESH_MARGIN:
+                return self._token
+            self._token, self._token_expires = await self._acquire_token(http)
+            return self._token
+
+    async def _acquire_token(self, http: "httpx.AsyncClient") -> Tuple[str, float]:
+        static_token = os.getenv("AZURE_ARM_TOKEN")
+        if static_token:
+            return static_token, time.time() + 3600
+        client_id = os.getenv("AZURE_CLIENT_ID")
+        client_secret = os.getenv("AZURE_CLIENT_SECRET")
+        tenant_id = os.getenv("AZURE_TENANT_ID")
+        if client_id and client_secret and tenant_id:
+            response = await http.post(
+                f"{AZURE_AUTHORITY_HOST.rstrip('/')}/{tenant_id}/oauth2/v2.0/token",
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": client_id,
+                    "client_secret": client_secret,
+                    "scope": f"{self.endpoint}/.default",
+                },
+            )
+            if response.status_code != 200:
+                raise ArmError(f"Token request failed ({response.status_code})")
+            body = response.json()
+            return body["access_token"], time.time() + float(body.get("expires_in", 3600))
+        return await self._cli_token()
+
+    async def _cli_token(self) -> Tuple[str, float]:
+        # Imported lazily: azure_service imports this module
+        from .azure_service import run_az_json
+        try:
+            body = await run_az_json([
+                "az", "account", "get-access-token", "--resource", self.endpoint, "-o", "json"
+            ])
+        except Exception as e:
+            raise ArmError(f"Could not get ARM token from az CLI: {e}") from e
+        expires = body.get("expires_on")
+        return body["accessToken"], float(expires) if expires else time.time() + 3000
+
+    async def _request(self, method: str, url: str, params: Optional[Dict[str, str]] = None) -> "httpx.Response":
+        http = self._http()
+        for attempt in range(2):
+            token = await self._get_token()
+            response = await http.request(
+                method, url, params=params, headers={"Authorization": f"Bearer {token}"}
+            )
+            if response.status_code == 401 and attempt == 0:
+                self._token = None  # Expired or revoked; fetch a fresh one once
+                continue
+            return response
+        raise ArmError(f"{method} {url} unauthorized")
+
+    async def post(self, path: str, api_version: str) -> Any:
+        """POST an ARM action (e.g. listKeys) and return the JSON body.
+
+        Args:
+            path: Resource path starting with /subscriptions/...
+            api_version: ARM api-version query parameter
+
+        Returns:
+            Parsed JSON response
+        """
+        response = await self._request("POST", path, {"api-version": api_version})
+        if response.status_code >= 400:
+            raise ArmError(f"POST {path} failed ({response.status_code}): {response.text[:200]}")
+        return response.json()
+
+    async def delete(self, path: str, api_version: str, poll_interval: float = 10, timeout: float = 3600) -> bool:
+        """DELETE an ARM resource and wait for the long-running operation to finish.
+
+        Args:
+            path: Resource path starting with /subscriptions/...
+            api_version: ARM api-version query parameter
+            poll_interval: Seconds between status polls (unless ARM sends Retry-After)
+            timeout: Give up after this many seconds
+
+        Returns:
+            True if the resource was deleted, False if it did not exist
+        """
+        response = await self._request("DELETE", path, {"api-version": api_version})
+        if response.status_code == 404:
+            return False
+        deadline = time.monotonic() + timeout
+        while response.status_code == 202:
+            location = response.headers.get("Location")
+            if not location:
+                break
+            if time.monotonic() > deadline:
+                raise ArmError(f"DELETE {path} still running after {timeout:.0f}s")
+            await asyncio.sleep(float(response.headers.get("Retry-After") or poll_interval))
+            response = await self._request("GET", location)
+        if response.status_code >= 400:
+            raise ArmError(f"DELETE {path} failed ({response.status_code}): {response.text[:200]}")
+        return True
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def resource_path(subscription_id: str, resource_group: str, provider: str, name: str) -> str:
+    """Build an ARM resource path."""
+    return f"/subscriptions/{subscription_id}/resourceGroups/{resource_group}/providers/{provider}/{name}"
+
+
+async def list_ai_services_keys(subscription_id: str, resource_group: str, service_name: str) -> Dict[str, Any]:
+    """Cognitive Services listKeys -> {"key1": ..., "key2": ...}"""
+    path = resource_path(subscription_id, resource_group, "Microsoft.CognitiveServices/accounts", service_name)
+    return await arm_client.post(f"{path}/listKeys", COGNITIVE_API_VERSION)
+
+
+async def list_storage_keys(subscription_id: str, resource_group: str, account_name: str) -> Dict[str, Any]:
+    """Storage listKeys -> {"keys": [{"keyName": ..., "value": ...}]}"""
+    path = resource_path(subscription_id, resource_group, "Microsoft.Storage/storageAccounts", account_name)
+    return await arm_client.post(f"{path}/listKeys", STORAGE_API_VERSION)
+
+
+async def list_search_query_keys(subscription_id: str, resource_group: str, search_service_name: str) -> Dict[str, Any]:
+    """Search listQueryKeys -> {"value": [{"name": ..., "key": ...}]}"""
+    path = resource_path(subscription_id, resource_group, "Microsoft.Search/searchServices", search_service_name)
+    return await arm_client.post(f"{path}/listQueryKeys", SEARCH_API_VERSION)
+
+
+async def delete_resource_group(subscription_id: str, resource_group: str) -> bool:
+    """Delete a resource group and everything in it (waits for completion)."""
+    path = f"/subscriptions/{subscription_id}/resourcegroups/{resource_group}"
+    return await arm_client.delete(path, RESOURCES_API_VERSION)
+
+
+# Process-wide client so every deployment shares one token and connection pool
+arm_client = ArmClient()
@@ -4,10 +4,20 @@ Azure service for Azure AI Multi-Environment Manager.
 This service handles all Azure CLI operations including authentication,
 subscription management, and retrieval of service credentials.
 """
+import asyncio
 import json
 import os
 import subprocess
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import AZ_AUTH_CACHE_TTL, AZURE_CONFIG_DIR, AZURE_STORAGE_ENDPOINT_SUFFIX
+from . import arm_client
+from .timeline_service import DeploymentTimeline, span_await
+
+# Files the az CLI rewrites on login/logout/account set; any change invalidates the auth cache
+AZ_PROFILE_FILES = ("azureProfile.json", "msal_token_cache.json", "msal_token_cache.bin", "clouds.config")
 
 
 def azure_logged_in() -> bool:
@@ -110,23 +120,30 @@ def get_ai_services_keys(service_name: str, resource_group: str) -> Optional[Dic
         Dictionary with key1 and key2 or None if error
     """
     try:
-        ai_keys_raw = subprocess.check_output([
-            "az", "cognitiveservices", "account", "keys", "list",
-            "-n", service_name,
-            "-g", resource_group,
-            "-o", "json"
-        ])
-        ai_keys_json = json.loads(ai_keys_raw.decode())
-        if isinstance(ai_keys_json, dict):
-            return {
-                "key1": ai_keys_json.get("key1"),
-                "key2": ai_keys_json.get("key2")
-            }
-        return None
+        ai_keys_raw = subprocess.check_output(_ai_keys_command(service_name, resource_group))
+        return _parse_ai_keys(json.loads(ai_keys_raw.decode()))
     except Exception:
         return None
 
 
+def _ai_keys_command(service_name: str, resource_group: str) -> List[str]:
+    return [
+        "az", "cognitiveservices", "account", "keys", "list",
+        "-n", service_name,
+        "-g", resource_group,
+        "-o", "json"
+    ]
+
+
+def _parse_ai_keys(ai_keys_json: Any) -> Optional[Dict[str, str]]:
+    if isinstance(ai_keys_json, dict):
+        return {
+            "key1": ai_keys_json.get("key1"),
+            "key2": ai_keys_json.get("key2")
+        }
+    return None
+
+
 def get_storage_credentials(storage_account_name: str, resource_group: str) -> Optional[Dict[str, str]]:
     """Retrieve Azure Storage account connection string and keys.
     
@@ -138,36 +155,43 @@ def get_storage_credentials(storage_account_name: str, resource_group: str) -> O
         Dictionary with connection_string and account_key or None if error
     """
     try:
+        conn_command, keys_command = _storage_commands(storage_account_name, resource_group)
         # Get connection string
-        conn_raw = subprocess.check_output([
-            "az", "storage", "account", "show-connection-string",
-            "-n", storage_account_name,
-            "-g", resource_group,
-            "-o", "json"
-        ])
-        conn_json = json.loads(conn_raw.decode())
-        connection_string = conn_json.get("connectionString")
-        
+        conn_json = json.loads(subprocess.check_output(conn_command).decode())
         # Get account keys
-        keys_raw = subprocess.check_output([
-            "az", "storage", "account", "keys", "list",
-            "-n", storage_account_name,
-            "-g", resource_group,
-            "-o", "json"
-        ])
-        keys_json = json.loads(keys_raw.decode())
-        account_key = None
-        if isinstance(keys_json, list) and keys_json:
-            account_key = keys_json[0].get("value")
-            
-        return {
-            "connection_string": connection_string,
-            "account_key": account_key
-        }
+        keys_json = json.loads(subprocess.check_output(keys_command).decode())
+        return _parse_storage_credentials(conn_json, keys_json)
     except Exception:
         return None
 
 
+def _storage_commands(storage_account_name: str, resource_group: str) -> Tuple[List[str], List[str]]:
+    conn_command = [
+        "az", "storage", "account", "show-connection-string",
+        "-n", storage_account_name,
+        "-g", resource_group,
+        "-o", "json"
+    ]
+    keys_command = [
+        "az", "storage", "account", "keys", "list",
+        "-n", storage_account_name,
+        "-g", resource_group,
+        "-o", "json"
+    ]
+    return conn_command, keys_command
+
+
+def _parse_storage_credentials(conn_json: Any, keys_json: Any) -> Dict[str, Optional[str]]:
+    connection_string = conn_json.get("connectionString")
+    account_key = None
+    if isinstance(keys_json, list) and keys_json:
+        account_key = keys_json[0].get("value")
+    return {
+        "connection_string": connection_string,
+        "account_key": account_key
+    }
+
+
 def get_search_service_key(search_service_name: str, resource_group: str) -> Optional[Dict[str, str]]:
     """Retrieve Azure AI Search service query key and URL.
     
@@ -179,30 +203,255 @@ def get_search_service_key(search_service_name: str, resource_group: str) -> Opt
         Dictionary with search_url and search_key or None if error
     """
     try:
-        search_keys_raw = subprocess.check_output([
-            "az", "search", "query-key", "list",
-            "--service-name", search_service_name,
-            "-g", resource_group,
-            "-o", "json"
-        ])
-        search_keys_json = json.loads(search_keys_raw.decode())
-        first_key = None
-        if isinstance(search_keys_json, list) and search_keys_json:
-            first_key = search_keys_json[0].get("key")
-            
-        search_url = f"https://{search_service_name}.search.windows.net" if first_key else None
+        search_keys_raw = subprocess.check_output(_search_key_command(search_service_name, resource_group))
+        return _parse_search_key(search_service_name, json.loads(search_keys_raw.decode()))
+    except Exception:
+        return None
+
+
+def _search_key_command(search_service_name: str, resource_group: str) -> List[str]:
+    return [
+        "az", "search", "query-key", "list",
+        "--service-name", search_service_name,
+        "-g", resource_group,
+        "-o", "json"
+    ]
+
+
+def _parse_search_key(search_service_name: str, search_keys_json: Any) -> Dict[str, Optional[str]]:
+    first_key = None
+    if isinstance(search_keys_json, list) and search_keys_json:
+        first_key = search_keys_json[0].get("key")
+    search_url = f"https://{search_service_name}.search.windows.net" if first_key else None
+    return {
+        "search_url": search_url,
+        "search_key": first_key
+    }
+
+
+async def run_az_json(command: List[str]) -> Any:
+    """Run an ``az ... -o json`` command without blocking the event loop.
+    
+    Args:
+        command: Full command line (starting with "az")
         
-        return {
-            "search_url": search_url,
-            "search_key": first_key
-        }
+    Returns:
+        Parsed JSON output (None for commands that print nothing)
+        
+    Raises:
+        RuntimeError: If the command exits with a non-zero code
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(command[:4])} failed: {stderr.decode(errors='replace').strip()}")
+    output = stdout.decode()
+    return json.loads(output) if output.strip() else None
+
+
+def _use_arm(subscription_id: Optional[str]) -> bool:
+    return bool(subscription_id) and arm_client.arm_backend_enabled()
+
+
+async def get_ai_services_keys_async(
+    service_name: str, resource_group: str, subscription_id: Optional[str] = None
+) -> Optional[Dict[str, str]]:
+    """Async variant of get_ai_services_keys (ARM REST first when a subscription is known)."""
+    if _use_arm(subscription_id):
+        try:
+            return _parse_ai_keys(
+                await arm_client.list_ai_services_keys(subscription_id, resource_group, service_name)
+            )
+        except Exception as e:
+            print(f"ARM listKeys for {service_name} failed, falling back to az: {e}")
+    try:
+        return _parse_ai_keys(await run_az_json(_ai_keys_command(service_name, resource_group)))
     except Exception:
         return None
 
 
+async def get_storage_credentials_async(
+    storage_account_name: str, resource_group: str, subscription_id: Optional[str] = None
+) -> Optional[Dict[str, str]]:
+    """Async variant of get_storage_credentials (both az calls run concurrently).
+    
+    Through ARM a single listKeys call is enough; the connection string is
+    assembled from the first key, matching az show-connection-string.
+    """
+    if _use_arm(subscription_id):
+        try:
+            keys = await arm_client.list_storage_keys(subscription_id, resource_group, storage_account_name)
+            keys_json = keys.get("keys", [])
+            account_key = keys_json[0].get("value") if keys_json else None
+            conn_json = {"connectionString": (
+                f"DefaultEndpointsProtocol=https;EndpointSuffix={AZURE_STORAGE_ENDPOINT_SUFFIX};"
+                f"AccountName={storage_account_name};AccountKey={account_key}"
+            ) if account_key else None}
+            return _parse_storage_credentials(conn_json, keys_json)
+        except Exception as e:
+            print(f"ARM listKeys for {storage_account_name} failed, falling back to az: {e}")
+    try:
+        conn_json, keys_json = await asyncio.gather(
+            *(run_az_json(command) for command in _storage_commands(storage_account_name, resource_group))
+        )
+        return _parse_storage_credentials(conn_json, keys_json)
+    except Exception:
+        return None
+
+
+async def get_search_service_key_async(
+    search_service_name: str, resource_group: str, subscription_id: Optional[str] = None
+) -> Optional[Dict[str, str]]:
+    """Async variant of get_search_service_key (ARM REST first when a subscription is known)."""
+    if _use_arm(subscription_id):
+        try:
+            keys = await arm_client.list_search_query_keys(subscription_id, resource_group, search_service_name)
+            return _parse_search_key(search_service_name, keys.get("value", []))
+        except Exception as e:
+            print(f"ARM listQueryKeys for {search_service_name} failed, falling back to az: {e}")
+    try:
+        return _parse_search_key(
+            search_service_name, await run_az_json(_search_key_command(search_service_name, resource_group))
+        )
+    except Exception:
+        return None
+
+
+async def fetch_service_credentials(
+    names: Dict[str, str],
+    resource_group: str,
+    include_search: bool,
+    subscription_id: Optional[str] = None,
+    timeline: Optional[DeploymentTimeline] = None
+) -> Dict[str, Optional[Dict[str, str]]]:
+    """Fetch AI Services keys, Storage credentials and (optionally) the Search key concurrently.
+    
+    Post-apply enrichment therefore costs the slowest call instead of the sum.
+    With a subscription ID and httpx installed the keys come straight from ARM
+    over a shared connection pool; otherwise (or on failure) az is used.
+    
+    Args:
+        names: Generated resource names (ai_services_name, storage_account_name, search_service_name)
+        resource_group: Resource group name
+        include_search: Whether a search service was deployed
+        subscription_id: Subscription containing the resource group (enables the ARM path)
+        timeline: Optional deployment timeline; each fetch is recorded as a span
+        
+    Returns:
+        Dictionary with "ai_keys", "storage" and "search" entries (None when unavailable)
+    """
+    search = (
+        span_await(timeline, "credentials_search",
+                   get_search_service_key_async(names["search_service_name"], resource_group, subscription_id))
+        if include_search else asyncio.sleep(0)
+    )
+    ai_keys, storage, search_creds = await asyncio.gather(
+        span_await(timeline, "credentials_ai_keys",
+                   get_ai_services_keys_async(names["ai_services_name"], resource_group, subscription_id)),
+        span_await(timeline, "credentials_storage",
+                   get_storage_credentials_async(names["storage_account_name"], resource_group, subscription_id)),
+        search,
+    )
+    return {"ai_keys": ai_keys, "storage": storage, "search": search_creds}
+
+
+async def delete_resource_group(resource_group: str, subscription_id: Optional[str] = None) -> None:
+    """Delete a resource group and wait for it (ARM REST first, az fallback).
+    
+    Args:
+        resource_group: Resource group name
+        subscription_id: Subscription containing the resource group (enables the ARM path)
+    """
+    if _use_arm(subscription_id):
+        try:
+            await arm_client.delete_resource_group(subscription_id, resource_group)
+            return
+        except Exception as e:
+            print(f"ARM delete of {resource_group} failed, falling back to az: {e}")
+    command = ["az", "group", "delete", "--name", resource_group, "--yes"]
+    if subscription_id:
+        command += ["--subscription", subscription_id]
+    await run_az_json(command)
+
+
+async def delete_ad_application(client_id: str) -> None:
+    """Delete an Entra ID application (its service principal and secrets go with it)."""
+    await run_az_json(["az", "ad", "app", "delete", "--id", client_id])
+
+
+class AuthContextCache:
+    """Successful auth resolutions keyed by requested subscription.
+
+    Entries expire after ``ttl`` seconds or as soon as the az profile files
+    change (login, logout, account set by anyone). The lock makes resolution
+    single-flight: concurrent deployments wait for one ``az`` round trip
+    instead of racing ``az account set`` against each other.
+    """
+
+    def __init__(self, ttl: int = AZ_AUTH_CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._entries: Dict[Optional[str], Tuple[float, Tuple[bool, str, Optional[str]]]] = {}
+        self._fingerprint: Optional[Tuple] = None
+        self._active_subscription: Optional[str] = None
+
+    @staticmethod
+    def profile_fingerprint() -> Tuple:
+        stamps = []
+        for name in AZ_PROFILE_FILES:
+            try:
+                st = (AZURE_CONFIG_DIR / name).stat()
+                stamps.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append((name, None, None))
+        return tuple(stamps)
+
+    def get(self, explicit_subscription: Optional[str]) -> Optional[Tuple[bool, str, Optional[str]]]:
+        """Return a cached result that is still valid and matches the active subscription."""
+        if self.ttl <= 0 or self.profile_fingerprint() != self._fingerprint:
+            self._entries.clear()
+            return None
+        entry = self._entries.get(explicit_subscription)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        result = entry[1]
+        # Another resolution switched the CLI to a different subscription since
+        if result[2] and result[2] != self._active_subscription:
+            return None
+        return result
+
+    def put(self, explicit_subscription: Optional[str], result: Tuple[bool, str, Optional[str]]) -> None:
+        if self.ttl <= 0 or not result[0]:
+            return
+        self._active_subscription = result[2]
+        # Taken after our own 'az account set' so it does not invalidate this entry
+        self._fingerprint = self.profile_fingerprint()
+        self._entries[explicit_subscription] = (time.monotonic() + self.ttl, result)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._fingerprint = None
+        self._active_subscription = None
+
+
+_auth_cache = AuthContextCache()
+
+
+def invalidate_auth_cache() -> None:
+    """Forget cached auth context so the next deployment re-checks login and subscription."""
+    _auth_cache.clear()
+
+
 def ensure_azure_authentication(explicit_subscription: Optional[str] = None) -> Tuple[bool, str, Optional[str]]:
     """Ensure Azure CLI is authenticated and subscription is set.
     
+    Results are cached (AZ_AUTH_CACHE_TTL) until the az profile files change;
+    concurrent callers share one in-flight resolution.
+    
     Args:
         explicit_subscription: Optional explicit subscription ID
         
@@ -212,7 +461,18 @@ def ensure_azure_authentication(explicit_subscription: Optional[str] = None) ->
     # Skip login check if environment variable is set
     if os.getenv("AZ_SKIP_LOGIN_CHECK", "").lower() in {"1", "true", "yes"}:
         return True, "Skipping Azure login check (AZ_SKIP_LOGIN_CHECK set)", None
-        
+
+    with _auth_cache.lock:
+        cached = _auth_cache.get(explicit_subscription)
+        if cached is not None:
+            success, message, chosen = cached
+            return success, f"{message} (cached)", chosen
+        result = _resolve_azure_authentication(explicit_subscription)
+        _auth_cache.put(explicit_subscription, result)
+        return result
+
+
+def _resolve_azure_authentication(explicit_subscription: Optional[str]) -> Tuple[bool, str, Optional[str]]:
     # Check if logged in
     logged_in = azure_logged_in()
     if not logged_in:
@@ -230,4 +490,4 @@ def ensure_azure_authentication(explicit_subscription: Optional[str] = None) ->
     if set_subscription(chosen):
         return True, f"Subscription set ({strategy}): {chosen}", chosen
     else:
-        return False, f"Failed to set subscription ({chosen})", None
\ No newline at end of file
+        return False, f"Failed to set subscription ({chosen})", None
@@ -0,0 +1,102 @@
+"""
+Batch deployment service for Azure AI Multi-Environment Manager.
+
+Provisions N identical lab environments from one request: names are
+pre-generated without collisions, every environment is queued on the shared
+deployment scheduler (the bounded worker pool), and progress is aggregated
+from the central index by batch_id.
+"""
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import MAX_RESOURCE_GROUP_LENGTH
+from ..models.deployment import DeploymentStatus
+from ..utils.naming import build_batch_names
+from .deployment_service import enqueue_deployment, new_deployment_record
+from .persistence_service import get_all_deployments, query_deployments
+from .scheduler_service import deployment_scheduler
+
+# Statuses after which a batch item no longer changes on its own
+SUCCESS_STATUSES = {DeploymentStatus.COMPLETED}
+FAILURE_STATUSES = {DeploymentStatus.ERROR, DeploymentStatus.DESTROY_ERROR}
+
+
+async def start_batch_deployment(
+    validated_params: Dict[str, Any],
+    count: int,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> Tuple[str, List[str]]:
+    """Create and queue ``count`` environments sharing the same parameters.
+
+    Args:
+        validated_params: Output of validation_service.validate_batch_form
+        count: Number of environments to create
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+
+    Returns:
+        Tuple of (batch_id, deployment_ids)
+    """
+    batch_id = uuid.uuid4().hex[:12]
+    # Skip bases already used by environments that still exist
+    taken = {
+        row.get("name") for row in get_all_deployments().values()
+        if row.get("status") != DeploymentStatus.DESTROYED
+    }
+    deployment_ids = []
+    for env_base, names in build_batch_names(
+        validated_params["resource_group_base_clean"], count,
+        max_base_length=MAX_RESOURCE_GROUP_LENGTH, taken_bases=taken,
+    ):
+        env_params = dict(
+            validated_params,
+            resource_group_base_clean=env_base,
+            service_principal_name=f"{validated_params['service_principal_name']}-{env_base}",
+        )
+        deployment_id = str(uuid.uuid4())
+        deployments[deployment_id] = new_deployment_record(env_params, names, batch_id=batch_id)
+        await enqueue_deployment(deployment_id, deployments, deployment_states_dir, terraform_dir)
+        deployment_ids.append(deployment_id)
+    return batch_id, deployment_ids
+
+
+def get_batch_progress(batch_id: str) -> Optional[Dict[str, Any]]:
+    """Aggregate status of all environments created by a batch.
+
+    Args:
+        batch_id: Batch identifier returned by start_batch_deployment
+
+    Returns:
+        Progress dictionary or None if the batch is unknown
+    """
+    rows = query_deployments(batch_id=batch_id)
+    if not rows:
+        return None
+    by_status: Dict[str, int] = {}
+    items = []
+    for deployment_id, row in rows.items():
+        status = row.get("status", "unknown")
+        by_status[status] = by_status.get(status, 0) + 1
+        items.append({
+            "deployment_id": deployment_id,
+            "name": row.get("name"),
+            "status": status,
+            "queue_position": deployment_scheduler.position(deployment_id),
+        })
+    total = len(items)
+    succeeded = sum(by_status.get(s, 0) for s in SUCCESS_STATUSES)
+    failed = sum(by_status.get(s, 0) for s in FAILURE_STATUSES)
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "in_progress": total - succeeded - failed,
+        "percent": round(100 * (succeeded + failed) / total, 1),
+        "by_status": by_status,
+        "items": items,
+    }
@@ -0,0 +1,175 @@
+"""
+Bulk destroy service for Azure AI Multi-Environment Manager.
+
+Tears down many environments from one request (an explicit list of ids or an
+index filter such as status/region/created-before). Every selected
+environment is queued as a destroy on the shared deployment scheduler, which
+bounds how many run at once, and progress is aggregated per bulk request.
+
+Selected deployments are tagged with the bulk_id (an indexed column), so
+progress polls only read those rows and survive a restart. Request details
+(fast, created_at) are kept in memory until BULK_DESTROY_RETENTION seconds
+after the last item finished.
+"""
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import BULK_DESTROY_RETENTION
+from ..models.deployment import DeploymentStatus
+from .deployment_service import enqueue_destroy
+from .persistence_service import query_deployments, reset_deployment_logs, save_deployment_state_async
+from .scheduler_service import deployment_scheduler
+from .terraform_progress import get_progress
+
+# Statuses after which a bulk destroy item no longer changes on its own
+DESTROYED_STATUSES = {DeploymentStatus.DESTROYED}
+DESTROY_FAILURE_STATUSES = {DeploymentStatus.DESTROY_ERROR, DeploymentStatus.ERROR}
+# Statuses whose environment is busy with another operation
+BUSY_STATUSES = {DeploymentStatus.DESTROYING, DeploymentStatus.CLAIMING}
+
+# Bulk destroy request details by bulk_id; items are found through the index
+_bulk_destroys: Dict[str, Dict[str, Any]] = {}
+
+
+def _expire_bulk_destroys() -> None:
+    now = time.monotonic()
+    for bulk_id, bulk in list(_bulk_destroys.items()):
+        if bulk["finished_at"] is None and now - bulk["started_at"] > BULK_DESTROY_RETENTION:
+            # Never polled to completion: check the index once the retention has passed
+            rows = query_deployments(bulk_id=bulk_id).values()
+            if all(row.get("status") in DESTROYED_STATUSES | DESTROY_FAILURE_STATUSES for row in rows):
+                bulk["finished_at"] = now
+        if bulk["finished_at"] is not None and now - bulk["finished_at"] > BULK_DESTROY_RETENTION:
+            del _bulk_destroys[bulk_id]
+
+
+def select_destroy_targets(
+    deployment_ids: Optional[List[str]] = None,
+    status: Optional[str] = None,
+    region: Optional[str] = None,
+    created_before: Optional[str] = None,
+) -> Tuple[List[str], Dict[str, str]]:
+    """Resolve a list or filter into destroyable deployments.
+
+    Args:
+        deployment_ids: Explicit deployments to destroy (filters are ignored)
+        status: Only deployments with this status
+        region: Only deployments in this region
+        created_before: Only deployments created before this UTC timestamp (created_at format)
+
+    Returns:
+        Tuple of (deployment_ids to destroy, {deployment_id: reason} skipped)
+    """
+    if deployment_ids is not None:
+        found = query_deployments(deployment_ids=deployment_ids)
+        rows = {deployment_id: found.get(deployment_id) for deployment_id in deployment_ids}
+    else:
+        rows = query_deployments(status=status, region=region, created_before=created_before)
+    selected, skipped = [], {}
+    for deployment_id, row in rows.items():
+        if row is None:
+            skipped[deployment_id] = "not found"
+        elif row.get("status") in DESTROYED_STATUSES:
+            skipped[deployment_id] = "already destroyed"
+        elif not row.get("has_state"):
+            skipped[deployment_id] = "no terraform state"
+        elif (row.get("status") in BUSY_STATUSES or deployment_scheduler.is_running(deployment_id)
+                or deployment_scheduler.position(deployment_id)):
+            skipped[deployment_id] = "another operation is running or queued"
+        else:
+            selected.append(deployment_id)
+    return selected, skipped
+
+
+async def start_bulk_destroy(
+    deployment_ids: List[str],
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path,
+    fast: bool = False
+) -> str:
+    """Queue destroys for the given deployments.
+
+    Args:
+        deployment_ids: Output of select_destroy_targets
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+        fast: Delete resource groups directly where the state allows it
+
+    Returns:
+        bulk_id for get_bulk_destroy_progress
+    """
+    _expire_bulk_destroys()
+    bulk_id = uuid.uuid4().hex[:12]
+    queued = []
+    for deployment_id in deployment_ids:
+        record = await deployments.aget(deployment_id)
+        if not record:
+            continue
+        record["status"] = DeploymentStatus.DESTROYING
+        record["bulk_id"] = bulk_id
+        reset_deployment_logs(deployment_id)  # Start a fresh log (previous one archived)
+        await save_deployment_state_async(deployment_id, record)
+        enqueue_destroy(deployment_id, deployments, deployment_states_dir, terraform_dir, fast=fast)
+        queued.append(deployment_id)
+    _bulk_destroys[bulk_id] = {
+        "fast": fast,
+        "created_at": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "started_at": time.monotonic(),
+        "finished_at": None if queued else time.monotonic(),
+    }
+    return bulk_id
+
+
+def get_bulk_destroy_progress(bulk_id: str) -> Optional[Dict[str, Any]]:
+    """Aggregate status of a bulk destroy, with per-item progress.
+
+    Args:
+        bulk_id: Identifier returned by start_bulk_destroy
+
+    Returns:
+        Progress dictionary or None if the bulk request is unknown
+
+    An environment picked up again by a later bulk destroy moves to that one.
+    After a restart or expiry ``fast`` and ``created_at`` are None.
+    """
+    _expire_bulk_destroys()
+    bulk = _bulk_destroys.get(bulk_id)
+    rows = query_deployments(bulk_id=bulk_id)
+    if bulk is None and not rows:
+        return None
+    bulk = bulk or {"fast": None, "created_at": None, "started_at": None, "finished_at": None}
+    by_status: Dict[str, int] = {}
+    items = []
+    for deployment_id, row in rows.items():
+        status = row.get("status", "unknown")
+        by_status[status] = by_status.get(status, 0) + 1
+        progress = get_progress(deployment_id)
+        items.append({
+            "deployment_id": deployment_id,
+            "name": row.get("name"),
+            "status": status,
+            "queue_position": deployment_scheduler.position(deployment_id),
+            "percent": progress.percent if progress and progress.operation == "destroy" else None,
+        })
+    total = len(items)
+    destroyed = sum(by_status.get(s, 0) for s in DESTROYED_STATUSES)
+    failed = sum(by_status.get(s, 0) for s in DESTROY_FAILURE_STATUSES)
+    if destroyed + failed == total and bulk_id in _bulk_destroys and bulk["finished_at"] is None:
+        bulk["finished_at"] = time.monotonic()
+    return {
+        "bulk_id": bulk_id,
+        "fast": bulk["fast"],
+        "created_at": bulk["created_at"],
+        "total": total,
+        "destroyed": destroyed,
+        "failed": failed,
+        "in_progress": total - destroyed - failed,
+        "percent": round(100 * (destroyed + failed) / total, 1) if total else 100.0,
+        "by_status": by_status,
+        "items": items,
+    }
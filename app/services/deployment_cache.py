@@ -0,0 +1,160 @@
+"""
+In-memory deployment cache for Azure AI Multi-Environment Manager.
+
+Full deployment records (params, names, outputs) are hydrated lazily from
+their metadata.json the first time a route needs them and kept in an LRU
+cache bounded by an approximate memory budget. Records of deployments that
+are still running are pinned so in-place updates are never lost.
+
+Async routes use ``aget``, which hydrates on the blocking-work pool so a cache
+miss never reads metadata.json on the event loop. Ids without a record are
+remembered for DEPLOYMENT_CACHE_MISS_TTL seconds, so requests for unknown ids
+do not hit the disk every time.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, MutableMapping, Optional
+
+from ..config import DEPLOYMENT_CACHE_MAX_BYTES, DEPLOYMENT_CACHE_MISS_TTL
+from ..models.deployment import DeploymentState, DeploymentStatus
+from .executor_service import run_blocking
+from .serialization import get_serializer
+
+# Statuses whose records are mutated in place by running tasks and must stay cached
+ACTIVE_STATUSES = {
+    DeploymentStatus.STARTING, DeploymentStatus.QUEUED, DeploymentStatus.TERRAFORM,
+    DeploymentStatus.FOUNDRY, DeploymentStatus.DESTROYING, DeploymentStatus.CLAIMING,
+    # Warm pool members are flipped to CLAIMING in place by the claim route
+    DeploymentStatus.WARM
+}
+
+
+def estimate_record_size(record: DeploymentState) -> int:
+    """Approximate memory footprint of a record by its serialized size."""
+    try:
+        return len(get_serializer().dumps(record))
+    except Exception:
+        return 1024
+
+
+class DeploymentCache(MutableMapping):
+    """Dict-like LRU cache of full deployment records keyed by deployment_id.
+
+    Lookups of ids that are not cached call ``loader`` (returns the record or
+    None). Iteration and len() only cover records currently in memory; use
+    the central index for the full list of deployments.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[DeploymentState]],
+        max_bytes: int = DEPLOYMENT_CACHE_MAX_BYTES,
+        miss_ttl: float = DEPLOYMENT_CACHE_MISS_TTL,
+    ):
+        self._loader = loader
+        self.max_bytes = max_bytes
+        self.miss_ttl = miss_ttl
+        self._entries: "OrderedDict[str, DeploymentState]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._misses: Dict[str, float] = {}  # deployment_id -> monotonic time the miss expires
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+    def _cached(self, deployment_id: str) -> Optional[DeploymentState]:
+        # Raises KeyError for a recently confirmed miss; None means "not cached, load it"
+        with self._lock:
+            record = self._entries.get(deployment_id)
+            if record is not None:
+                self._entries.move_to_end(deployment_id)
+                return record
+            expires = self._misses.get(deployment_id)
+            if expires is not None:
+                if time.monotonic() < expires:
+                    raise KeyError(deployment_id)
+                del self._misses[deployment_id]
+            return None
+
+    def _loaded(self, deployment_id: str, record: Optional[DeploymentState]) -> DeploymentState:
+        with self._lock:
+            # Another caller may have stored the record while this one was loading; keep that one
+            existing = self._entries.get(deployment_id)
+            if existing is not None:
+                return existing
+            if record is None:
+                if self.miss_ttl > 0:
+                    now = time.monotonic()
+                    if len(self._misses) >= 1024:
+                        self._misses = {key: until for key, until in self._misses.items() if until > now}
+                    self._misses[deployment_id] = now + self.miss_ttl
+                raise KeyError(deployment_id)
+            self._store(deployment_id, record)
+            return record
+
+    def __getitem__(self, deployment_id: str) -> DeploymentState:
+        record = self._cached(deployment_id)
+        if record is not None:
+            return record
+        return self._loaded(deployment_id, self._loader(deployment_id))
+
+    async def aget(self, deployment_id: str, default: Optional[DeploymentState] = None) -> Optional[DeploymentState]:
+        """Like get(), but a cache miss is loaded on the blocking-work pool."""
+        try:
+            record = self._cached(deployment_id)
+            if record is not None:
+                return record
+            loaded = await run_blocking(self._loader, deployment_id, label="deployment_cache_load")
+            return self._loaded(deployment_id, loaded)
+        except KeyError:
+            return default
+
+    def __setitem__(self, deployment_id: str, record: DeploymentState) -> None:
+        with self._lock:
+            self._misses.pop(deployment_id, None)
+            self._store(deployment_id, record)
+
+    def __delitem__(self, deployment_id: str) -> None:
+        with self._lock:
+            del self._entries[deployment_id]
+            self._total_bytes -= self._sizes.pop(deployment_id, 0)
+
+    def __contains__(self, deployment_id: object) -> bool:
+        try:
+            self[deployment_id]  # type: ignore[index]
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _store(self, deployment_id: str, record: DeploymentState) -> None:
+        if deployment_id in self._entries:
+            self._total_bytes -= self._sizes.get(deployment_id, 0)
+        size = estimate_record_size(record)
+        self._entries[deployment_id] = record
+        self._entries.move_to_end(deployment_id)
+        self._sizes[deployment_id] = size
+        self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        # Least recently used first; active deployments and the newest entry are kept
+        if self._total_bytes <= self.max_bytes:
+            return
+        newest = next(reversed(self._entries))
+        for deployment_id in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if deployment_id == newest or self._entries[deployment_id].get("status") in ACTIVE_STATUSES:
+                continue
+            del self._entries[deployment_id]
+            self._total_bytes -= self._sizes.pop(deployment_id, 0)
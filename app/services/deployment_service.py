@@ -4,33 +4,93 @@ Deployment orchestration service for Azure AI Multi-Environment Manager.
 This service coordinates high-level deployment workflows by orchestrating
 between persistence, Azure, and Terraform services.
 """
-import json
-import subprocess
+import asyncio
+import os
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set
 
-from .persistence_service import save_deployment_state, append_log
+from ..config import (
+    DEFAULT_MODEL_VERSION, DEFAULT_DEPLOYMENT_SKU, DEFAULT_MODEL_DEPLOYMENT_ENABLED,
+    TERRAFORM_SPLIT_PLAN, TERRAFORM_PREPLAN_QUEUED, TERRAFORM_MAX_PREPLANS
+)
+from .persistence_service import (
+    save_deployment_state_async, append_log, release_deployment_logs, query_deployments
+)
+from .executor_service import run_blocking
+from .timeline_service import DeploymentTimeline, span
+from .terraform_progress import clear_progress, start_progress, get_progress
+from .scheduler_service import deployment_scheduler, PRIORITY_DEPLOY, PRIORITY_DESTROY, PRIORITY_WARM_POOL
 from .azure_service import (
     ensure_azure_authentication, 
-    get_ai_services_keys, 
-    get_storage_credentials, 
-    get_search_service_key
+    delete_ad_application,
+    delete_resource_group,
+    fetch_service_credentials,
+    invalidate_auth_cache,
+    run_az_json
 )
 from .terraform_service import (
-    terraform_init, 
+    clear_state_resources,
+    prepare_module_workspace,
+    resource_group_delete_plan,
+    terraform_plan,
     terraform_apply, 
     terraform_destroy,
     generate_tfvars_content, 
     parse_terraform_outputs, 
     write_tfvars_file
 )
-from ..utils.file_operations import copy_terraform_files, cleanup_terraform_files
+from ..models.deployment import DeploymentParams, DeploymentState, DeploymentStatus, ResourceNames
+from ..utils.file_operations import cleanup_terraform_files
 
 
-async def ensure_azure_login(deployment_id: str, deployments: Dict[str, Dict], deployment_params: Dict[str, Any]):
+def new_deployment_record(
+    validated_params: Dict[str, Any],
+    names: Dict[str, str],
+    batch_id: Optional[str] = None
+) -> DeploymentState:
+    """Build the initial runtime record for a new deployment.
+    
+    Args:
+        validated_params: Output of validation_service.validate_deployment_form
+        names: Generated resource names (utils.naming.build_names)
+        batch_id: Batch this deployment belongs to, if created by a batch request
+        
+    Returns:
+        Deployment record with configuration defaults applied
+    """
+    return DeploymentState(
+        status=DeploymentStatus.STARTING,
+        outputs={},
+        names=ResourceNames.from_dict(names),
+        params=DeploymentParams(
+            resource_group_base=validated_params["resource_group_base_clean"],
+            location=validated_params["location"],
+            include_search=validated_params["include_search"],
+            enable_model_deployment=DEFAULT_MODEL_DEPLOYMENT_ENABLED,
+            openai_model_name=validated_params["openai_model_name"],
+            openai_model_version=DEFAULT_MODEL_VERSION,
+            openai_deployment_sku=DEFAULT_DEPLOYMENT_SKU,
+            model_deployment_name=validated_params["openai_model_name"],  # Use model name as deployment name
+            subscription_id=validated_params["subscription_id"] or os.getenv("AZ_SUBSCRIPTION_ID", "").strip(),
+            service_principal_name=validated_params["service_principal_name"],
+            secret_expiration_date=validated_params["secret_expiration_date"],
+        ),
+        batch_id=batch_id,
+        expires_at=validated_params.get("expires_at") or None,
+    )
+
+
+async def ensure_azure_login(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_params: Dict[str, Any],
+    timeline: Optional[DeploymentTimeline] = None
+):
     """Ensure Azure CLI logged in and subscription selected automatically."""
     explicit = deployment_params.get("subscription_id") or None
-    success, message, chosen = ensure_azure_authentication(explicit)
+    with span(timeline, "auth"):
+        success, message, chosen = await run_blocking(ensure_azure_authentication, explicit, label="az_authentication")
     
     append_log(deployment_id, f"[AUTH] {message}")
     
@@ -45,6 +105,129 @@ async def ensure_azure_login(deployment_id: str, deployments: Dict[str, Dict], d
             pass
 
 
+async def prepare_workspace(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path,
+    timeline: Optional[DeploymentTimeline] = None
+) -> Path:
+    """Authenticate and build the isolated terraform workspace (initialized via its module snapshot).
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+        timeline: Optional deployment timeline for the auth/copy/init spans
+        
+    Returns:
+        The initialized deployment workspace directory
+    """
+    names = deployments[deployment_id]["names"]
+    params = deployments[deployment_id]["params"]
+
+    # Ensure Azure login first (before terraform so provider auth works)
+    await ensure_azure_login(deployment_id, deployments, params, timeline)
+    
+    # Create isolated deployment directory with terraform files
+    deployment_dir = deployment_states_dir / deployment_id
+    deployment_dir.mkdir(exist_ok=True)
+    
+    # Link the workspace to an initialized, content-addressed module snapshot
+    append_log(deployment_id, "[SETUP] Creating isolated terraform workspace")
+    module_version = await prepare_module_workspace(
+        deployment_dir, terraform_dir, log_callback=lambda line: append_log(deployment_id, line), timeline=timeline
+    )
+    deployments[deployment_id]["module_version"] = module_version
+    append_log(deployment_id, f"[SETUP] Linked module {module_version} into {deployment_dir}")
+    
+    # Prepare terraform.tfvars in deployment directory
+    tfvars_content = generate_tfvars_content(params, names)
+    write_tfvars_file(deployment_dir, tfvars_content)
+    append_log(deployment_id, f"[DEBUG] include_search={params['include_search']} search_service_name={names['search_service_name']}")
+
+    # Basic quota / usage precheck placeholder (future enhancement could call ARM usage APIs)
+    append_log(deployment_id, "[PRECHECK] Environment validation placeholder (quotas not yet checked).")
+    try:
+        sub_info = await run_az_json(["az", "account", "show", "-o", "json"])
+        append_log(deployment_id, f"[PRECHECK] Active subscription: {sub_info.get('id')} - {sub_info.get('name')}")
+    except Exception as e:  # noqa
+        append_log(deployment_id, f"[PRECHECK][WARN] Could not read 'az account show': {e}")
+    append_log(deployment_id, "[PRECHECK] (Future) Query specific quotas for Cognitive, AI Foundry and Storage.")
+
+    append_log(deployment_id, f"[TERRAFORM] Executing in isolated workspace: {deployment_dir}")
+    return deployment_dir
+
+
+async def plan_deployment(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path,
+    timeline: Optional[DeploymentTimeline] = None
+) -> Path:
+    """Prepare the workspace and save a terraform plan for a later apply.
+    
+    Returns:
+        Path of the saved plan file
+    """
+    timeline = timeline or DeploymentTimeline(deployments[deployment_id], "deploy")
+    deployment_dir = await prepare_workspace(
+        deployment_id, deployments, deployment_states_dir, terraform_dir, timeline
+    )
+    started = time.monotonic()
+    with span(timeline, "plan"):
+        plan_path = await terraform_plan(
+            deployment_dir, log_callback=lambda line: append_log(deployment_id, line),
+            progress=start_progress(deployment_id, "apply"), timeline=timeline
+        )
+    append_log(deployment_id, f"[PLAN] Saved plan in {time.monotonic() - started:.1f}s")
+    return plan_path
+
+
+# Pre-plans of queued deployments, so apply can start from a saved plan once a slot frees up
+_preplans: Dict[str, asyncio.Task] = {}
+_preplans_started: Set[str] = set()
+_preplan_slots = asyncio.Semaphore(TERRAFORM_MAX_PREPLANS)
+
+
+async def _preplan(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> Optional[Path]:
+    async with _preplan_slots:
+        _preplans_started.add(deployment_id)
+        append_log(deployment_id, "[PREPLAN] Planning while waiting in the queue")
+        try:
+            return await plan_deployment(deployment_id, deployments, deployment_states_dir, terraform_dir)
+        except Exception as e:
+            append_log(deployment_id, f"[PREPLAN][WARN] Pre-plan failed, will plan again before apply: {e}")
+            return None
+
+
+async def _take_preplan(deployment_id: str) -> Optional[Path]:
+    """Return the saved plan of a queued deployment, waiting if planning is underway.
+    
+    A pre-plan that has not started yet is cancelled so the run plans itself
+    instead of queueing behind other pre-plans.
+    """
+    task = _preplans.pop(deployment_id, None)
+    started = deployment_id in _preplans_started
+    _preplans_started.discard(deployment_id)
+    if task is None:
+        return None
+    if not task.done() and not started:
+        task.cancel()
+        return None
+    try:
+        return await task
+    except asyncio.CancelledError:
+        return None
+
+
 async def run_full_deployment(
     deployment_id: str, 
     deployments: Dict[str, Dict], 
@@ -62,51 +245,40 @@ async def run_full_deployment(
     data = deployments[deployment_id]
     names = data["names"]
     params = data["params"]
+    timeline = DeploymentTimeline(data, "deploy")
     
     try:
-        deployments[deployment_id]["status"] = "terraform"
+        deployments[deployment_id]["status"] = DeploymentStatus.TERRAFORM
         # Save initial deployment state persistently
-        save_deployment_state(deployment_id, deployments[deployment_id])
-        
-        # Ensure Azure login first (before terraform so provider auth works)
-        await ensure_azure_login(deployment_id, deployments, params)
-        
-        # Create isolated deployment directory with terraform files
-        deployment_dir = deployment_states_dir / deployment_id
-        deployment_dir.mkdir(exist_ok=True)
-        
-        # Copy terraform files to deployment directory for isolated execution
-        append_log(deployment_id, "[SETUP] Creating isolated terraform workspace")
-        copy_terraform_files(terraform_dir, deployment_dir)
-        append_log(deployment_id, f"[SETUP] Copied terraform files to {deployment_dir}")
-        
-        # Prepare terraform.tfvars in deployment directory
-        tfvars_content = generate_tfvars_content(params, names)
-        write_tfvars_file(deployment_dir, tfvars_content)
-        append_log(deployment_id, f"[DEBUG] include_search={params['include_search']} search_service_name={names['search_service_name']}")
-
-        # Basic quota / usage precheck placeholder (future enhancement could call ARM usage APIs)
-        append_log(deployment_id, "[PRECHECK] Environment validation placeholder (quotas not yet checked).")
-        try:
-            acct = subprocess.check_output(["az", "account", "show", "-o", "json"]).decode()
-            sub_info = json.loads(acct)
-            append_log(deployment_id, f"[PRECHECK] Active subscription: {sub_info.get('id')} - {sub_info.get('name')}")
-        except Exception as e:  # noqa
-            append_log(deployment_id, f"[PRECHECK][WARN] Could not read 'az account show': {e}")
-        append_log(deployment_id, "[PRECHECK] (Future) Query specific quotas for Cognitive, AI Foundry and Storage.")
-
-        # Terraform init & apply - now executed in isolated deployment directory
-        append_log(deployment_id, f"[TERRAFORM] Executing in isolated workspace: {deployment_dir}")
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
         
         # Create log callback function to bridge with our append_log system
         def log_callback(line: str):
             append_log(deployment_id, line)
-            
-        await terraform_init(deployment_dir, log_callback=log_callback)
-        await terraform_apply(deployment_dir, log_callback=log_callback, max_retries=2)
+
+        deployment_dir = deployment_states_dir / deployment_id
+        plan_path = await _take_preplan(deployment_id)
+        if plan_path is not None:
+            append_log(deployment_id, "[PLAN] Applying plan computed while queued")
+        elif TERRAFORM_SPLIT_PLAN:
+            plan_path = await plan_deployment(
+                deployment_id, deployments, deployment_states_dir, terraform_dir, timeline
+            )
+        else:
+            await prepare_workspace(deployment_id, deployments, deployment_states_dir, terraform_dir, timeline)
+
+        started = time.monotonic()
+        with span(timeline, "apply"):
+            await terraform_apply(
+                deployment_dir, log_callback=log_callback, max_retries=2,
+                progress=get_progress(deployment_id) or start_progress(deployment_id, "apply"),
+                plan_path=plan_path, timeline=timeline
+            )
+        append_log(deployment_id, f"[APPLY] Finished in {time.monotonic() - started:.1f}s")
         
         # Terraform outputs - parse from deployment directory
-        outputs = parse_terraform_outputs(deployment_dir)
+        with span(timeline, "outputs"):
+            outputs = await run_blocking(parse_terraform_outputs, deployment_dir, label="terraform_output")
         deployments[deployment_id]["outputs"].update(outputs)
         
         # Log foundry endpoint availability
@@ -116,14 +288,20 @@ async def run_full_deployment(
             append_log(deployment_id, "[INFO] Foundry project endpoint not exposed by provider yet or null.")
 
         # Foundry project handled by Terraform
-        deployments[deployment_id]["status"] = "foundry"
+        deployments[deployment_id]["status"] = DeploymentStatus.FOUNDRY
 
         # Actual resource group name (prefixed in tfvars)
         rg_name = f"RG-{params['resource_group_base']}"
 
-        # Retrieve Azure OpenAI (AI Services) keys & endpoint alias
-        append_log(deployment_id, "Retrieving Azure OpenAI (AI Services) keys...")
-        ai_keys = get_ai_services_keys(names["ai_services_name"], rg_name)
+        # Retrieve AI Services keys, Storage credentials and Search key concurrently
+        append_log(deployment_id, "Retrieving Azure OpenAI (AI Services) keys, Storage connection string"
+                   + (" and Search service query key..." if params['include_search'] else "..."))
+        credentials = await fetch_service_credentials(
+            names, rg_name, params['include_search'], params.get("subscription_id") or None, timeline
+        )
+
+        # Azure OpenAI (AI Services) keys & endpoint alias
+        ai_keys = credentials["ai_keys"]
         if ai_keys:
             deployments[deployment_id]["outputs"].update({
                 "azure_openai_endpoint": outputs.get("openai_endpoint") or outputs.get("ai_services_endpoint"),
@@ -138,9 +316,8 @@ async def run_full_deployment(
         else:
             append_log(deployment_id, "[WARN] Could not fetch Azure OpenAI keys")
 
-        # Retrieve Storage connection string & key
-        append_log(deployment_id, "Retrieving Storage connection string...")
-        storage_creds = get_storage_credentials(names["storage_account_name"], rg_name)
+        # Storage connection string & key
+        storage_creds = credentials["storage"]
         if storage_creds:
             deployments[deployment_id]["outputs"].update({
                 "storage_connection_string": storage_creds.get("connection_string"),
@@ -149,10 +326,9 @@ async def run_full_deployment(
         else:
             append_log(deployment_id, "[WARN] Could not fetch Storage credentials")
 
-        # Retrieve Search query key (if search included)
+        # Search query key (if search included)
         if params['include_search']:
-            append_log(deployment_id, "Retrieving Search service query key...")
-            search_creds = get_search_service_key(names["search_service_name"], rg_name)
+            search_creds = credentials["search"]
             if search_creds:
                 deployments[deployment_id]["outputs"].update({
                     "azure_ai_search_url": search_creds.get("search_url"),
@@ -162,25 +338,36 @@ async def run_full_deployment(
                 append_log(deployment_id, "[WARN] Could not fetch Search credentials")
 
         # Clean up terraform files but keep state and variables for potential destroy
-        cleanup_terraform_files(deployment_dir)
+        with span(timeline, "cleanup"):
+            await run_blocking(cleanup_terraform_files, deployment_dir, label="cleanup_terraform_files")
         append_log(deployment_id, "[CLEANUP] Removed terraform files, kept state and variables")
         
-        deployments[deployment_id]["status"] = "completed"
-        append_log(deployment_id, "Deployment completed successfully")
+        if data.get("warm_pool"):
+            # Warm pool members wait applied until a deploy request claims them
+            deployments[deployment_id]["status"] = DeploymentStatus.WARM
+            append_log(deployment_id, f"[POOL] Environment ready in warm pool {data['warm_pool']}")
+        else:
+            deployments[deployment_id]["status"] = DeploymentStatus.COMPLETED
+            append_log(deployment_id, "Deployment completed successfully")
         # Save deployment state persistently (include outputs so dashboard flags it)
-        save_deployment_state(deployment_id, deployments[deployment_id], deployments[deployment_id].get("outputs", {}))
+        await save_deployment_state_async(deployment_id, deployments[deployment_id], deployments[deployment_id].get("outputs", {}))
         
     except Exception as e:  # noqa
         # Clean up terraform files on error too
         deployment_dir = deployment_states_dir / deployment_id
         if deployment_dir.exists():
-            cleanup_terraform_files(deployment_dir)
+            await run_blocking(cleanup_terraform_files, deployment_dir, label="cleanup_terraform_files")
             append_log(deployment_id, "[CLEANUP] Removed terraform files due to error")
         
-        deployments[deployment_id]["status"] = "error"
+        deployments[deployment_id]["status"] = DeploymentStatus.ERROR
         append_log(deployment_id, f"ERROR: {e}")
+        # Failure may stem from expired credentials; re-check auth on the next run
+        invalidate_auth_cache()
         # Save deployment state even on error (outputs may be partial)
-        save_deployment_state(deployment_id, deployments[deployment_id], deployments[deployment_id].get("outputs", {}))
+        await save_deployment_state_async(deployment_id, deployments[deployment_id], deployments[deployment_id].get("outputs", {}))
+    finally:
+        release_deployment_logs(deployment_id)
+        clear_progress(deployment_id)
 
 
 async def run_full_destroy(
@@ -197,13 +384,14 @@ async def run_full_destroy(
         deployment_states_dir: Base directory for deployment persistence
         terraform_dir: Directory containing terraform configuration files
     """
+    timeline = DeploymentTimeline(deployments[deployment_id], "destroy")
     try:
-        deployments[deployment_id]["status"] = "destroying"
+        deployments[deployment_id]["status"] = DeploymentStatus.DESTROYING
         # Save initial destroy state persistently
-        save_deployment_state(deployment_id, deployments[deployment_id])
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
         
         # Ensure Azure login first
-        await ensure_azure_login(deployment_id, deployments, deployments[deployment_id]["params"])
+        await ensure_azure_login(deployment_id, deployments, deployments[deployment_id]["params"], timeline)
         
         # Setup isolated deployment directory for destroy
         deployment_dir = deployment_states_dir / deployment_id
@@ -215,10 +403,16 @@ async def run_full_destroy(
             append_log(deployment_id, f"[ERROR] No terraform state found for deployment {deployment_id[:8]}")
             raise RuntimeError(f"Cannot destroy deployment {deployment_id[:8]}: no terraform state found")
             
-        # Copy current terraform files to deployment directory for destroy
+        # Link the module version this deployment was applied with (current module for older records)
         append_log(deployment_id, "[SETUP] Creating isolated terraform workspace for destroy")
-        copy_terraform_files(terraform_dir, deployment_dir)
-        append_log(deployment_id, f"[SETUP] Using terraform files with existing state in {deployment_dir}")
+        module_version = await prepare_module_workspace(
+            deployment_dir, terraform_dir,
+            module_version=deployments[deployment_id].get("module_version"),
+            log_callback=lambda line: append_log(deployment_id, line),
+            timeline=timeline
+        )
+        deployments[deployment_id]["module_version"] = module_version
+        append_log(deployment_id, f"[SETUP] Using module {module_version} with existing state in {deployment_dir}")
         
         # Run terraform destroy with retry logic - executed in isolated deployment directory  
         append_log(deployment_id, f"[TERRAFORM] Destroying from isolated workspace: {deployment_dir}")
@@ -228,24 +422,251 @@ async def run_full_destroy(
         def log_callback(line: str):
             append_log(deployment_id, line)
             
-        await terraform_destroy(deployment_dir, log_callback=log_callback, max_retries=2)
+        with span(timeline, "destroy"):
+            await terraform_destroy(
+                deployment_dir, log_callback=log_callback, max_retries=2,
+                progress=start_progress(deployment_id, "destroy"), timeline=timeline
+            )
         
         # If we reach here, destroy succeeded
-        deployments[deployment_id]["status"] = "destroyed"
+        deployments[deployment_id]["status"] = DeploymentStatus.DESTROYED
         append_log(deployment_id, "Resources destroyed successfully")
         
         # Clean up terraform files in deployment directory after successful destroy
-        cleanup_terraform_files(deployment_dir)
+        await run_blocking(cleanup_terraform_files, deployment_dir, label="cleanup_terraform_files")
         append_log(deployment_id, "[CLEANUP] Cleaned up terraform files after successful destroy")
         
         # Remove outputs since resources no longer exist
         deployments[deployment_id]["outputs"] = {}
         
         # Save final deployment state persistently
-        save_deployment_state(deployment_id, deployments[deployment_id])
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
         
     except Exception as e:  # noqa
-        deployments[deployment_id]["status"] = "destroy_error"
+        deployments[deployment_id]["status"] = DeploymentStatus.DESTROY_ERROR
         append_log(deployment_id, f"ERROR during destroy: {e}")
+        invalidate_auth_cache()
         # Save deployment state even on error
-        save_deployment_state(deployment_id, deployments[deployment_id])
\ No newline at end of file
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
+    finally:
+        release_deployment_logs(deployment_id)
+        clear_progress(deployment_id)
+
+
+async def run_resource_group_delete(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+):
+    """Destroy a deployment by deleting its resource group directly.
+    
+    One ARM delete removes every resource in the group without terraform
+    walking the dependency graph. Only used when the state shows nothing
+    outside the group except the Entra ID application (deleted afterwards);
+    otherwise, or if the delete fails, run_full_destroy takes over.
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+    """
+    params = deployments[deployment_id]["params"]
+    rg_name = f"RG-{params['resource_group_base']}"
+    deployment_dir = deployment_states_dir / deployment_id
+    try:
+        plan = await run_blocking(resource_group_delete_plan, deployment_dir, rg_name, label="terraform_state")
+    except Exception as e:  # noqa
+        plan = None
+        append_log(deployment_id, f"[FAST-DESTROY][WARN] Could not read terraform state: {e}")
+    if plan is None:
+        append_log(deployment_id, "[FAST-DESTROY] State not eligible for a resource group delete, using terraform destroy")
+        return await run_full_destroy(deployment_id, deployments, deployment_states_dir, terraform_dir)
+
+    timeline = DeploymentTimeline(deployments[deployment_id], "destroy")
+    try:
+        deployments[deployment_id]["status"] = DeploymentStatus.DESTROYING
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
+        await ensure_azure_login(deployment_id, deployments, params, timeline)
+        
+        started = time.monotonic()
+        with span(timeline, "resource_group_delete"):
+            append_log(deployment_id, f"[FAST-DESTROY] Deleting resource group {rg_name}")
+            await delete_resource_group(rg_name, params.get("subscription_id") or None)
+            for client_id in plan["application_client_ids"]:
+                append_log(deployment_id, f"[FAST-DESTROY] Deleting Entra ID application {client_id}")
+                await delete_ad_application(client_id)
+            await run_blocking(clear_state_resources, deployment_dir, label="terraform_state")
+        append_log(deployment_id, f"[FAST-DESTROY] Finished in {time.monotonic() - started:.1f}s")
+    except Exception as e:  # noqa
+        append_log(deployment_id, f"[FAST-DESTROY][WARN] {e}; falling back to terraform destroy")
+        invalidate_auth_cache()
+        return await run_full_destroy(deployment_id, deployments, deployment_states_dir, terraform_dir)
+
+    deployments[deployment_id]["status"] = DeploymentStatus.DESTROYED
+    deployments[deployment_id]["outputs"] = {}
+    append_log(deployment_id, "Resources destroyed successfully")
+    await save_deployment_state_async(deployment_id, deployments[deployment_id])
+    release_deployment_logs(deployment_id)
+
+
+async def enqueue_deployment(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path,
+    priority: int = PRIORITY_DEPLOY
+) -> None:
+    """Queue a deployment run on the shared scheduler.
+    
+    The record is marked ``queued`` and persisted so it shows up on the
+    dashboard (and is resumed after a restart) until a worker slot frees up.
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+        priority: Scheduler priority (warm pool refills queue behind user deploys)
+    """
+    params = deployments[deployment_id]["params"]
+    deployments[deployment_id]["status"] = DeploymentStatus.QUEUED
+    await save_deployment_state_async(deployment_id, deployments[deployment_id])
+    position = deployment_scheduler.submit(
+        deployment_id,
+        lambda: run_full_deployment(deployment_id, deployments, deployment_states_dir, terraform_dir),
+        subscription=params.get("subscription_id") or "",
+        region=params.get("location") or "",
+        priority=priority,
+    )
+    if position is not None:
+        append_log(deployment_id, f"[QUEUE] Waiting for a free deployment slot (position {position})")
+        if TERRAFORM_SPLIT_PLAN and TERRAFORM_PREPLAN_QUEUED and deployment_id not in _preplans:
+            _preplans[deployment_id] = asyncio.create_task(
+                _preplan(deployment_id, deployments, deployment_states_dir, terraform_dir)
+            )
+
+
+async def refresh_deployment_outputs(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path
+) -> Dict[str, Any]:
+    """Re-read terraform outputs from the deployment's state file and persist them.
+    
+    Keys fetched after apply (API keys, connection strings) are kept; only
+    terraform-derived values are overwritten.
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        
+    Returns:
+        The refreshed terraform outputs (empty if no state could be read)
+    """
+    outputs = await run_blocking(
+        parse_terraform_outputs, deployment_states_dir / deployment_id, label="terraform_output"
+    )
+    if outputs:
+        deployments[deployment_id].setdefault("outputs", {}).update(outputs)
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
+    return outputs
+
+
+def enqueue_destroy(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path,
+    fast: bool = False
+) -> None:
+    """Queue a destroy run on the shared scheduler (ahead of pending deploys).
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+        fast: Delete the resource group directly when the state allows it
+    """
+    params = deployments[deployment_id].get("params", {})
+    runner = run_resource_group_delete if fast else run_full_destroy
+    position = deployment_scheduler.submit(
+        deployment_id,
+        lambda: runner(deployment_id, deployments, deployment_states_dir, terraform_dir),
+        subscription=params.get("subscription_id") or "",
+        region=params.get("location") or "",
+        priority=PRIORITY_DESTROY,
+    )
+    if position is not None:
+        append_log(deployment_id, f"[QUEUE] Waiting for a free slot to destroy (position {position})")
+
+
+# Cancellations waiting for a running pre-plan (kept referenced until they finish)
+_cancellations: Set[asyncio.Task] = set()
+
+
+async def cancel_queued_deployment(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path
+) -> bool:
+    """Take a deployment that is still waiting for a slot off the scheduler.
+    
+    Nothing has been applied yet, so the record ends up ``destroyed``. A
+    pre-plan that is already running finishes first (terraform plan creates
+    no resources); one that has not started is cancelled.
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        
+    Returns:
+        True if the deployment was queued and is now cancelled
+    """
+    if deployments[deployment_id].get("status") != DeploymentStatus.QUEUED:
+        return False
+    if not deployment_scheduler.cancel(deployment_id):
+        return False
+    deployments[deployment_id]["status"] = DeploymentStatus.DESTROYING
+    append_log(deployment_id, "[QUEUE] Cancelled while waiting for a deployment slot")
+    await save_deployment_state_async(deployment_id, deployments[deployment_id])
+
+    async def finish() -> None:
+        await _take_preplan(deployment_id)
+        deployment_dir = deployment_states_dir / deployment_id
+        if deployment_dir.exists():
+            await run_blocking(cleanup_terraform_files, deployment_dir, label="cleanup_terraform_files")
+        deployments[deployment_id]["status"] = DeploymentStatus.DESTROYED
+        append_log(deployment_id, "Deployment cancelled before it started; no resources were created")
+        await save_deployment_state_async(deployment_id, deployments[deployment_id])
+        release_deployment_logs(deployment_id)
+        clear_progress(deployment_id)
+
+    task = asyncio.create_task(finish())
+    _cancellations.add(task)
+    task.add_done_callback(_cancellations.discard)
+    return True
+
+
+async def resume_queued_deployments(
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> int:
+    """Re-queue deployments that were still waiting when the app stopped.
+    
+    Returns:
+        Number of deployments put back on the scheduler
+    """
+    resumed = 0
+    for deployment_id in query_deployments(status=DeploymentStatus.QUEUED):
+        record = await deployments.aget(deployment_id)
+        if record:
+            priority = PRIORITY_WARM_POOL if record.get("warm_pool") else PRIORITY_DEPLOY
+            await enqueue_deployment(deployment_id, deployments, deployment_states_dir, terraform_dir, priority)
+            resumed += 1
+    return resumed
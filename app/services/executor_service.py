@@ -0,0 +1,115 @@
+"""
+Blocking-work executor for Azure AI Multi-Environment Manager.
+
+Sync subprocess calls (terraform output, az login checks) and file I/O
+(metadata dumps, module snapshots, workspace cleanup, log history reads) run
+on a dedicated thread pool so the single uvicorn event loop keeps serving
+dashboards and log streams. Every offloaded call is timed per label; in debug
+mode slow calls are printed and asyncio reports any callback that blocks the
+loop for longer than LOOP_SLOW_CALLBACK_MS.
+
+Appending a log line stays on the loop on purpose: it is one buffered write
+to the page cache (no fsync) and must keep its order relative to the live
+stream, so a thread hop per line would cost more than it saves.
+
+The pool is created on first use, so shutdown_executor (app shutdown) does not
+break a later lifespan in the same process (tests, benchmarks).
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..config import BLOCKING_IO_WORKERS, LOOP_DEBUG, LOOP_SLOW_CALLBACK_MS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# label -> {"calls", "total_seconds", "max_seconds", "wait_seconds"}
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+        return _executor
+
+
+def _record(label: str, duration: float, waited: float) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(
+            label, {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "wait_seconds": 0.0}
+        )
+        entry["calls"] += 1
+        entry["total_seconds"] += duration
+        entry["max_seconds"] = max(entry["max_seconds"], duration)
+        entry["wait_seconds"] += waited
+    if LOOP_DEBUG and duration * 1000 >= LOOP_SLOW_CALLBACK_MS:
+        print(f"[EXECUTOR] {label} ran {duration * 1000:.0f} ms off the event loop (queued {waited * 1000:.0f} ms)")
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, label: Optional[str] = None, **kwargs: Any) -> Any:
+    """Run a sync callable on the blocking-work pool and await its result.
+
+    Args:
+        func: Blocking function to call
+        *args: Positional arguments for func
+        label: Name used for timing stats (defaults to the function name)
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns (exceptions propagate to the caller)
+    """
+    label = label or getattr(func, "__name__", "call")
+    submitted = time.perf_counter()
+
+    def timed() -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(label, time.perf_counter() - started, started - submitted)
+
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), timed)
+
+
+def get_offload_stats() -> Dict[str, Dict[str, float]]:
+    """Return a snapshot of per-label timing stats for offloaded calls."""
+    with _stats_lock:
+        return {label: dict(entry) for label, entry in _stats.items()}
+
+
+def enable_loop_debug(loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+    """Turn on asyncio debug mode when LOOP_DEBUG is set.
+
+    asyncio then logs every callback or task step that holds the loop for
+    longer than LOOP_SLOW_CALLBACK_MS, which pinpoints remaining blocking calls.
+
+    Returns:
+        True if debug mode was enabled
+    """
+    if not LOOP_DEBUG:
+        return False
+    loop = loop or asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = LOOP_SLOW_CALLBACK_MS / 1000
+    asyncio_logger = logging.getLogger("asyncio")
+    asyncio_logger.setLevel(logging.WARNING)
+    if not asyncio_logger.handlers and not logging.getLogger().handlers:
+        asyncio_logger.addHandler(logging.StreamHandler())
+    print(f"Event loop debug enabled (slow callback threshold {LOOP_SLOW_CALLBACK_MS} ms)")
+    return True
+
+
+def shutdown_executor() -> None:
+    """Release the pool; running calls finish in the background and the next call starts a new one."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
@@ -0,0 +1,158 @@
+"""
+Per-deployment log storage for Azure AI Multi-Environment Manager.
+
+Every log line is appended to ``deployment_states/<id>/deployment.log`` and its
+end offset to a fixed-width index file, so any line range can be read back by
+seeking. Only a small ring of recent lines is kept in memory, and only while
+the deployment is active.
+"""
+import os
+import struct
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config import DEPLOYMENT_STATES_DIR, LOG_FILE_NAME, LOG_MEMORY_LINES
+
+_OFFSET = struct.Struct("<Q")
+
+
+class DeploymentLog:
+    """Append-only, line-indexed log file with an in-memory ring of recent lines.
+
+    The index file stores the end offset of each line as a little-endian
+    uint64, so line ``n`` spans ``[end[n-1], end[n])`` in the log file.
+    """
+
+    def __init__(self, deployment_dir: Path, ring_size: int = LOG_MEMORY_LINES):
+        self.log_path = deployment_dir / LOG_FILE_NAME
+        self.index_path = deployment_dir / f"{LOG_FILE_NAME}.idx"
+        self._lock = threading.Lock()
+        self._ring: deque = deque(maxlen=ring_size)
+        self._log_file = None
+        self._index_file = None
+        self._load()
+
+    def _load(self) -> None:
+        index_size = self.index_path.stat().st_size if self.index_path.exists() else 0
+        self.total = index_size // _OFFSET.size
+        self._size = self._end_offset(self.total - 1) if self.total else 0
+        if self._ring.maxlen and self.total:
+            first = max(0, self.total - self._ring.maxlen)
+            self._ring.extend(self._read_from_disk(first, self.total))
+
+    def _end_offset(self, seq: int) -> int:
+        with open(self.index_path, "rb") as f:
+            f.seek(seq * _OFFSET.size)
+            return _OFFSET.unpack(f.read(_OFFSET.size))[0]
+
+    def _open_for_append(self) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_file = open(self.log_path, "ab")
+        # Drop bytes written after the last indexed line (interrupted append)
+        if self._log_file.tell() != self._size:
+            self._log_file.truncate(self._size)
+            self._log_file.seek(self._size)
+        self._index_file = open(self.index_path, "ab")
+        if self._index_file.tell() != self.total * _OFFSET.size:
+            self._index_file.truncate(self.total * _OFFSET.size)
+            self._index_file.seek(self.total * _OFFSET.size)
+
+    def append(self, line: str) -> int:
+        """Append one line and return its sequence number."""
+        data = (line + "\n").encode("utf-8", errors="replace")
+        with self._lock:
+            if self._log_file is None:
+                self._open_for_append()
+            self._log_file.write(data)
+            self._log_file.flush()
+            self._size += len(data)
+            # Index entry is written after the data so a crash never indexes missing bytes
+            self._index_file.write(_OFFSET.pack(self._size))
+            self._index_file.flush()
+            self._ring.append(line)
+            seq = self.total
+            self.total += 1
+            return seq
+
+    def read(self, start: int = 0, limit: Optional[int] = None) -> List[str]:
+        """Return up to ``limit`` lines starting at sequence number ``start``."""
+        with self._lock:
+            start = max(0, start)
+            stop = self.total if limit is None else min(self.total, start + limit)
+            if start >= stop:
+                return []
+            ring_start = self.total - len(self._ring)
+            if start >= ring_start:
+                return list(self._ring)[start - ring_start:stop - ring_start]
+            return self._read_from_disk(start, stop)
+
+    def _read_from_disk(self, start: int, stop: int) -> List[str]:
+        with open(self.index_path, "rb") as f:
+            f.seek(max(0, start - 1) * _OFFSET.size)
+            raw = f.read((stop - max(0, start - 1)) * _OFFSET.size)
+        offsets = [value for (value,) in _OFFSET.iter_unpack(raw)]
+        if start == 0:
+            offsets.insert(0, 0)
+        with open(self.log_path, "rb") as f:
+            f.seek(offsets[0])
+            blob = f.read(offsets[-1] - offsets[0])
+        base = offsets[0]
+        return [
+            blob[begin - base:end - base - 1].decode("utf-8", errors="replace")
+            for begin, end in zip(offsets, offsets[1:])
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in (self._log_file, self._index_file):
+                if handle is not None:
+                    handle.close()
+            self._log_file = self._index_file = None
+
+    def reset(self) -> None:
+        """Start a fresh log, keeping the previous one as ``<name>.1``."""
+        with self._lock:
+            for handle in (self._log_file, self._index_file):
+                if handle is not None:
+                    handle.close()
+            self._log_file = self._index_file = None
+            for path in (self.log_path, self.index_path):
+                if path.exists():
+                    os.replace(path, path.with_name(path.name + ".1"))
+            self._ring.clear()
+            self.total = 0
+            self._size = 0
+
+
+# Logs of deployments that are currently being written (create/destroy in progress)
+_active_logs: Dict[str, DeploymentLog] = {}
+_registry_lock = threading.Lock()
+
+
+def get_deployment_log(deployment_id: str) -> DeploymentLog:
+    """Return the active log for a deployment, opening it if needed."""
+    with _registry_lock:
+        log = _active_logs.get(deployment_id)
+        if log is None:
+            log = DeploymentLog(DEPLOYMENT_STATES_DIR / deployment_id)
+            _active_logs[deployment_id] = log
+        return log
+
+
+def read_deployment_log(deployment_id: str, start: int = 0, limit: Optional[int] = None) -> List[str]:
+    """Read log lines of any deployment, active or historic."""
+    with _registry_lock:
+        log = _active_logs.get(deployment_id)
+    if log is None:
+        log = DeploymentLog(DEPLOYMENT_STATES_DIR / deployment_id, ring_size=0)
+    return log.read(start, limit)
+
+
+def release_deployment_log(deployment_id: str) -> None:
+    """Close file handles and drop the in-memory ring once a run has finished."""
+    with _registry_lock:
+        log = _active_logs.pop(deployment_id, None)
+    if log is not None:
+        log.close()
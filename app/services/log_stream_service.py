@@ -0,0 +1,220 @@
+"""
+Log streaming service for Azure AI Multi-Environment Manager.
+
+Provides a per-deployment broadcast hub: persistence_service.append_log
+publishes each new line once and every connected WebSocket subscriber
+receives it through its own bounded queue, without polling. Lines are
+delivered to browsers as batched frames addressed by sequence number.
+"""
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from ..config import (
+    WEBSOCKET_BATCH_INTERVAL,
+    WEBSOCKET_BATCH_MAX_LINES,
+    WEBSOCKET_SUBSCRIBER_QUEUE_SIZE,
+)
+from .executor_service import run_blocking
+from .serialization import get_serializer
+
+# Queue item sequence number announcing that the deployment's log restarted at 0
+RESET_SEQ = -1
+
+
+class LogSubscriber:
+    """A single watcher of a deployment log stream.
+
+    Slow-consumer policy: when the queue is full, new lines are dropped for
+    this subscriber only and counted in ``dropped``. Every line carries its
+    sequence number, so the reader repairs the gap from the log history once
+    it has drained its queue. A log reset is never dropped: it discards the
+    queued lines of the old log and is queued as ``(RESET_SEQ, "")``.
+    """
+
+    def __init__(self, deployment_id: str, maxsize: int):
+        self.deployment_id = deployment_id
+        self.queue: "asyncio.Queue[Tuple[int, str]]" = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def offer(self, seq: int, line: str) -> None:
+        """Enqueue a line without blocking the publisher (drops when full)."""
+        try:
+            self.queue.put_nowait((seq, line))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def offer_reset(self) -> None:
+        """Replace everything queued with a reset marker (the old log's lines are obsolete)."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.dropped = 0
+        self.queue.put_nowait((RESET_SEQ, ""))
+
+
+class LogBroadcastHub:
+    """Fan out appended log lines to all subscribers of a deployment."""
+
+    def __init__(self, queue_size: int = WEBSOCKET_SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[LogSubscriber]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, deployment_id: str) -> LogSubscriber:
+        """Register a new subscriber; must be called from the event loop."""
+        subscriber = LogSubscriber(deployment_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(deployment_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: LogSubscriber) -> None:
+        with self._lock:
+            watchers = self._subscribers.get(subscriber.deployment_id)
+            if watchers is not None:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._subscribers[subscriber.deployment_id]
+
+    def subscriber_count(self, deployment_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(deployment_id, ()))
+
+    def total_subscribers(self) -> int:
+        with self._lock:
+            return sum(len(watchers) for watchers in self._subscribers.values())
+
+    def publish(self, deployment_id: str, seq: int, line: str) -> None:
+        """Deliver one log line to every subscriber of the deployment.
+
+        Safe to call from the event loop or from worker threads; off-loop
+        calls are handed over with call_soon_threadsafe.
+        """
+        self._deliver(deployment_id, lambda subscriber: subscriber.offer(seq, line))
+
+    def publish_reset(self, deployment_id: str) -> None:
+        """Tell every subscriber the deployment's log restarted at sequence 0."""
+        self._deliver(deployment_id, lambda subscriber: subscriber.offer_reset())
+
+    def _deliver(self, deployment_id: str, offer: Callable[[LogSubscriber], None]) -> None:
+        with self._lock:
+            watchers = list(self._subscribers.get(deployment_id, ()))
+        if not watchers:
+            return
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscriber in watchers:
+            if subscriber.loop is current_loop:
+                offer(subscriber)
+            else:
+                subscriber.loop.call_soon_threadsafe(offer, subscriber)
+
+
+# Process-wide hub used by persistence_service.append_log and the WebSocket route
+log_hub = LogBroadcastHub()
+
+
+async def stream_deployment_logs(
+    websocket: WebSocket,
+    deployment_id: str,
+    read_logs: Callable[[str, int, Optional[int]], List[str]],
+    since: int = 0,
+) -> None:
+    """Send log lines from ``since`` onwards as batched JSON frames, then keep pushing.
+
+    Lines are coalesced until WEBSOCKET_BATCH_MAX_LINES are pending or
+    WEBSOCKET_BATCH_INTERVAL has elapsed since the first pending line.
+    Each frame is ``{"type": "logs", "seq": <first line seq>, "next": <cursor>,
+    "lines": [...]}``; clients reconnect with ``?since=<next>`` to resume.
+    A ``{"type": "reset"}`` frame tells the client its cursor is beyond the
+    current log (e.g. logs were cleared for a destroy, before or while it was
+    connected) and the lines that follow start again at 0.
+
+    Args:
+        websocket: Accepted WebSocket connection
+        deployment_id: Unique deployment identifier
+        read_logs: Blocking function returning up to ``limit`` log lines of a deployment from a
+            start index (run on the blocking-work pool)
+        since: Sequence number of the first line the client has not seen yet
+    """
+    subscriber = log_hub.subscribe(deployment_id)
+    loop = asyncio.get_running_loop()
+    pending: List[str] = []
+    first_seq = next_seq = max(0, since)
+
+    async def flush() -> None:
+        nonlocal first_seq
+        if pending:
+            await websocket.send_text(get_serializer().dumps({
+                "type": "logs",
+                "seq": first_seq,
+                "next": first_seq + len(pending),
+                "lines": pending,
+            }).decode())
+            pending.clear()
+        first_seq = next_seq
+
+    async def add_history(until: Optional[int] = None) -> None:
+        # Replays lines [next_seq, until) from the log history in full-size frames
+        nonlocal next_seq
+        while until is None or next_seq < until:
+            if len(pending) >= WEBSOCKET_BATCH_MAX_LINES:
+                await flush()
+            limit = WEBSOCKET_BATCH_MAX_LINES - len(pending)
+            if until is not None:
+                limit = min(limit, until - next_seq)
+            lines = await run_blocking(read_logs, deployment_id, next_seq, limit, label="log_history")
+            if not lines:
+                return
+            pending.extend(lines)
+            next_seq += len(lines)
+
+    async def reset() -> None:
+        nonlocal first_seq, next_seq
+        pending.clear()
+        await websocket.send_text(get_serializer().dumps({"type": "reset"}).decode())
+        first_seq = next_seq = 0
+
+    async def add(seq: int, line: str) -> None:
+        nonlocal next_seq
+        if seq == RESET_SEQ:
+            await reset()
+            return
+        if seq < next_seq:
+            return  # Already delivered by a history replay
+        if seq > next_seq:
+            await add_history(seq)
+        pending.append(line)
+        next_seq = seq + 1
+
+    try:
+        # Subscribe first, then replay, so nothing published in between is lost
+        if since > 0 and not await run_blocking(read_logs, deployment_id, since - 1, 1, label="log_history"):
+            await reset()
+        await add_history()
+        await flush()
+        while True:
+            await add(*await subscriber.queue.get())
+            deadline = loop.time() + WEBSOCKET_BATCH_INTERVAL
+            while len(pending) < WEBSOCKET_BATCH_MAX_LINES:
+                if subscriber.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(subscriber.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = subscriber.queue.get_nowait()
+                await add(*item)
+            if subscriber.dropped and subscriber.queue.empty():
+                subscriber.dropped = 0
+                await add_history()
+            await flush()
+    finally:
+        log_hub.unsubscribe(subscriber)
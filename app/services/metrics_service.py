@@ -0,0 +1,254 @@
+"""
+Metrics service for Azure AI Multi-Environment Manager.
+
+Process-wide counters and histograms rendered in the Prometheus text
+exposition format by the /metrics route (no client library needed).
+Recording is a dictionary update under a lock, so instrumentation stays on in
+production. Values that mirror live state (scheduler queue, WebSocket
+subscribers, offloaded-call stats) are read from callbacks at scrape time
+instead of being tracked separately.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..config import METRICS_LOOP_LAG_INTERVAL
+from .executor_service import get_offload_stats
+from .log_stream_service import log_hub
+from .scheduler_service import deployment_scheduler
+
+# Seconds; phases range from sub-second cache hits to half-hour applies
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (count, sum and bucket counts)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = PHASE_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            entry[index] += 1
+            entry[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the with-block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: list(entry) for key, entry in self._values.items()}
+        lines = []
+        for key, entry in sorted(values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are read from a callback at scrape time.
+
+    The callback returns ``{label values tuple: value}`` (an empty tuple for
+    an unlabelled metric).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+
+    def samples(self) -> List[str]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            print(f"Metric {self.name} callback failed: {e}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+_registry: List = []
+
+
+def register(metric):
+    """Add a metric to the /metrics output and return it."""
+    _registry.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# Orchestration hot paths
+DEPLOYMENT_PHASE_SECONDS = register(Histogram(
+    "aienv_deployment_phase_seconds",
+    "Duration of deployment and destroy workflow phases.",
+    ["phase"],
+))
+TERRAFORM_COMMANDS = register(Counter(
+    "aienv_terraform_commands_total",
+    "Terraform command runs by subcommand and result (retries of one command count once).",
+    ["command", "result"],
+))
+TERRAFORM_RETRIES = register(Counter(
+    "aienv_terraform_retries_total",
+    "Terraform command retries by subcommand and reason.",
+    ["command", "reason"],
+))
+SAVE_STATE_SECONDS = register(Histogram(
+    "aienv_save_deployment_state_seconds",
+    "Time to write deployment metadata and upsert its index row.",
+    buckets=FAST_BUCKETS,
+))
+EVENT_LOOP_LAG_SECONDS = register(Histogram(
+    "aienv_event_loop_lag_seconds",
+    f"Delay of a {METRICS_LOOP_LAG_INTERVAL:g}s timer beyond its deadline.",
+    buckets=FAST_BUCKETS,
+))
+
+# Live state, read at scrape time
+register(CallbackMetric(
+    "aienv_deployments_queued",
+    "Deployments and destroys waiting for a scheduler slot.",
+    lambda: {(): deployment_scheduler.queued_count},
+))
+register(CallbackMetric(
+    "aienv_deployments_running",
+    "Deployments and destroys holding a scheduler slot.",
+    lambda: {(): deployment_scheduler.running_count},
+))
+register(CallbackMetric(
+    "aienv_websocket_subscribers",
+    "Connected WebSocket log stream subscribers.",
+    lambda: {(): log_hub.total_subscribers()},
+))
+register(CallbackMetric(
+    "aienv_blocking_calls_total",
+    "Calls offloaded to the blocking-work pool by label.",
+    lambda: {(label,): entry["calls"] for label, entry in get_offload_stats().items()},
+    ["label"], kind="counter",
+))
+register(CallbackMetric(
+    "aienv_blocking_call_seconds_total",
+    "Time spent in offloaded calls by label.",
+    lambda: {(label,): entry["total_seconds"] for label, entry in get_offload_stats().items()},
+    ["label"], kind="counter",
+))
+register(CallbackMetric(
+    "aienv_blocking_call_wait_seconds_total",
+    "Time offloaded calls waited for a free worker, by label.",
+    lambda: {(label,): entry["wait_seconds"] for label, entry in get_offload_stats().items()},
+    ["label"], kind="counter",
+))
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    DEPLOYMENT_PHASE_SECONDS.observe(seconds, phase=phase)
+
+
+async def run_loop_lag_monitor(interval: Optional[float] = None) -> None:
+    """Record how late a periodic timer fires (runs until cancelled)."""
+    interval = interval or METRICS_LOOP_LAG_INTERVAL
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - interval))
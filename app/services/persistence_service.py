@@ -2,65 +2,43 @@
 Persistence service for Azure AI Multi-Environment Manager.
 
 This service handles all storage operations including deployment state management,
-metadata persistence, and the central deployments database.
+metadata persistence, and the central deployments index (see storage_backend).
 """
-import json
+import asyncio
+import copy
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
-# Import constants - avoiding circular import
-from pathlib import Path
-
-# Constants (copied from main to avoid circular imports)
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-TERRAFORM_DIR = BASE_DIR / "terraform"
-DEPLOYMENT_STATES_DIR = BASE_DIR / "deployment_states"
-DEPLOYMENTS_DB_FILE = DEPLOYMENT_STATES_DIR / "deployments.json"
-
-
-def load_deployments_db() -> Dict:
-    """Load deployments database from persistent storage"""
-    try:
-        if DEPLOYMENTS_DB_FILE.exists():
-            with open(DEPLOYMENTS_DB_FILE, 'r') as f:
-                return json.load(f)
-        else:
-            # Create initial structure
-            initial_db = {
-                "deployments": {},
-                "metadata": {
-                    "version": "1.0", 
-                    "created": "2025-09-23T09:50:00Z",
-                    "description": "Multi-Environment Manager - Deployment Database"
-                }
-            }
-            save_deployments_db(initial_db)
-            return initial_db
-    except Exception as e:
-        print(f"Error loading deployments database: {e}")
-        return {"deployments": {}, "metadata": {}}
-
-
-def save_deployments_db(db: Dict) -> None:
-    """Save deployments database to persistent storage"""
-    try:
-        DEPLOYMENT_STATES_DIR.mkdir(exist_ok=True)
-        with open(DEPLOYMENTS_DB_FILE, 'w') as f:
-            json.dump(db, f, indent=2)
-    except Exception as e:
-        print(f"Error saving deployments database: {e}")
+from ..config import DEPLOYMENT_STATES_DIR, TERRAFORM_DIR
+from ..models.deployment import DeploymentState
+from .log_store import (
+    DeploymentLog, get_deployment_log, read_deployment_log, release_deployment_log
+)
+from .log_stream_service import log_hub
+from .executor_service import run_blocking
+from .metrics_service import SAVE_STATE_SECONDS
+from .serialization import read_json_file, write_json_file
+# Pluggable JSON implementation, re-exported for callers of the persistence layer
+from .serialization import Serializer, get_serializer, set_serializer  # noqa: F401
+from .storage_backend import get_index_backend
+from .timeline_service import phase_totals
 
 
-def save_deployment_state(deployment_id: str, deployment_data: Dict, outputs: Optional[Dict] = None) -> None:
-    """Persist deployment runtime + outputs to disk and index file.
+def save_deployment_state(deployment_id: str, deployment_data: DeploymentState, outputs: Optional[Dict] = None) -> None:
+    """Persist deployment runtime + outputs to disk and upsert its index row.
 
     Args:
         deployment_id: Unique deployment identifier
-        deployment_data: Complete deployment state dictionary  
+        deployment_data: Complete deployment record
         outputs: Optional outputs dict to override deployment_data['outputs']
     """
+    with SAVE_STATE_SECONDS.time():
+        _save_deployment_state(deployment_id, deployment_data, outputs)
+
+
+def _save_deployment_state(deployment_id: str, deployment_data: DeploymentState, outputs: Optional[Dict] = None) -> None:
     try:
         ts = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
         deployment_dir = DEPLOYMENT_STATES_DIR / deployment_id
@@ -80,38 +58,67 @@ def save_deployment_state(deployment_id: str, deployment_data: Dict, outputs: Op
         # Check for terraform state in deployment directory instead of shared directory
         deployment_state = deployment_dir / "terraform.tfstate"
         
+        # Logs live in the per-deployment log file (log_store), never in metadata;
+        # outputs are stored once, at the top level. Nested records are encoded
+        # by the serializer (natively with orjson) rather than via to_dict().
         metadata = {
             "deployment_id": deployment_id,
-            "deployment_data": deployment_data,
+            "deployment_data": deployment_data.to_shallow_dict(exclude=("outputs",)),
             "outputs": effective_outputs,
             "saved_at": ts,
             "has_state": deployment_state.exists(),
             "status": deployment_data.get("status", "unknown")
         }
 
-        # Save metadata to deployment directory
-        with open(deployment_dir / "metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=2)
+        # Save metadata to deployment directory (atomic replace so readers never see a partial file)
+        write_json_file(deployment_dir / "metadata.json", metadata)
 
-        # Update central deployments database
-        db = load_deployments_db()
-        db["deployments"][deployment_id] = {
+        # Upsert this deployment's row in the central index (backend keeps first created_at)
+        get_index_backend().upsert({
             "id": deployment_id,
-            "name": deployment_data.get("params", {}).get("resource_group_base", "Unknown"),
+            "name": deployment_data.params.resource_group_base,
             "status": deployment_data.get("status", "unknown"),
-            # Keep first created_at if present, else set now
-            "created_at": db.get("deployments", {}).get(deployment_id, {}).get("created_at") or ts,
+            "created_at": ts,
+            "updated_at": ts,
             "has_state": deployment_state.exists(),
             "outputs_available": bool(effective_outputs),
-            "region": deployment_data.get("params", {}).get("location", "unknown"),
-            "include_search": deployment_data.get("params", {}).get("include_search", False),
-            "resource_names": deployment_data.get("names", {})
-        }
-        save_deployments_db(db)
+            "region": deployment_data.params.location,
+            "include_search": deployment_data.params.include_search,
+            "resource_names": deployment_data.names,
+            "batch_id": deployment_data.get("batch_id"),
+            "bulk_id": deployment_data.get("bulk_id"),
+            "module_version": deployment_data.get("module_version"),
+            "warm_pool": deployment_data.get("warm_pool"),
+            "expires_at": deployment_data.get("expires_at"),
+            "model": deployment_data.params.openai_model_name,
+            "phase_seconds": phase_totals(deployment_data.get("timeline", [])) or None,
+        })
     except Exception as e:
         print(f"Error saving deployment state for {deployment_id}: {e}")
 
 
+# Per-deployment locks keep offloaded saves of the same record in submission order
+_save_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def save_deployment_state_async(deployment_id: str, deployment_data: DeploymentState, outputs: Optional[Dict] = None) -> None:
+    """Non-blocking save_deployment_state for use inside async workflows.
+
+    The record is snapshotted on the event loop (running tasks keep mutating
+    it) and the JSON dump plus index upsert run on the blocking-work pool.
+
+    Args:
+        deployment_id: Unique deployment identifier
+        deployment_data: Complete deployment record
+        outputs: Optional outputs dict to override deployment_data['outputs']
+    """
+    snapshot = copy.deepcopy(deployment_data)
+    outputs_snapshot = copy.deepcopy(outputs) if outputs is not None else None
+    lock = _save_locks.setdefault(deployment_id, asyncio.Lock())
+    async with lock:
+        await run_blocking(save_deployment_state, deployment_id, snapshot, outputs_snapshot, label="save_deployment_state")
+
+
 def load_deployment_state(deployment_id: str) -> Dict:
     """Load deployment state from persistent storage
     
@@ -128,37 +135,112 @@ def load_deployment_state(deployment_id: str) -> Dict:
         
         metadata_file = deployment_dir / "metadata.json"
         if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                return json.load(f)
+            return read_json_file(metadata_file)
         return {}
     except Exception as e:
         print(f"Error loading deployment state for {deployment_id}: {e}")
         return {}
 
 
+def load_deployment_record(deployment_id: str) -> Optional[DeploymentState]:
+    """Load the full runtime record of one deployment from its metadata.json
+    
+    Args:
+        deployment_id: Unique deployment identifier
+        
+    Returns:
+        Deployment record or None if not persisted (or unreadable)
+    """
+    metadata = load_deployment_state(deployment_id)
+    if not metadata or "deployment_data" not in metadata:
+        return None
+    data = metadata["deployment_data"]
+    _migrate_inline_logs(deployment_id, data.pop("logs", None))
+    # Older metadata.json files also kept a copy of the outputs inside deployment_data
+    data.setdefault("outputs", metadata.get("outputs") or {})
+    try:
+        return DeploymentState.from_dict(data)
+    except (TypeError, ValueError) as e:
+        print(f"Error loading deployment record for {deployment_id}: {e}")
+        return None
+
+
 def get_all_deployments() -> Dict:
-    """Get list of all deployments from database
+    """Get list of all deployments from the central index
+    
+    Returns:
+        Dictionary of deployment summaries keyed by deployment_id
+    """
+    try:
+        return get_index_backend().list_all()
+    except Exception as e:
+        print(f"Error loading deployments index: {e}")
+        return {}
+
+
+def query_deployments(
+    status: Optional[str] = None,
+    region: Optional[str] = None,
+    created_before: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    warm_pool: Optional[str] = None,
+    expires_before: Optional[str] = None,
+    statuses: Optional[Iterable[str]] = None,
+    bulk_id: Optional[str] = None,
+    deployment_ids: Optional[Iterable[str]] = None,
+) -> Dict:
+    """Get deployment summaries matching index filters
     
+    Args:
+        status: Only deployments with this status
+        region: Only deployments in this region
+        created_before: Only deployments created before this ISO timestamp
+        batch_id: Only deployments created by this batch
+        warm_pool: Only members of this warm pool
+        expires_before: Only deployments with an expiry before this UTC timestamp
+        statuses: Only deployments with one of these statuses
+        bulk_id: Only deployments queued by this bulk destroy
+        deployment_ids: Only these deployments
+        
     Returns:
         Dictionary of deployment summaries keyed by deployment_id
     """
-    db = load_deployments_db()
-    return db.get("deployments", {})
+    try:
+        return get_index_backend().query(
+            status=status, region=region, created_before=created_before, batch_id=batch_id,
+            warm_pool=warm_pool, expires_before=expires_before, statuses=statuses,
+            bulk_id=bulk_id, deployment_ids=deployment_ids
+        )
+    except Exception as e:
+        print(f"Error querying deployments index: {e}")
+        return {}
+
+
+def count_deployments() -> int:
+    """Count deployments in the central index without loading any records
+    
+    Returns:
+        Number of indexed deployments
+    """
+    try:
+        return get_index_backend().count()
+    except Exception as e:
+        print(f"Error counting deployments: {e}")
+        return 0
 
 
-def load_all_deployments() -> Dict[str, Dict]:
+def load_all_deployments() -> Dict[str, DeploymentState]:
     """Load all deployments with full state from persistent storage
     
     Returns:
-        Dictionary of full deployment data keyed by deployment_id
+        Dictionary of full deployment records keyed by deployment_id
     """
     deployments = {}
     try:
-        db = load_deployments_db()
-        for deployment_id in db.get("deployments", {}):
-            metadata = load_deployment_state(deployment_id)
-            if metadata and "deployment_data" in metadata:
-                deployments[deployment_id] = metadata["deployment_data"]
+        for deployment_id in get_index_backend().list_all():
+            data = load_deployment_record(deployment_id)
+            if data is not None:
+                deployments[deployment_id] = data
         return deployments
     except Exception as e:
         print(f"Error loading all deployments: {e}")
@@ -190,41 +272,62 @@ def get_deployment_directory(deployment_id: str) -> Path:
     return DEPLOYMENT_STATES_DIR / deployment_id
 
 
+def _migrate_inline_logs(deployment_id: str, logs: Optional[list]) -> None:
+    """Move logs stored inside legacy metadata.json files into the log file."""
+    if not logs:
+        return
+    log = DeploymentLog(DEPLOYMENT_STATES_DIR / deployment_id, ring_size=0)
+    if log.total == 0:
+        for line in logs:
+            log.append(line)
+    log.close()
+
+
 def append_log(deployment_id: str, line: str) -> None:
-    """Append a log line to the deployment logs
+    """Append a log line to the deployment log file and notify live watchers
     
     Args:
         deployment_id: Unique deployment identifier
         line: Log line to append
-        
-    Note:
-        This function works with the global DEPLOYMENTS dict from main.py
-        It's a bridge function to maintain compatibility during refactoring
     """
-    # Import here to avoid circular import
-    from ..main import DEPLOYMENTS
-    
-    if deployment_id in DEPLOYMENTS:
-        DEPLOYMENTS[deployment_id]["logs"].append(line)
-    else:
-        # If deployment not in memory, we could log to file or ignore
-        # For now, we'll just pass since this shouldn't happen in normal flow
-        pass
+    seq = get_deployment_log(deployment_id).append(line)
+    # Push to live WebSocket watchers
+    log_hub.publish(deployment_id, seq, line)
 
 
-def get_deployment_logs(deployment_id: str) -> list:
-    """Get all logs for a deployment
+def get_deployment_logs(deployment_id: str, start: int = 0, limit: Optional[int] = None) -> list:
+    """Get logs for a deployment
     
     Args:
         deployment_id: Unique deployment identifier
+        start: Sequence number of the first line to return
+        limit: Maximum number of lines to return (all remaining if None)
         
     Returns:
-        List of log lines
+        List of log lines from ``start`` onwards
     """
-    # Import here to avoid circular import
-    from ..main import DEPLOYMENTS
+    try:
+        return read_deployment_log(deployment_id, start, limit)
+    except Exception as e:
+        print(f"Error reading logs for {deployment_id}: {e}")
+        return []
+
+
+def reset_deployment_logs(deployment_id: str) -> None:
+    """Start a new log for a deployment (previous run kept as deployment.log.1)
     
-    if deployment_id in DEPLOYMENTS:
-        return DEPLOYMENTS[deployment_id].get("logs", [])
-    else:
-        return []
\ No newline at end of file
+    Args:
+        deployment_id: Unique deployment identifier
+    """
+    get_deployment_log(deployment_id).reset()
+    # Connected watchers restart their cursor at 0, otherwise the new log's lines look already delivered
+    log_hub.publish_reset(deployment_id)
+
+
+def release_deployment_logs(deployment_id: str) -> None:
+    """Close a deployment's log file and free its in-memory buffer after a run
+    
+    Args:
+        deployment_id: Unique deployment identifier
+    """
+    release_deployment_log(deployment_id)
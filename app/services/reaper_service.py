@@ -0,0 +1,134 @@
+"""
+Expiry reaper for Azure AI Multi-Environment Manager.
+
+Deployments may carry an ``expires_at`` timestamp (set at deploy time or from
+DEFAULT_DEPLOYMENT_TTL_HOURS). A background task scans the index for expired
+environments in a reapable status (an indexed range query, no records are
+loaded for the scan) and queues destroys for them, at most
+REAPER_MAX_CONCURRENT_DESTROYS at a time. Expiry times are UTC in the
+created_at format ("%Y-%m-%dT%H:%M:%SZ"), so they compare as strings.
+
+Destroys started by the reaper are recorded in REAPER_STATE_FILE before they
+are queued. After a restart, a recorded destroy that is no longer on the
+scheduler is resumed once instead of being picked up again as a new
+expiry, so no environment is destroyed twice.
+"""
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from ..config import (
+    REAPER_FAST_DESTROY, REAPER_INTERVAL, REAPER_MAX_CONCURRENT_DESTROYS, REAPER_STATE_FILE
+)
+from ..models.deployment import DeploymentStatus
+from .deployment_service import enqueue_destroy
+from .executor_service import run_blocking
+from .persistence_service import (
+    append_log, query_deployments, reset_deployment_logs, save_deployment_state_async
+)
+from .scheduler_service import deployment_scheduler
+from .serialization import read_json_file, write_json_file
+
+# Expired environments in these statuses are destroyed (anything else is busy or gone)
+REAPABLE_STATUSES = {DeploymentStatus.COMPLETED, DeploymentStatus.ERROR, DeploymentStatus.WARM}
+# Statuses that end a reaper destroy
+FINISHED_STATUSES = {DeploymentStatus.DESTROYED, DeploymentStatus.DESTROY_ERROR}
+
+
+def load_reaper_state(state_file: Path = REAPER_STATE_FILE) -> Dict[str, Any]:
+    """Read the persisted reaper state ({"in_flight": {deployment_id: info}, "last_scan": ...})."""
+    try:
+        if state_file.exists():
+            state = read_json_file(state_file)
+            state.setdefault("in_flight", {})
+            return state
+    except Exception as e:
+        print(f"Error loading reaper state: {e}")
+    return {"in_flight": {}, "last_scan": None}
+
+
+def save_reaper_state(state: Dict[str, Any], state_file: Path = REAPER_STATE_FILE) -> None:
+    """Write the reaper state atomically (temp file + rename)."""
+    state_file.parent.mkdir(exist_ok=True)
+    write_json_file(state_file, state)
+
+
+# Scans run from the background loop; the lock keeps manual triggers from overlapping it
+_reap_lock = asyncio.Lock()
+
+
+async def reap_expired_deployments(
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> int:
+    """Queue destroys for expired deployments, resuming interrupted ones first.
+
+    Args:
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+
+    Returns:
+        Number of destroys queued (new and resumed)
+    """
+    async with _reap_lock:
+        state = await run_blocking(load_reaper_state, label="reaper_state")
+        in_flight: Dict[str, Dict] = state["in_flight"]
+        now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        queued = 0
+
+        for deployment_id in list(in_flight):
+            record = await deployments.aget(deployment_id)
+            if not record or record.get("status") in FINISHED_STATUSES:
+                in_flight.pop(deployment_id)
+            elif not (deployment_scheduler.is_running(deployment_id) or deployment_scheduler.position(deployment_id)):
+                # Destroy was lost with a restart; resume it instead of starting a second one
+                append_log(deployment_id, "[REAPER] Resuming destroy interrupted by a restart")
+                enqueue_destroy(
+                    deployment_id, deployments, deployment_states_dir, terraform_dir, fast=REAPER_FAST_DESTROY
+                )
+                queued += 1
+
+        for deployment_id, row in query_deployments(expires_before=now, statuses=REAPABLE_STATUSES).items():
+            if REAPER_MAX_CONCURRENT_DESTROYS and len(in_flight) >= REAPER_MAX_CONCURRENT_DESTROYS:
+                break
+            if deployment_id in in_flight or not row.get("has_state"):
+                continue
+            if deployment_scheduler.is_running(deployment_id) or deployment_scheduler.position(deployment_id):
+                continue
+            record = await deployments.aget(deployment_id)
+            if not record:
+                continue
+            in_flight[deployment_id] = {"expires_at": row.get("expires_at"), "queued_at": now}
+            # Persist before queueing so a crash in between cannot lead to a second destroy
+            await run_blocking(save_reaper_state, state, label="reaper_state")
+            record["status"] = DeploymentStatus.DESTROYING
+            reset_deployment_logs(deployment_id)  # Start a fresh log (previous one archived)
+            append_log(deployment_id, f"[REAPER] Environment expired at {row.get('expires_at')}, destroying")
+            await save_deployment_state_async(deployment_id, record)
+            enqueue_destroy(
+                deployment_id, deployments, deployment_states_dir, terraform_dir, fast=REAPER_FAST_DESTROY
+            )
+            queued += 1
+
+        state["last_scan"] = now
+        await run_blocking(save_reaper_state, state, label="reaper_state")
+        return queued
+
+
+async def run_reaper(
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> None:
+    """Scan for expired deployments every REAPER_INTERVAL seconds (runs until cancelled)."""
+    while True:
+        try:
+            queued = await reap_expired_deployments(deployments, deployment_states_dir, terraform_dir)
+            if queued:
+                print(f"Reaper: queued {queued} destroys of expired deployments")
+        except Exception as e:
+            print(f"Reaper scan failed: {e}")
+        await asyncio.sleep(REAPER_INTERVAL)
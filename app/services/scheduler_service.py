@@ -0,0 +1,157 @@
+"""
+Deployment scheduler for Azure AI Multi-Environment Manager.
+
+Bounds how many terraform runs execute at once (globally, per subscription
+and per region) so bursts of deploy requests queue up instead of triggering
+Azure 409/429 throttling. Jobs wait in a priority queue (FIFO within the same
+priority) and are handed to workers as soon as a slot frees up.
+"""
+import asyncio
+import bisect
+import itertools
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from ..config import (
+    MAX_CONCURRENT_DEPLOYMENTS,
+    MAX_DEPLOYMENTS_PER_REGION,
+    MAX_DEPLOYMENTS_PER_SUBSCRIPTION,
+)
+
+# Lower value runs first; destroys free quota so they go ahead of new deploys
+PRIORITY_DESTROY = 0
+PRIORITY_DEPLOY = 10
+# Warm pool refills only use slots no user request is waiting for
+PRIORITY_WARM_POOL = 20
+
+
+@dataclass(order=True)
+class ScheduledJob:
+    """A queued unit of work (one deployment or destroy run)."""
+    priority: int
+    seq: int
+    job_id: str = field(compare=False)
+    factory: Callable[[], Awaitable[None]] = field(compare=False, repr=False)
+    subscription: str = field(compare=False, default="")
+    region: str = field(compare=False, default="")
+
+
+class DeploymentScheduler:
+    """Priority queue plus concurrency limits for deployment workflows.
+
+    A limit of 0 means unlimited. Dispatch happens synchronously on submit and
+    whenever a running job finishes, so no background loop is needed.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_DEPLOYMENTS,
+        per_subscription: int = MAX_DEPLOYMENTS_PER_SUBSCRIPTION,
+        per_region: int = MAX_DEPLOYMENTS_PER_REGION,
+    ):
+        self.max_concurrent = max_concurrent
+        self.per_subscription = per_subscription
+        self.per_region = per_region
+        self._queue: List[ScheduledJob] = []
+        self._running: Dict[str, ScheduledJob] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._counter = itertools.count()
+
+    def submit(
+        self,
+        job_id: str,
+        factory: Callable[[], Awaitable[None]],
+        subscription: str = "",
+        region: str = "",
+        priority: int = PRIORITY_DEPLOY,
+    ) -> Optional[int]:
+        """Queue a job and start it immediately if a slot is free.
+
+        Submitting a job_id that is already queued or running is a no-op.
+
+        Args:
+            job_id: Identifier (deployment_id) used for position lookups
+            factory: Zero-argument callable returning the coroutine to run
+            subscription: Azure subscription the job targets ("" = default)
+            region: Azure region the job targets
+            priority: Lower runs first; ties are FIFO
+
+        Returns:
+            1-based queue position, or None if the job started right away
+        """
+        if job_id in self._running:
+            return None
+        if self.position(job_id) is not None:
+            return self.position(job_id)  # Already waiting; keep its place
+        job = ScheduledJob(priority, next(self._counter), job_id, factory, subscription or "", region or "")
+        bisect.insort(self._queue, job)
+        self._dispatch()
+        return self.position(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Return the 1-based queue position of a waiting job, or None."""
+        for index, job in enumerate(self._queue):
+            if job.job_id == job_id:
+                return index + 1
+        return None
+
+    def is_running(self, job_id: str) -> bool:
+        return job_id in self._running
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job that has not started yet."""
+        for index, job in enumerate(self._queue):
+            if job.job_id == job_id:
+                del self._queue[index]
+                return True
+        return False
+
+    @property
+    def queued_count(self) -> int:
+        return len(self._queue)
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def _has_capacity(self, job: ScheduledJob) -> bool:
+        if self.max_concurrent and len(self._running) >= self.max_concurrent:
+            return False
+        if self.per_subscription and sum(
+            1 for r in self._running.values() if r.subscription == job.subscription
+        ) >= self.per_subscription:
+            return False
+        if self.per_region and sum(
+            1 for r in self._running.values() if r.region == job.region
+        ) >= self.per_region:
+            return False
+        return True
+
+    def _dispatch(self) -> None:
+        # Start every queued job whose limits allow it, in priority/FIFO order
+        index = 0
+        while index < len(self._queue):
+            if self.max_concurrent and len(self._running) >= self.max_concurrent:
+                return
+            job = self._queue[index]
+            if not self._has_capacity(job):
+                index += 1
+                continue
+            del self._queue[index]
+            self._running[job.job_id] = job
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: ScheduledJob) -> None:
+        try:
+            await job.factory()
+        except Exception as e:
+            print(f"Scheduled job {job.job_id} failed: {e}")
+        finally:
+            self._running.pop(job.job_id, None)
+            self._dispatch()
+
+
+# Process-wide scheduler shared by deploy and destroy routes
+deployment_scheduler = DeploymentScheduler()
@@ -0,0 +1,123 @@
+"""
+JSON serialization for Azure AI Multi-Environment Manager.
+
+One process-wide serializer encodes everything the app persists or sends as
+JSON: metadata.json, the JSON index backend and index columns, the reaper
+state, API responses and WebSocket log frames. orjson is used when installed
+(several times faster than the standard library, bytes in and out) with a
+fallback to ``json``. Output is compact unless PERSISTENCE_PRETTY_JSON asks
+for indented files. persistence_service.set_serializer swaps the
+implementation, e.g. for a benchmark.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from fastapi.responses import JSONResponse as _StarletteJSONResponse
+
+from ..config import PERSISTENCE_PRETTY_JSON, PERSISTENCE_SERIALIZER
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _encode_default(obj: Any) -> Any:
+    # Deployment records (models.deployment) and anything else exposing to_dict()
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+class Serializer:
+    """Interface for JSON encoders (UTF-8 bytes out, bytes or str in)."""
+
+    name = "base"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        raise NotImplementedError
+
+
+class StdlibJsonSerializer(Serializer):
+    """Standard library json, always available."""
+
+    name = "json"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False, default=_encode_default).encode("utf-8")
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_encode_default).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    """orjson; dataclass records and str enums are encoded natively."""
+
+    name = "orjson"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=_encode_default, option=option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+def create_serializer(name: str = PERSISTENCE_SERIALIZER) -> Serializer:
+    """Serializer for a PERSISTENCE_SERIALIZER value ("auto", "orjson" or "json")."""
+    if name in ("auto", "orjson") and orjson is not None:
+        return OrjsonSerializer()
+    if name == "orjson":
+        print("PERSISTENCE_SERIALIZER=orjson but orjson is not installed, using json")
+    elif name not in ("auto", "json"):
+        print(f"Unknown PERSISTENCE_SERIALIZER '{name}', using json")
+    return StdlibJsonSerializer()
+
+
+_serializer: Serializer = create_serializer()
+
+
+def get_serializer() -> Serializer:
+    return _serializer
+
+
+def set_serializer(serializer: Serializer) -> Serializer:
+    """Replace the process-wide serializer and return the previous one."""
+    global _serializer
+    previous, _serializer = _serializer, serializer
+    return previous
+
+
+def read_json_file(path: Path) -> Any:
+    with open(path, "rb") as f:
+        return _serializer.loads(f.read())
+
+
+def write_json_file(path: Path, obj: Any, pretty: Optional[bool] = None) -> None:
+    """Write obj atomically (temp file + rename) so readers never see a partial file.
+
+    Args:
+        path: Destination file
+        obj: JSON-serializable value
+        pretty: Indent the output (defaults to PERSISTENCE_PRETTY_JSON)
+    """
+    data = _serializer.dumps(obj, pretty=PERSISTENCE_PRETTY_JSON if pretty is None else pretty)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """Drop-in JSONResponse that renders with the configured serializer."""
+
+    def render(self, content: Any) -> bytes:
+        return _serializer.dumps(content)
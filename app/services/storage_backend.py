@@ -0,0 +1,433 @@
+"""
+Storage backends for the central deployments index.
+
+The index holds one summary row per deployment (name, status, region, flags)
+and backs the dashboard. Backends perform per-row upserts so concurrent
+deployment tasks never rewrite each other's entries.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from ..config import (
+    DEPLOYMENTS_DB_BACKEND,
+    DEPLOYMENTS_DB_FILE,
+    DEPLOYMENTS_SQLITE_FILE,
+)
+from .serialization import get_serializer, read_json_file, write_json_file
+
+
+class DeploymentIndexBackend:
+    """Interface for central deployments index storage.
+
+    Summaries are plain dictionaries with the keys written by
+    persistence_service.save_deployment_state (id, name, status, created_at,
+    updated_at, has_state, outputs_available, region, include_search,
+    resource_names, batch_id, bulk_id, module_version, warm_pool, expires_at,
+    model, phase_seconds). On upsert resource_names may also be a ResourceNames
+    record; rows read back always hold a plain dict.
+    """
+
+    def get(self, deployment_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def upsert(self, summary: Dict) -> None:
+        """Insert or update a single summary, keeping the first created_at."""
+        raise NotImplementedError
+
+    def delete(self, deployment_id: str) -> None:
+        raise NotImplementedError
+
+    def list_all(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        region: Optional[str] = None,
+        created_before: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        warm_pool: Optional[str] = None,
+        expires_before: Optional[str] = None,
+        statuses: Optional[Iterable[str]] = None,
+        bulk_id: Optional[str] = None,
+        deployment_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict]:
+        """Return summaries matching all given filters, keyed by deployment_id.
+
+        ``status`` matches one status, ``statuses`` any of several;
+        ``deployment_ids`` restricts the result to those ids.
+        """
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+class JsonIndexBackend(DeploymentIndexBackend):
+    """Legacy backend storing the whole index in a single JSON document.
+
+    Every write rewrites the file, so this is only suitable for small
+    installations. A process-wide lock prevents lost updates between tasks.
+    """
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        try:
+            if self.db_file.exists():
+                return read_json_file(self.db_file)
+        except Exception as e:
+            print(f"Error loading deployments database: {e}")
+        return {
+            "deployments": {},
+            "metadata": {
+                "version": "1.0",
+                "description": "Multi-Environment Manager - Deployment Database"
+            }
+        }
+
+    def _save(self, db: Dict) -> None:
+        self.db_file.parent.mkdir(exist_ok=True)
+        write_json_file(self.db_file, db)
+
+    def get(self, deployment_id: str) -> Optional[Dict]:
+        return self._load().get("deployments", {}).get(deployment_id)
+
+    def upsert(self, summary: Dict) -> None:
+        with self._lock:
+            db = self._load()
+            deployments = db.setdefault("deployments", {})
+            existing = deployments.get(summary["id"], {})
+            row = dict(summary)
+            # Rows stay in memory, so keep them plain dicts rather than the caller's records
+            names = row.get("resource_names")
+            if hasattr(names, "to_dict"):
+                row["resource_names"] = names.to_dict()
+            row["created_at"] = existing.get("created_at") or summary.get("created_at")
+            deployments[summary["id"]] = row
+            self._save(db)
+
+    def delete(self, deployment_id: str) -> None:
+        with self._lock:
+            db = self._load()
+            if db.get("deployments", {}).pop(deployment_id, None) is not None:
+                self._save(db)
+
+    def list_all(self) -> Dict[str, Dict]:
+        return self._load().get("deployments", {})
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        region: Optional[str] = None,
+        created_before: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        warm_pool: Optional[str] = None,
+        expires_before: Optional[str] = None,
+        statuses: Optional[Iterable[str]] = None,
+        bulk_id: Optional[str] = None,
+        deployment_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict]:
+        wanted = None if statuses is None else set(statuses)
+        rows = self.list_all()
+        if deployment_ids is not None:
+            rows = {deployment_id: rows[deployment_id] for deployment_id in deployment_ids if deployment_id in rows}
+        return {
+            deployment_id: row
+            for deployment_id, row in rows.items()
+            if (status is None or row.get("status") == status)
+            and (wanted is None or row.get("status") in wanted)
+            and (bulk_id is None or row.get("bulk_id") == bulk_id)
+            and (region is None or row.get("region") == region)
+            and (created_before is None or (row.get("created_at") or "") < created_before)
+            and (batch_id is None or row.get("batch_id") == batch_id)
+            and (warm_pool is None or row.get("warm_pool") == warm_pool)
+            and (expires_before is None or bool(row.get("expires_at")) and row["expires_at"] < expires_before)
+        }
+
+    def count(self) -> int:
+        return len(self.list_all())
+
+
+class SqliteIndexBackend(DeploymentIndexBackend):
+    """SQLite (WAL mode) backend with indexed status/region/created_at columns."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS deployments (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT,
+            has_state INTEGER NOT NULL DEFAULT 0,
+            outputs_available INTEGER NOT NULL DEFAULT 0,
+            region TEXT NOT NULL,
+            include_search INTEGER NOT NULL DEFAULT 0,
+            resource_names TEXT NOT NULL DEFAULT '{}',
+            batch_id TEXT,
+            module_version TEXT,
+            warm_pool TEXT,
+            expires_at TEXT,
+            model TEXT,
+            phase_seconds TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_deployments_status ON deployments(status);
+        CREATE INDEX IF NOT EXISTS idx_deployments_region ON deployments(region);
+        CREATE INDEX IF NOT EXISTS idx_deployments_created_at ON deployments(created_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    # Columns added after the first schema version: name -> (type, index to create)
+    _ADDED_COLUMNS = {
+        "batch_id": ("TEXT", "CREATE INDEX IF NOT EXISTS idx_deployments_batch_id ON deployments(batch_id)"),
+        "module_version": ("TEXT", None),
+        "warm_pool": ("TEXT", "CREATE INDEX IF NOT EXISTS idx_deployments_warm_pool ON deployments(warm_pool)"),
+        "expires_at": ("TEXT", "CREATE INDEX IF NOT EXISTS idx_deployments_expires_at ON deployments(expires_at)"),
+        "model": ("TEXT", None),
+        "phase_seconds": ("TEXT", None),
+        "bulk_id": ("TEXT", "CREATE INDEX IF NOT EXISTS idx_deployments_bulk_id ON deployments(bulk_id)"),
+    }
+
+    # Created once the columns above exist. The reaper's scan (status IN (...) AND
+    # expires_at < ?) becomes one index range per status
+    _COMPOSITE_INDEXES = (
+        "CREATE INDEX IF NOT EXISTS idx_deployments_status_expires_at ON deployments(status, expires_at)",
+    )
+
+    _COLUMNS = (
+        "id", "name", "status", "created_at", "updated_at", "has_state",
+        "outputs_available", "region", "include_search", "resource_names", "batch_id",
+        "module_version", "warm_pool", "expires_at", "model", "phase_seconds", "bulk_id",
+    )
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        self.db_file.parent.mkdir(exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(self._SCHEMA)
+        self._migrate_columns()
+
+    def _migrate_columns(self) -> None:
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(deployments)")}
+        for column, (column_type, index_sql) in self._ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE deployments ADD COLUMN {column} {column_type}")
+            if index_sql:
+                self._conn.execute(index_sql)
+        for index_sql in self._COMPOSITE_INDEXES:
+            self._conn.execute(index_sql)
+
+    @staticmethod
+    def _row_to_summary(row: sqlite3.Row) -> Dict:
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "has_state": bool(row["has_state"]),
+            "outputs_available": bool(row["outputs_available"]),
+            "region": row["region"],
+            "include_search": bool(row["include_search"]),
+            "resource_names": get_serializer().loads(row["resource_names"] or "{}"),
+            "batch_id": row["batch_id"],
+            "module_version": row["module_version"],
+            "warm_pool": row["warm_pool"],
+            "expires_at": row["expires_at"],
+            "model": row["model"],
+            "phase_seconds": get_serializer().loads(row["phase_seconds"]) if row["phase_seconds"] else None,
+            "bulk_id": row["bulk_id"],
+        }
+
+    def get(self, deployment_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM deployments WHERE id = ?", (deployment_id,)
+            ).fetchone()
+        return self._row_to_summary(row) if row else None
+
+    def upsert(self, summary: Dict) -> None:
+        values = (
+            summary["id"],
+            summary.get("name") or "Unknown",
+            summary.get("status") or "unknown",
+            summary.get("created_at") or "",
+            summary.get("updated_at") or summary.get("created_at"),
+            int(bool(summary.get("has_state"))),
+            int(bool(summary.get("outputs_available"))),
+            summary.get("region") or "unknown",
+            int(bool(summary.get("include_search"))),
+            get_serializer().dumps(summary.get("resource_names") or {}).decode(),
+            summary.get("batch_id"),
+            summary.get("module_version"),
+            summary.get("warm_pool"),
+            summary.get("expires_at"),
+            summary.get("model"),
+            get_serializer().dumps(summary["phase_seconds"]).decode() if summary.get("phase_seconds") else None,
+            summary.get("bulk_id"),
+        )
+        # created_at is intentionally left out of the update clause
+        with self._lock:
+            self._conn.execute(
+                f"""
+                INSERT INTO deployments ({', '.join(self._COLUMNS)})
+                VALUES ({', '.join('?' for _ in self._COLUMNS)})
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name,
+                    status = excluded.status,
+                    updated_at = excluded.updated_at,
+                    has_state = excluded.has_state,
+                    outputs_available = excluded.outputs_available,
+                    region = excluded.region,
+                    include_search = excluded.include_search,
+                    resource_names = excluded.resource_names,
+                    batch_id = excluded.batch_id,
+                    module_version = excluded.module_version,
+                    warm_pool = excluded.warm_pool,
+                    expires_at = excluded.expires_at,
+                    model = excluded.model,
+                    phase_seconds = excluded.phase_seconds,
+                    bulk_id = excluded.bulk_id
+                """,
+                values,
+            )
+
+    def delete(self, deployment_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM deployments WHERE id = ?", (deployment_id,))
+
+    def list_all(self) -> Dict[str, Dict]:
+        return self.query()
+
+    def query(
+        self,
+        status: Optional[str] = None,
+        region: Optional[str] = None,
+        created_before: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        warm_pool: Optional[str] = None,
+        expires_before: Optional[str] = None,
+        statuses: Optional[Iterable[str]] = None,
+        bulk_id: Optional[str] = None,
+        deployment_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict]:
+        clauses, args = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            args.append(status)
+        if statuses is not None:
+            wanted = list(statuses)
+            clauses.append(f"status IN ({', '.join('?' * len(wanted))})" if wanted else "0")
+            args.extend(wanted)
+        if region is not None:
+            clauses.append("region = ?")
+            args.append(region)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            args.append(created_before)
+        if batch_id is not None:
+            clauses.append("batch_id = ?")
+            args.append(batch_id)
+        if warm_pool is not None:
+            clauses.append("warm_pool = ?")
+            args.append(warm_pool)
+        if bulk_id is not None:
+            clauses.append("bulk_id = ?")
+            args.append(bulk_id)
+        if deployment_ids is not None:
+            ids = list(deployment_ids)
+            clauses.append(f"id IN ({', '.join('?' * len(ids))})" if ids else "0")
+            args.extend(ids)
+        if expires_before is not None:
+            clauses.append("expires_at IS NOT NULL AND expires_at < ?")
+            args.append(expires_before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM deployments {where} ORDER BY created_at", args
+            ).fetchall()
+        return {row["id"]: self._row_to_summary(row) for row in rows}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM deployments").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+
+def migrate_json_index(json_file: Path, backend: SqliteIndexBackend) -> int:
+    """One-shot import of a legacy deployments.json into a SQLite index.
+
+    The migration is recorded in the backend meta table and never repeats,
+    so entries deleted after migration are not resurrected on restart.
+
+    Args:
+        json_file: Path to the legacy JSON index
+        backend: Target SQLite backend
+
+    Returns:
+        Number of summaries imported (0 if already migrated or nothing to import)
+    """
+    if backend.get_meta("json_migrated_from"):
+        return 0
+    imported = 0
+    if json_file.exists():
+        legacy = JsonIndexBackend(json_file)
+        for deployment_id, summary in legacy.list_all().items():
+            row = dict(summary)
+            row.setdefault("id", deployment_id)
+            backend.upsert(row)
+            imported += 1
+    backend.set_meta("json_migrated_from", str(json_file))
+    return imported
+
+
+_backend: Optional[DeploymentIndexBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_index_backend() -> DeploymentIndexBackend:
+    """Return the process-wide index backend selected by DEPLOYMENTS_DB_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if DEPLOYMENTS_DB_BACKEND == "json":
+                    _backend = JsonIndexBackend(DEPLOYMENTS_DB_FILE)
+                else:
+                    backend = SqliteIndexBackend(DEPLOYMENTS_SQLITE_FILE)
+                    imported = migrate_json_index(DEPLOYMENTS_DB_FILE, backend)
+                    if imported:
+                        print(f"Migrated {imported} deployments from {DEPLOYMENTS_DB_FILE.name} to SQLite")
+                    _backend = backend
+    return _backend
+
+
+if __name__ == "__main__":
+    # Manual migration: python -m app.services.storage_backend
+    target = SqliteIndexBackend(DEPLOYMENTS_SQLITE_FILE)
+    count = migrate_json_index(DEPLOYMENTS_DB_FILE, target)
+    print(f"Imported {count} deployments into {DEPLOYMENTS_SQLITE_FILE}")
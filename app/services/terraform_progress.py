@@ -0,0 +1,167 @@
+"""
+Terraform machine-readable event handling for Azure AI Multi-Environment Manager.
+
+``terraform apply/destroy -json`` emits one JSON object per line (planned_change,
+change_summary, apply_start, apply_complete, apply_errored, diagnostic, ...).
+TerraformProgress folds those events into a per-deployment progress model
+(resources planned, in flight and done, with durations) that the status API
+exposes, and classifies retryable failures from structured diagnostics.
+"""
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+# Diagnostic text that indicates a transient Azure conflict worth retrying
+RETRYABLE_MARKERS = ("409", "Conflict", "provisioning state is not terminal")
+
+
+def parse_event(line: str) -> Optional[Dict[str, Any]]:
+    """Return the decoded event for a -json output line, or None for plain text."""
+    if not line.startswith("{"):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and "type" in event else None
+
+
+class TerraformProgress:
+    """Progress of one terraform apply/destroy run, built from -json events."""
+
+    def __init__(self, operation: str = "apply"):
+        self.operation = operation
+        self.planned: Dict[str, str] = {}          # address -> action
+        self.planned_total = 0
+        self.in_flight: Dict[str, float] = {}      # address -> start time
+        self.done: Dict[str, float] = {}           # address -> duration (s)
+        self.failed: Dict[str, float] = {}
+        self.diagnostics: List[Dict[str, Any]] = []
+        self.attempt = 0
+        self.started_at = time.time()
+        self.finished = False
+
+    def begin_attempt(self) -> None:
+        """Reset per-attempt state before a (re)run; completed resources are kept."""
+        self.attempt += 1
+        self.in_flight.clear()
+        self.failed.clear()
+        self.diagnostics = []
+
+    def handle_event(self, event: Dict[str, Any]) -> Optional[str]:
+        """Apply one event to the model.
+
+        Returns:
+            Human-readable log line for the event (None to skip it)
+        """
+        kind = event.get("type")
+        hook = event.get("hook") or {}
+        address = (hook.get("resource") or {}).get("addr")
+        if kind == "planned_change":
+            change = event.get("change") or {}
+            planned_address = (change.get("resource") or {}).get("addr")
+            if planned_address:
+                self.planned[planned_address] = change.get("action", "")
+        elif kind == "change_summary":
+            changes = event.get("changes") or {}
+            if changes.get("operation") == "plan":
+                self.planned_total = sum(changes.get(k, 0) for k in ("add", "change", "remove"))
+            else:
+                self.finished = True
+        elif kind == "apply_start" and address:
+            self.in_flight[address] = time.time()
+        elif kind == "apply_complete" and address:
+            started = self.in_flight.pop(address, None)
+            self.done[address] = float(hook.get("elapsed_seconds") or (time.time() - started if started else 0))
+        elif kind == "apply_errored" and address:
+            started = self.in_flight.pop(address, None)
+            self.failed[address] = float(hook.get("elapsed_seconds") or (time.time() - started if started else 0))
+        elif kind == "diagnostic":
+            self.diagnostics.append(event.get("diagnostic") or {})
+        if kind == "apply_progress":
+            return None  # "Still creating..." every 10s per resource; the progress model covers it
+        if kind == "diagnostic":
+            diag = event.get("diagnostic") or {}
+            detail = " ".join(diag.get("detail", "").split())  # log lines must stay single-line
+            prefix = "Error" if diag.get("severity") == "error" else "Warning"
+            return f"{prefix}: {diag.get('summary', '')}" + (f" - {detail}" if detail else "")
+        return event.get("@message")
+
+    def errors(self) -> List[Dict[str, Any]]:
+        return [d for d in self.diagnostics if d.get("severity") == "error"]
+
+    def is_retryable(self) -> bool:
+        """True if every error diagnostic of the last attempt is a transient Azure conflict."""
+        errors = self.errors()
+        return bool(errors) and all(
+            any(marker in f"{d.get('summary', '')} {d.get('detail', '')}" for marker in RETRYABLE_MARKERS)
+            for d in errors
+        )
+
+    def failed_addresses(self) -> List[str]:
+        """Resource addresses that failed in the last attempt (hooks and error diagnostics)."""
+        addresses = set(self.failed)
+        addresses.update(d["address"] for d in self.errors() if d.get("address"))
+        return sorted(addresses)
+
+    def retry_targets(self) -> List[str]:
+        """Addresses to ``-target`` on retry, or [] when a full apply is still needed.
+
+        Targeting is only safe when the failed resources are all that is left:
+        anything else still pending (e.g. dependents that never started) would
+        be skipped by a targeted apply.
+        """
+        if not self.planned_total:
+            return []  # Failed before the plan completed; nothing is known about what is pending
+        failed = set(self.failed_addresses())
+        pending = set(self.planned) - set(self.done)
+        if failed and pending <= failed:
+            return sorted(failed)
+        return []
+
+    @property
+    def total(self) -> int:
+        return max(self.planned_total, len(self.planned), len(self.done) + len(self.in_flight))
+
+    @property
+    def percent(self) -> float:
+        if self.finished and not self.failed:
+            return 100.0
+        return round(100 * len(self.done) / self.total, 1) if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot for the status API."""
+        now = time.time()
+        return {
+            "operation": self.operation,
+            "attempt": self.attempt,
+            "planned": self.total,
+            "done": len(self.done),
+            "in_flight": {addr: round(now - start, 1) for addr, start in self.in_flight.items()},
+            "failed": sorted(self.failed),
+            "percent": self.percent,
+            "durations": {addr: round(seconds, 1) for addr, seconds in self.done.items()},
+            "errors": [d.get("summary", "") for d in self.errors()],
+            "elapsed_seconds": round(now - self.started_at, 1),
+        }
+
+
+# Progress of running terraform operations by deployment_id; workflows call
+# clear_progress when they finish (the outcome is in the record and the log)
+_progress: Dict[str, TerraformProgress] = {}
+
+
+def start_progress(deployment_id: str, operation: str) -> TerraformProgress:
+    """Register a fresh progress model for a deployment's apply/destroy run."""
+    progress = TerraformProgress(operation)
+    _progress[deployment_id] = progress
+    return progress
+
+
+def get_progress(deployment_id: str) -> Optional[TerraformProgress]:
+    return _progress.get(deployment_id)
+
+
+def clear_progress(deployment_id: str) -> None:
+    """Forget a deployment's progress once its workflow has finished."""
+    _progress.pop(deployment_id, None)
@@ -7,9 +7,61 @@ retry logic for Azure conflicts, and tfvars generation.
 import asyncio
 import json
 import os
+import platform
+import random
+import shutil
 import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-process locking unavailable, in-process lock still applies
+    fcntl = None
+
+from ..config import (
+    TERRAFORM_CACHE_DIR,
+    TERRAFORM_JSON_EVENTS,
+    TERRAFORM_DIR,
+    TERRAFORM_LOCK_FILE,
+    TERRAFORM_MODULE_SNAPSHOT_DIR,
+    TERRAFORM_PLUGIN_CACHE_DIR,
+    TERRAFORM_PROVIDER_MIRROR_DIR,
+    TERRAFORM_PROVIDER_PLATFORMS,
+    TERRAFORM_RETRY_BASE_DELAY,
+    TERRAFORM_RETRY_MAX_DELAY,
+)
+from ..utils.file_operations import copy_terraform_files, link_module_snapshot, snapshot_terraform_module
+from .executor_service import run_blocking
+from .metrics_service import TERRAFORM_COMMANDS, TERRAFORM_RETRIES
+from .terraform_progress import TerraformProgress, parse_event
+from .timeline_service import COMMAND, DeploymentTimeline, span
+
+# Saved plan written by terraform_plan inside each deployment workspace
+PLAN_FILE_NAME = "deployment.tfplan"
+
+# Marker written once the plugin cache holds every provider in the lock file
+_CACHE_READY_MARKER = TERRAFORM_PLUGIN_CACHE_DIR / ".prewarmed"
+_cache_lock = asyncio.Lock()
+
+
+def backoff_delay(attempt: int, base: float, cap: float = TERRAFORM_RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with equal jitter for the given retry attempt (1-based)."""
+    ceiling = min(cap, base * 2 ** (attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def retry_arguments(progress: Optional[TerraformProgress]) -> List[str]:
+    """Extra apply flags for a retry: skip the refresh, and target the failed
+    resources when nothing else is pending."""
+    args = ["-refresh=false"]
+    if progress:
+        args.extend(f"-target={address}" for address in progress.retry_targets())
+    return args
 
 
 async def run_terraform_command(
@@ -17,18 +69,33 @@ async def run_terraform_command(
     cwd: Optional[Path] = None, 
     env: Optional[Dict[str, str]] = None, 
     max_retries: int = 0, 
-    retry_delay: int = 30,
-    log_callback: Optional[callable] = None
+    retry_delay: float = TERRAFORM_RETRY_BASE_DELAY,
+    log_callback: Optional[callable] = None,
+    progress: Optional[TerraformProgress] = None,
+    retry_cmd: Optional[List[str]] = None,
+    timeline: Optional[DeploymentTimeline] = None
 ) -> None:
     """Execute terraform command with streaming output and retry logic.
     
+    Lines that are terraform ``-json`` events are fed to ``progress`` and
+    logged as their human-readable message; retryability is then decided
+    from the structured error diagnostics instead of scanning the text.
+    Retries back off exponentially with jitter and re-run apply with
+    ``-refresh=false`` (state was just written by the failed attempt),
+    targeting only the failed resources when nothing else is pending.
+    Commands that consume a saved plan pass ``retry_cmd`` (the plain apply),
+    since a plan file cannot be combined with -target or reused once stale.
+    
     Args:
         cmd: Command and arguments to execute
         cwd: Working directory for command execution
         env: Environment variables (defaults to current environment)
         max_retries: Maximum number of retry attempts for 409 conflicts
-        retry_delay: Delay in seconds between retry attempts
+        retry_delay: Base delay in seconds for the exponential retry backoff
         log_callback: Function to call for each log line (deployment_id, line)
+        progress: Optional progress model fed with -json events
+        retry_cmd: Base command for retries (defaults to cmd)
+        timeline: Optional deployment timeline; every attempt is recorded as a span
     
     Raises:
         RuntimeError: If command fails after all retry attempts
@@ -36,14 +103,25 @@ async def run_terraform_command(
     if log_callback:
         log_callback(f"[CMD] {' '.join(cmd)}")
     
+    attempt_cmd = cmd
+    stale_plan = False
+    subcommand = cmd[1] if len(cmd) > 1 else cmd[0]
     for attempt in range(max_retries + 1):
         if attempt > 0:
+            TERRAFORM_RETRIES.inc(command=subcommand, reason="stale_plan" if stale_plan else "conflict")
+            # A stale saved plan is not a conflict: re-plan right away with a normal refresh
+            delay = 0 if stale_plan else backoff_delay(attempt, retry_delay)
+            attempt_cmd = (retry_cmd or cmd) + ([] if stale_plan else retry_arguments(progress))
             if log_callback:
-                log_callback(f"[RETRY] Attempt {attempt + 1}/{max_retries + 1} after {retry_delay}s delay")
-            await asyncio.sleep(retry_delay)
+                log_callback(f"[RETRY] Attempt {attempt + 1}/{max_retries + 1} after {delay:.1f}s delay")
+                log_callback(f"[CMD] {' '.join(attempt_cmd)}")
+            await asyncio.sleep(delay)
+        if progress:
+            progress.begin_attempt()
             
+        attempt_started = time.time()
         process = await asyncio.create_subprocess_exec(
-            *cmd,
+            *attempt_cmd,
             cwd=str(cwd) if cwd else None,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.STDOUT,
@@ -54,33 +132,59 @@ async def run_terraform_command(
         output_lines = []
         async for line in process.stdout:  # type: ignore
             line_text = line.decode(errors='ignore').rstrip()
+            event = parse_event(line_text) if progress else None
+            if event is not None:
+                line_text = progress.handle_event(event)
+                if line_text is None:
+                    continue
             if log_callback:
                 log_callback(line_text)
             output_lines.append(line_text)
             
         rc = await process.wait()
+        if timeline is not None:
+            timeline.add(
+                f"terraform {subcommand}", attempt_started, time.time(),
+                kind=COMMAND, exit_code=rc, attempt=attempt + 1
+            )
         if log_callback:
-            log_callback(f"[EXIT {rc}] {' '.join(cmd)}")
+            log_callback(f"[EXIT {rc}] {' '.join(attempt_cmd)}")
         
         if rc == 0:
+            TERRAFORM_COMMANDS.inc(command=subcommand, result="success")
             return  # Success
             
         # Check if it's a retryable error (409 Conflict)
-        output_text = '\n'.join(output_lines)
+        if progress and progress.errors():
+            transient = progress.is_retryable()
+        else:
+            output_text = '\n'.join(output_lines)
+            transient = "409" in output_text or "Conflict" in output_text or "provisioning state is not terminal" in output_text
+        stale_plan = retry_cmd is not None and any("Saved plan is stale" in line for line in output_lines)
         is_retryable = (
             attempt < max_retries and 
             "terraform apply" in ' '.join(cmd) and
-            ("409" in output_text or "Conflict" in output_text or "provisioning state is not terminal" in output_text)
+            (transient or stale_plan)
         )
         
+        if is_retryable and stale_plan:
+            if log_callback:
+                log_callback("[RETRY] Saved plan is stale; applying without it")
+            continue
         if is_retryable:
             if log_callback:
-                log_callback(f"[RETRY] Detected retryable error (409 Conflict). Will retry in {retry_delay}s...")
+                failed = progress.failed_addresses() if progress else []
+                log_callback(
+                    "[RETRY] Detected retryable error (409 Conflict)"
+                    + (f" on {', '.join(failed)}" if failed else "") + ". Retrying with backoff..."
+                )
             continue
         else:
             # Not retryable or max retries exceeded
+            TERRAFORM_COMMANDS.inc(command=subcommand, result="failure")
             raise RuntimeError(f"Command failed: {' '.join(cmd)}")
     
+    TERRAFORM_COMMANDS.inc(command=subcommand, result="failure")
     raise RuntimeError(f"Command failed after {max_retries + 1} attempts: {' '.join(cmd)}")
 
 
@@ -116,13 +220,76 @@ def generate_tfvars_content(params: Dict[str, Any], names: Dict[str, str]) -> st
     
     if params.get("subscription_id"):
         tfvars_content += f"\nsubscription_id = \"{params['subscription_id']}\""
+    if params.get("tags"):
+        tfvars_content += f"\ntags = {json.dumps(params['tags'])}"
         
     return tfvars_content
 
 
+# Local state layout whose "outputs" section we know how to read directly
+SUPPORTED_STATE_VERSIONS = {4}
+
+
+def read_state_outputs(deployment_dir: Path) -> Optional[Dict[str, Any]]:
+    """Read output values straight from the local terraform.tfstate.
+    
+    Avoids spawning ``terraform output -json`` (which loads providers and the
+    backend) for values already present in the state file.
+    
+    Args:
+        deployment_dir: Directory containing terraform.tfstate
+        
+    Returns:
+        Mapping of output name to value, or None if the state is missing or
+        uses an unsupported format (caller should fall back to the CLI)
+    """
+    state_file = deployment_dir / "terraform.tfstate"
+    if not state_file.exists():
+        return None
+    with open(state_file, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") not in SUPPORTED_STATE_VERSIONS:
+        return None
+    return {k: v.get("value") for k, v in state.get("outputs", {}).items()}
+
+
+def normalize_terraform_outputs(simplified: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the user-facing endpoint aliases to raw terraform output values.
+    
+    Args:
+        simplified: Mapping of output name to value
+        
+    Returns:
+        The same mapping with standardized alias keys filled in
+    """
+    # Standardize endpoint aliases (ensure three distinct endpoints if derivable)
+    ai_services_ep = simplified.get("ai_services_endpoint")
+    openai_ep = simplified.get("openai_endpoint")
+    inference_ep = simplified.get("ai_inference_endpoint")
+    
+    # Fallback derivations if terraform outputs missing (based on cognitive endpoint)
+    if ai_services_ep and not openai_ep and ".cognitiveservices.azure.com" in ai_services_ep:
+        openai_ep = ai_services_ep.replace(".cognitiveservices.azure.com", ".openai.azure.com")
+    if ai_services_ep and not inference_ep and ".cognitiveservices.azure.com" in ai_services_ep:
+        inference_ep = ai_services_ep.replace(".cognitiveservices.azure.com", ".services.ai.azure.com")
+        
+    simplified.setdefault("azure_ai_services_endpoint", ai_services_ep)
+    simplified.setdefault("azure_openai_endpoint", openai_ep)
+    simplified.setdefault("azure_ai_inference_endpoint", inference_ep)
+    
+    # Alias for foundry endpoint if present (user-friendly key)
+    if simplified.get("foundry_project_endpoint"):
+        simplified.setdefault("azure_ai_foundry_project_endpoint", simplified["foundry_project_endpoint"])
+        
+    return simplified
+
+
 def parse_terraform_outputs(deployment_dir: Path) -> Dict[str, Any]:
     """Parse terraform outputs from deployment directory.
     
+    Reads the local state file directly and only shells out to
+    ``terraform output -json`` for state formats it does not understand.
+    
     Args:
         deployment_dir: Directory containing terraform state and outputs
         
@@ -130,36 +297,91 @@ def parse_terraform_outputs(deployment_dir: Path) -> Dict[str, Any]:
         Parsed terraform outputs as simplified dictionary
     """
     try:
-        # Try to get outputs from terraform state
-        out_raw = subprocess.check_output(["terraform", "output", "-json"], cwd=str(deployment_dir))
-        outputs = json.loads(out_raw.decode())
-        simplified = {k: v.get("value") for k, v in outputs.items()}
-        
-        # Standardize endpoint aliases (ensure three distinct endpoints if derivable)
-        ai_services_ep = simplified.get("ai_services_endpoint") or simplified.get("ai_services_endpoint")
-        openai_ep = simplified.get("openai_endpoint")
-        inference_ep = simplified.get("ai_inference_endpoint")
-        
-        # Fallback derivations if terraform outputs missing (based on cognitive endpoint)
-        if ai_services_ep and not openai_ep and ".cognitiveservices.azure.com" in ai_services_ep:
-            openai_ep = ai_services_ep.replace(".cognitiveservices.azure.com", ".openai.azure.com")
-        if ai_services_ep and not inference_ep and ".cognitiveservices.azure.com" in ai_services_ep:
-            inference_ep = ai_services_ep.replace(".cognitiveservices.azure.com", ".services.ai.azure.com")
-            
-        simplified.setdefault("azure_ai_services_endpoint", ai_services_ep)
-        simplified.setdefault("azure_openai_endpoint", openai_ep)
-        simplified.setdefault("azure_ai_inference_endpoint", inference_ep)
-        
-        # Alias for foundry endpoint if present (user-friendly key)
-        if simplified.get("foundry_project_endpoint"):
-            simplified.setdefault("azure_ai_foundry_project_endpoint", simplified["foundry_project_endpoint"])
-            
-        return simplified
+        simplified = read_state_outputs(deployment_dir)
+        if simplified is None:
+            out_raw = subprocess.check_output(["terraform", "output", "-json"], cwd=str(deployment_dir))
+            outputs = json.loads(out_raw.decode())
+            simplified = {k: v.get("value") for k, v in outputs.items()}
+        return normalize_terraform_outputs(simplified)
     except Exception as e:
         print(f"Error parsing terraform outputs: {e}")
         return {}
 
 
+# Managed resource types a resource group delete does not remove (deleted separately)
+OUT_OF_GROUP_TYPES = {"azuread_application", "azuread_service_principal", "azuread_application_password"}
+# Managed resource types with no Azure object behind them
+LOCAL_ONLY_TYPES = {"time_sleep", "terraform_data", "random_string", "null_resource"}
+
+
+def resource_group_delete_plan(deployment_dir: Path, rg_name: str) -> Optional[Dict[str, Any]]:
+    """Check whether deleting the resource group would remove everything in state.
+    
+    The state qualifies when it is an unlocked, supported local state that
+    contains the resource group itself and every other Azure resource in it
+    lives inside that group. Entra ID applications are returned so the caller
+    can delete them separately.
+    
+    Args:
+        deployment_dir: Directory containing terraform.tfstate
+        rg_name: Expected resource group name
+        
+    Returns:
+        {"resource_group_id": ..., "application_client_ids": [...]}, or None
+        when a regular terraform destroy is required
+    """
+    state_file = deployment_dir / "terraform.tfstate"
+    if not state_file.exists() or (deployment_dir / ".terraform.tfstate.lock.info").exists():
+        return None
+    with open(state_file, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") not in SUPPORTED_STATE_VERSIONS:
+        return None
+    group_id = None
+    client_ids = []
+    scoped_ids = []
+    for resource in state.get("resources", []):
+        kind = resource.get("type")
+        if resource.get("mode") != "managed" or kind in LOCAL_ONLY_TYPES:
+            continue
+        for instance in resource.get("instances", []):
+            attributes = instance.get("attributes") or {}
+            if kind == "azurerm_resource_group":
+                if (attributes.get("name") or "").lower() != rg_name.lower():
+                    return None
+                group_id = attributes.get("id")
+            elif kind == "azuread_application":
+                client_ids.append(attributes.get("client_id") or attributes.get("application_id"))
+            elif kind not in OUT_OF_GROUP_TYPES:
+                scoped_ids.append((attributes.get("id") or "").lower())
+    if not group_id or not all(client_ids):
+        return None
+    prefix = group_id.lower() + "/"
+    if any(not resource_id.startswith(prefix) for resource_id in scoped_ids):
+        return None
+    return {"resource_group_id": group_id, "application_client_ids": client_ids}
+
+
+def clear_state_resources(deployment_dir: Path) -> None:
+    """Empty the local state after its resources were deleted outside terraform.
+    
+    Leaves the same shape ``terraform destroy`` does (no resources, no
+    outputs, bumped serial); the previous state is kept as terraform.tfstate.backup.
+    
+    Args:
+        deployment_dir: Directory containing terraform.tfstate
+    """
+    state_file = deployment_dir / "terraform.tfstate"
+    with open(state_file, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    shutil.copy2(state_file, deployment_dir / "terraform.tfstate.backup")
+    state.update(serial=state.get("serial", 0) + 1, resources=[], outputs={})
+    tmp_file = state_file.with_suffix(".tfstate.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
 def write_tfvars_file(deployment_dir: Path, content: str) -> None:
     """Write terraform.tfvars file to deployment directory.
     
@@ -172,45 +394,283 @@ def write_tfvars_file(deployment_dir: Path, content: str) -> None:
     tfvars_path.write_text(content, encoding="utf-8")
 
 
-async def terraform_init(deployment_dir: Path, log_callback: Optional[callable] = None) -> None:
-    """Initialize terraform in deployment directory.
+def current_provider_platform() -> str:
+    """Return the terraform platform string (e.g. linux_amd64) of this host."""
+    machine = platform.machine().lower()
+    arch = {"x86_64": "amd64", "amd64": "amd64", "aarch64": "arm64", "arm64": "arm64"}.get(machine, machine)
+    os_name = "windows" if sys.platform.startswith("win") else sys.platform.rstrip("0123456789")
+    return f"{os_name}_{arch}"
+
+
+def provider_mirror_ready() -> bool:
+    """True when the local provider mirror and pre-generated lock file exist."""
+    return TERRAFORM_LOCK_FILE.exists() and TERRAFORM_PROVIDER_MIRROR_DIR.is_dir() and any(
+        TERRAFORM_PROVIDER_MIRROR_DIR.iterdir()
+    )
+
+
+def terraform_cache_env() -> Dict[str, str]:
+    """Environment for terraform commands sharing the provider plugin cache."""
+    env = os.environ.copy()
+    TERRAFORM_PLUGIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    env["TF_PLUGIN_CACHE_DIR"] = str(TERRAFORM_PLUGIN_CACHE_DIR)
+    env.setdefault("TF_IN_AUTOMATION", "1")
+    return env
+
+
+@asynccontextmanager
+async def _provider_cache_lock() -> AsyncIterator[None]:
+    """Serialize plugin cache writers within this process and across processes.
+
+    Terraform does not guard concurrent writes to TF_PLUGIN_CACHE_DIR, so only
+    one init may populate it at a time.
+    """
+    async with _cache_lock:
+        TERRAFORM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(TERRAFORM_CACHE_DIR / ".lock", "w") as lock_file:
+            if fcntl is not None:
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(0.5)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def prewarm_provider_cache(
+    terraform_dir: Path = TERRAFORM_DIR,
+    log_callback: Optional[callable] = None,
+) -> None:
+    """Download all required providers into the local mirror and plugin cache.
+
+    Runs ``terraform providers mirror`` and ``terraform providers lock`` in a
+    scratch copy of the configuration, stores the generated lock file in the
+    cache directory and performs one init so the plugin cache is populated.
+    After this, workspace inits run offline against the mirror.
+
+    Args:
+        terraform_dir: Directory containing the terraform configuration
+        log_callback: Function to call for each log line
+    """
+    platforms = TERRAFORM_PROVIDER_PLATFORMS or [current_provider_platform()]
+    platform_args = [f"-platform={p}" for p in platforms]
+    async with _provider_cache_lock():
+        TERRAFORM_PROVIDER_MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix="tf-prewarm-") as scratch:
+            scratch_dir = Path(scratch)
+            copy_terraform_files(terraform_dir, scratch_dir)
+            env = terraform_cache_env()
+            await run_terraform_command(
+                ["terraform", "providers", "mirror", *platform_args, str(TERRAFORM_PROVIDER_MIRROR_DIR)],
+                cwd=scratch_dir, env=env, log_callback=log_callback,
+            )
+            await run_terraform_command(
+                ["terraform", "providers", "lock", f"-fs-mirror={TERRAFORM_PROVIDER_MIRROR_DIR}", *platform_args],
+                cwd=scratch_dir, env=env, log_callback=log_callback,
+            )
+            shutil.copy2(scratch_dir / ".terraform.lock.hcl", TERRAFORM_LOCK_FILE)
+            await run_terraform_command(
+                ["terraform", "init", "-input=false", "-backend=false", f"-plugin-dir={TERRAFORM_PROVIDER_MIRROR_DIR}"],
+                cwd=scratch_dir, env=env, log_callback=log_callback,
+            )
+        _CACHE_READY_MARKER.touch()
+
+
+async def terraform_init(
+    deployment_dir: Path,
+    log_callback: Optional[callable] = None,
+    timeline: Optional[DeploymentTimeline] = None
+) -> None:
+    """Initialize terraform in deployment directory using the shared provider cache.
+    
+    When the provider mirror has been prewarmed, init runs offline against it
+    with the pre-generated lock file and only links providers from the plugin
+    cache. Otherwise providers are downloaded once into the plugin cache while
+    holding the cache lock.
     
     Args:
         deployment_dir: Directory containing terraform files
         log_callback: Function to call for each log line
+        timeline: Optional deployment timeline for the command span
     """
-    await run_terraform_command(["terraform", "init"], cwd=deployment_dir, log_callback=log_callback)
+    cmd = ["terraform", "init", "-input=false"]
+    if provider_mirror_ready():
+        cmd.append(f"-plugin-dir={TERRAFORM_PROVIDER_MIRROR_DIR}")
+        if not (deployment_dir / ".terraform.lock.hcl").exists():
+            shutil.copy2(TERRAFORM_LOCK_FILE, deployment_dir / ".terraform.lock.hcl")
+    env = terraform_cache_env()
+
+    if _CACHE_READY_MARKER.exists():
+        await run_terraform_command(cmd, cwd=deployment_dir, env=env, log_callback=log_callback, timeline=timeline)
+        return
+
+    # Cold cache: this init writes into the plugin cache, so it must not run concurrently
+    async with _provider_cache_lock():
+        await run_terraform_command(cmd, cwd=deployment_dir, env=env, log_callback=log_callback, timeline=timeline)
+        _CACHE_READY_MARKER.touch()
 
 
-async def terraform_apply(deployment_dir: Path, log_callback: Optional[callable] = None, max_retries: int = 2) -> None:
+# Per-snapshot locks so each module version is initialized exactly once
+_module_init_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def prepare_module_workspace(
+    deployment_dir: Path,
+    terraform_dir: Path = TERRAFORM_DIR,
+    module_version: Optional[str] = None,
+    log_callback: Optional[callable] = None,
+    timeline: Optional[DeploymentTimeline] = None
+) -> str:
+    """Link a deployment workspace to an initialized module snapshot.
+    
+    The module is snapshotted by content hash and ``terraform init`` runs once
+    per snapshot; workspaces only get symlinks to its .tf files, lock file and
+    ``.terraform`` directory, so deploy, re-apply and destroy skip init.
+    
+    Args:
+        deployment_dir: Deployment workspace directory
+        terraform_dir: Current terraform configuration (used for new snapshots)
+        module_version: Snapshot to reuse (e.g. the version a deployment was applied with)
+        log_callback: Function to call for each log line
+        timeline: Optional deployment timeline for the copy/init spans
+        
+    Returns:
+        The module version the workspace now points at
+    """
+    with span(timeline, "copy"):
+        version, snapshot_dir = await run_blocking(
+            snapshot_terraform_module, terraform_dir, TERRAFORM_MODULE_SNAPSHOT_DIR, module_version,
+            label="module_snapshot"
+        )
+    marker = snapshot_dir / ".terraform" / ".initialized"
+    if not marker.exists():
+        lock = _module_init_locks.setdefault(version, asyncio.Lock())
+        async with lock:
+            if not marker.exists():
+                if log_callback:
+                    log_callback(f"[TERRAFORM] Initializing module snapshot {version}")
+                with span(timeline, "init"):
+                    await terraform_init(snapshot_dir, log_callback=log_callback, timeline=timeline)
+                marker.parent.mkdir(exist_ok=True)  # Modules without providers get no .terraform dir
+                marker.touch()
+    elif log_callback:
+        log_callback(f"[TERRAFORM] Reusing initialized module snapshot {version} (init skipped)")
+    await run_blocking(link_module_snapshot, snapshot_dir, deployment_dir, label="module_link")
+    return version
+
+
+async def terraform_plan(
+    deployment_dir: Path,
+    log_callback: Optional[callable] = None,
+    progress: Optional[TerraformProgress] = None,
+    timeline: Optional[DeploymentTimeline] = None
+) -> Path:
+    """Compute a plan and save it to the workspace for a later apply.
+    
+    Args:
+        deployment_dir: Directory containing terraform files (already initialized)
+        log_callback: Function to call for each log line
+        progress: Optional progress model; records the planned resources
+        timeline: Optional deployment timeline for the command span
+        
+    Returns:
+        Path of the saved plan file
+    """
+    plan_path = deployment_dir / PLAN_FILE_NAME
+    cmd = ["terraform", "plan", "-input=false", f"-out={PLAN_FILE_NAME}"]
+    if progress and TERRAFORM_JSON_EVENTS:
+        cmd.append("-json")
+    await run_terraform_command(
+        cmd, cwd=deployment_dir, log_callback=log_callback, progress=progress, timeline=timeline
+    )
+    if progress:
+        progress.attempt = 0  # The plan run is not an apply attempt
+    return plan_path
+
+
+async def terraform_apply(
+    deployment_dir: Path,
+    log_callback: Optional[callable] = None,
+    max_retries: int = 2,
+    progress: Optional[TerraformProgress] = None,
+    plan_path: Optional[Path] = None,
+    extra_args: Optional[List[str]] = None,
+    timeline: Optional[DeploymentTimeline] = None
+) -> None:
     """Apply terraform configuration in deployment directory.
     
     Args:
         deployment_dir: Directory containing terraform files
         log_callback: Function to call for each log line
         max_retries: Maximum retry attempts for 409 conflicts
+        progress: Optional progress model (enables -json event output)
+        plan_path: Saved plan from terraform_plan to apply instead of planning again
+        extra_args: Additional apply flags (e.g. -target/-replace); not combined with a saved plan
+        timeline: Optional deployment timeline; each attempt is recorded as a span
     """
-    await run_terraform_command(
-        ["terraform", "apply", "-auto-approve"], 
-        cwd=deployment_dir, 
-        log_callback=log_callback,
-        max_retries=max_retries,
-        retry_delay=60
-    )
+    cmd = ["terraform", "apply", "-auto-approve"]
+    if progress and TERRAFORM_JSON_EVENTS:
+        cmd.append("-json")
+    if extra_args and plan_path is None:
+        cmd.extend(extra_args)
+    use_plan = plan_path is not None and plan_path.exists()
+    try:
+        await run_terraform_command(
+            cmd + [plan_path.name] if use_plan else cmd, 
+            cwd=deployment_dir, 
+            log_callback=log_callback,
+            max_retries=max_retries,
+            progress=progress,
+            retry_cmd=cmd if use_plan else None,
+            timeline=timeline
+        )
+    finally:
+        # Plan files embed sensitive values and are single-use
+        if use_plan:
+            plan_path.unlink(missing_ok=True)
 
 
-async def terraform_destroy(deployment_dir: Path, log_callback: Optional[callable] = None, max_retries: int = 2) -> None:
+async def terraform_destroy(
+    deployment_dir: Path,
+    log_callback: Optional[callable] = None,
+    max_retries: int = 2,
+    progress: Optional[TerraformProgress] = None,
+    timeline: Optional[DeploymentTimeline] = None
+) -> None:
     """Destroy terraform resources in deployment directory.
     
     Args:
         deployment_dir: Directory containing terraform files
         log_callback: Function to call for each log line
         max_retries: Maximum retry attempts for conflicts
+        progress: Optional progress model (enables -json event output)
+        timeline: Optional deployment timeline; each attempt is recorded as a span
     """
+    cmd = ["terraform", "destroy", "-auto-approve"]
+    if progress and TERRAFORM_JSON_EVENTS:
+        cmd.append("-json")
     await run_terraform_command(
-        ["terraform", "destroy", "-auto-approve"], 
+        cmd, 
         cwd=deployment_dir, 
         log_callback=log_callback,
         max_retries=max_retries,
-        retry_delay=30
-    )
\ No newline at end of file
+        progress=progress,
+        timeline=timeline
+    )
+
+
+if __name__ == "__main__":
+    # Offline provider prewarm: python -m app.services.terraform_service prewarm
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Terraform service utilities")
+    parser.add_argument("command", choices=["prewarm"])
+    parser.add_argument("--terraform-dir", type=Path, default=TERRAFORM_DIR)
+    args = parser.parse_args()
+    asyncio.run(prewarm_provider_cache(args.terraform_dir, log_callback=print))
+    print(f"Provider mirror ready at {TERRAFORM_PROVIDER_MIRROR_DIR}")
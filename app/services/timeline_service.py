@@ -0,0 +1,179 @@
+"""
+Deployment timeline service for Azure AI Multi-Environment Manager.
+
+Each deployment record carries a ``timeline``: structured spans (phase,
+start, end, duration, exit code, retry attempt) recorded by the deploy,
+claim and destroy workflows and by every terraform command attempt. Spans
+are persisted with the record, rendered as a waterfall on the results page,
+and every finished phase also feeds the phase histogram on /metrics. Per
+deployment phase totals go into the index so timings can be aggregated
+across deployments without loading any records.
+
+Span times are UTC (``2026-01-31T12:00:00.123Z``) and a timeline keeps at
+most TIMELINE_MAX_SPANS spans, dropping the oldest first.
+"""
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, TypeVar
+
+from ..config import TIMELINE_MAX_SPANS
+from .metrics_service import observe_phase
+
+T = TypeVar("T")
+
+# Span kinds: workflow phases feed /metrics and the index totals; commands are individual terraform runs
+PHASE = "phase"
+COMMAND = "command"
+
+
+def _format_time(timestamp: float) -> str:
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _parse_time(value: str) -> float:
+    # fromisoformat only accepts a trailing Z from Python 3.11; older spans are naive local times
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class DeploymentTimeline:
+    """Appends spans of one workflow run to a deployment record's timeline."""
+
+    def __init__(self, record: Dict[str, Any], operation: str):
+        self.spans: List[Dict[str, Any]] = record.setdefault("timeline", [])
+        self.operation = operation
+
+    def add(
+        self,
+        phase: str,
+        started: float,
+        ended: float,
+        kind: str = PHASE,
+        exit_code: Optional[int] = None,
+        attempt: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Record a finished span (``started``/``ended`` are time.time() values)."""
+        span = {
+            "phase": phase,
+            "kind": kind,
+            "operation": self.operation,
+            "start": _format_time(started),
+            "end": _format_time(ended),
+            "duration": round(ended - started, 3),
+            "exit_code": exit_code,
+            "attempt": attempt,
+        }
+        self.spans.append(span)
+        if len(self.spans) > TIMELINE_MAX_SPANS:
+            del self.spans[:len(self.spans) - TIMELINE_MAX_SPANS]
+        return span
+
+
+@contextmanager
+def span(timeline: Optional[DeploymentTimeline], phase: str) -> Iterator[None]:
+    """Time the with-block as a workflow phase.
+
+    The phase always feeds the /metrics histogram; with a timeline it is also
+    recorded as a span (exit_code 1 if the block raised).
+    """
+    started = time.time()
+    exit_code = 1
+    try:
+        yield
+        exit_code = 0
+    finally:
+        ended = time.time()
+        observe_phase(phase, ended - started)
+        if timeline is not None:
+            timeline.add(phase, started, ended, exit_code=exit_code)
+
+
+async def span_await(timeline: Optional[DeploymentTimeline], phase: str, awaitable: Awaitable[T]) -> T:
+    """Await and return awaitable, timed as a workflow phase."""
+    with span(timeline, phase):
+        return await awaitable
+
+
+def phase_totals(spans: List[Dict[str, Any]], operation: str = "deploy") -> Dict[str, float]:
+    """Seconds spent per phase in one operation of a timeline (repeated phases are summed)."""
+    totals: Dict[str, float] = {}
+    for item in spans:
+        if item.get("kind") == PHASE and item.get("operation") == operation:
+            totals[item["phase"]] = round(totals.get(item["phase"], 0.0) + item["duration"], 3)
+    return totals
+
+
+def waterfall_rows(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Spans with offsets and widths (percent of their operation's wall time) for the waterfall.
+
+    Args:
+        spans: A deployment record's timeline
+
+    Returns:
+        One row per span in start order, with ``offset_pct``, ``width_pct``
+        and ``offset`` (seconds since the operation's first span) added
+    """
+    rows = []
+    by_operation: Dict[str, List[Dict[str, Any]]] = {}
+    for item in spans:
+        by_operation.setdefault(item.get("operation", "deploy"), []).append(item)
+    for items in by_operation.values():
+        starts = [_parse_time(item["start"]) for item in items]
+        origin = min(starts)
+        wall = max(start + item["duration"] for start, item in zip(starts, items)) - origin or 1.0
+        for start, item in sorted(zip(starts, items), key=lambda pair: pair[0]):
+            rows.append({
+                **item,
+                "offset": round(start - origin, 3),
+                "offset_pct": round(100 * (start - origin) / wall, 2),
+                "width_pct": max(0.5, round(100 * item["duration"] / wall, 2)),
+            })
+    return rows
+
+
+def aggregate_phase_timings(rows: Dict[str, Dict[str, Any]], group_by: List[str]) -> Dict[str, Any]:
+    """Aggregate per-deployment phase totals from index rows.
+
+    Args:
+        rows: Index summaries (query_deployments output); rows without phase totals are skipped
+        group_by: Index fields to group by, e.g. ["region", "model"]
+
+    Returns:
+        {"group_by": [...], "groups": [{"key": {...}, "deployments": n,
+        "phases": {phase: {"count", "mean", "p50", "p95", "max", "share"}},
+        "dominant_phase": phase}]} with groups sorted by deployment count
+    """
+    grouped: Dict[tuple, List[Dict[str, float]]] = {}
+    for row in rows.values():
+        totals = row.get("phase_seconds")
+        if totals:
+            key = tuple(str(row.get(field)) for field in group_by)
+            grouped.setdefault(key, []).append(totals)
+
+    groups = []
+    for key, deployments in grouped.items():
+        samples: Dict[str, List[float]] = {}
+        for totals in deployments:
+            for phase, seconds in totals.items():
+                samples.setdefault(phase, []).append(seconds)
+        overall = sum(sum(values) for values in samples.values()) or 1.0
+        phases = {}
+        for phase, values in samples.items():
+            values.sort()
+            phases[phase] = {
+                "count": len(values),
+                "mean": round(sum(values) / len(values), 3),
+                "p50": values[(len(values) - 1) // 2],
+                "p95": values[min(len(values) - 1, int(0.95 * len(values)))],
+                "max": values[-1],
+                "share": round(sum(values) / overall, 3),
+            }
+        groups.append({
+            "key": dict(zip(group_by, key)),
+            "deployments": len(deployments),
+            "phases": phases,
+            "dominant_phase": max(phases, key=lambda phase: phases[phase]["share"]) if phases else None,
+        })
+    groups.sort(key=lambda group: group["deployments"], reverse=True)
+    return {"group_by": group_by, "groups": groups}
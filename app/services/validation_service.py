@@ -3,6 +3,7 @@ Request validation service for deployment forms and parameters.
 
 Handles validation of user inputs, form data, and deployment parameters.
 """
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, Tuple
 from fastapi import Request
 from fastapi.templating import Jinja2Templates
@@ -10,8 +11,11 @@ from fastapi.templating import Jinja2Templates
 from ..config import (
     ALLOWED_MODEL_NAMES, 
     MIN_RESOURCE_GROUP_LENGTH, 
-    MAX_RESOURCE_GROUP_LENGTH
+    MAX_RESOURCE_GROUP_LENGTH,
+    MAX_BATCH_SIZE,
+    DEFAULT_DEPLOYMENT_TTL_HOURS
 )
+from ..models.deployment import DeploymentStatus
 from ..utils.naming import sanitize_base
 
 
@@ -22,7 +26,8 @@ def validate_deployment_form(
     service_principal_name: str,
     secret_expiration_date: str,
     include_search: Optional[str] = None,
-    subscription_id: Optional[str] = None
+    subscription_id: Optional[str] = None,
+    expires_at: Optional[str] = None
 ) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
     """Validate deployment form parameters.
     
@@ -34,6 +39,7 @@ def validate_deployment_form(
         secret_expiration_date: Expiration date for SP secret
         include_search: Optional search service flag
         subscription_id: Optional Azure subscription ID
+        expires_at: Optional ISO date/time after which the environment is destroyed
         
     Returns:
         Tuple of (is_valid, error_message, validated_params)
@@ -56,6 +62,22 @@ def validate_deployment_form(
     if not secret_expiration_date.strip():
         return False, "Secret expiration date is required.", None
     
+    # Optional auto-expiry, stored in UTC in the created_at format; falls back to the default TTL.
+    # Times without an offset (the datetime-local form field) are server local time.
+    expires_value = None
+    if expires_at and expires_at.strip():
+        try:
+            expires_dt = datetime.fromisoformat(expires_at.strip())
+        except ValueError:
+            return False, "Invalid expiry date/time.", None
+        expires_dt = expires_dt.astimezone(timezone.utc)
+        if expires_dt <= datetime.now(timezone.utc):
+            return False, "Expiry must be in the future.", None
+        expires_value = expires_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    elif DEFAULT_DEPLOYMENT_TTL_HOURS > 0:
+        expires_dt = datetime.utcnow() + timedelta(hours=DEFAULT_DEPLOYMENT_TTL_HOURS)
+        expires_value = expires_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    
     # Process search flag
     include_search_flag = str(include_search).lower() in {"on", "1", "true", "yes"}
     
@@ -67,12 +89,96 @@ def validate_deployment_form(
         "openai_model_name": openai_model_name,
         "service_principal_name": service_principal_name.strip(),
         "secret_expiration_date": secret_expiration_date.strip(),
-        "subscription_id": (subscription_id or "").strip()
+        "subscription_id": (subscription_id or "").strip(),
+        "expires_at": expires_value
     }
     
     return True, None, validated_params
 
 
+def validate_batch_form(
+    resource_group_base: str,
+    count: str,
+    location: str,
+    openai_model_name: str,
+    service_principal_name: str,
+    secret_expiration_date: str,
+    include_search: Optional[str] = None,
+    subscription_id: Optional[str] = None,
+    expires_at: Optional[str] = None
+) -> Tuple[bool, Optional[str], Optional[Dict[str, Any]]]:
+    """Validate batch deployment form parameters.
+    
+    Shared parameters follow the single deployment rules; the base name is
+    later suffixed with a zero-padded index per environment.
+    
+    Args:
+        resource_group_base: Shared base name for all environments
+        count: Number of environments requested
+        location: Azure region
+        openai_model_name: Selected OpenAI model
+        service_principal_name: Prefix for per-environment service principal names
+        secret_expiration_date: Expiration date for SP secrets
+        include_search: Optional search service flag
+        subscription_id: Optional Azure subscription ID
+        expires_at: Optional ISO date/time after which the environments are destroyed
+        
+    Returns:
+        Tuple of (is_valid, error_message, validated_params) where
+        validated_params also contains the integer ``count``
+    """
+    try:
+        count_value = int(count)
+    except (TypeError, ValueError):
+        return False, "Environment count must be a number.", None
+    if count_value < 1 or count_value > MAX_BATCH_SIZE:
+        return False, f"Environment count must be between 1 and {MAX_BATCH_SIZE}.", None
+
+    is_valid, error_message, validated_params = validate_deployment_form(
+        resource_group_base, location, openai_model_name,
+        service_principal_name, secret_expiration_date,
+        include_search, subscription_id, expires_at
+    )
+    if not is_valid:
+        return False, error_message, None
+
+    validated_params["count"] = count_value
+    return True, None, validated_params
+
+
+def validate_bulk_destroy_filters(
+    status: Optional[str] = None,
+    region: Optional[str] = None,
+    created_before: Optional[str] = None
+) -> Tuple[bool, Optional[str], Optional[Dict[str, Optional[str]]]]:
+    """Validate the index filters of a bulk destroy request.
+    
+    ``created_before`` is compared as text against the stored UTC
+    ``created_at`` values, so it is normalized to the same format.
+    
+    Args:
+        status: Optional deployment status (a DeploymentStatus value)
+        region: Optional Azure region
+        created_before: Optional ISO date/time (no offset = server local time)
+        
+    Returns:
+        Tuple of (is_valid, error_message, filters)
+    """
+    if status is not None:
+        try:
+            status = DeploymentStatus(status)
+        except ValueError:
+            return False, f"Unknown status '{status}'.", None
+    created_value = None
+    if created_before is not None:
+        try:
+            created_dt = datetime.fromisoformat(created_before.strip())
+        except ValueError:
+            return False, "Invalid created_before date/time.", None
+        created_value = created_dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return True, None, {"status": status, "region": region, "created_before": created_value}
+
+
 def render_form_error(
     templates: Jinja2Templates, 
     request: Request, 
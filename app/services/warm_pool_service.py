@@ -0,0 +1,299 @@
+"""
+Warm pool service for Azure AI Multi-Environment Manager.
+
+A full lab environment takes many minutes to apply. The warm pool keeps
+WARM_POOL_SIZE environments per configured "region:model[:search]" spec
+already applied in the background (queued behind user deploys). A deploy
+request with matching parameters claims a warm environment instead: one
+targeted terraform apply re-tags the resource group, renames the service
+principal and replaces its secret, which takes seconds. The pool is refilled
+asynchronously after every claim and periodically.
+
+That apply is queued on the shared deployment scheduler like any other
+terraform run (at deploy priority), so claims count against the global,
+per-subscription and per-region limits. The claimed environment keeps its
+pool resource group name (RG-<WARM_POOL_NAME_PREFIX>NN): Azure resource
+group names are immutable, so the requested lab name is recorded as the
+``lab`` tag instead.
+"""
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..config import (
+    MAX_RESOURCE_GROUP_LENGTH, WARM_POOL_NAME_PREFIX, WARM_POOL_REFILL_INTERVAL,
+    WARM_POOL_SECRET_DAYS, WARM_POOL_SERVICE_PRINCIPAL, WARM_POOL_SIZE, WARM_POOL_SPECS
+)
+from ..models.deployment import DeploymentStatus
+from ..utils.file_operations import cleanup_terraform_files
+from ..utils.naming import build_batch_names
+from .azure_service import invalidate_auth_cache
+from .deployment_service import enqueue_deployment, ensure_azure_login, new_deployment_record
+from .executor_service import run_blocking
+from .persistence_service import (
+    append_log, get_all_deployments, query_deployments, release_deployment_logs,
+    reset_deployment_logs, save_deployment_state_async
+)
+from .scheduler_service import PRIORITY_DEPLOY, PRIORITY_WARM_POOL, deployment_scheduler
+from .terraform_progress import clear_progress, start_progress
+from .terraform_service import (
+    generate_tfvars_content, parse_terraform_outputs, prepare_module_workspace,
+    terraform_apply, write_tfvars_file
+)
+from .timeline_service import DeploymentTimeline, span
+
+# Status of an applied pool member waiting to be claimed
+WARM_STATUS = DeploymentStatus.WARM
+# Statuses of pool members that are (or will become) claimable
+FILLING_STATUSES = {
+    DeploymentStatus.QUEUED, DeploymentStatus.STARTING, DeploymentStatus.TERRAFORM, DeploymentStatus.FOUNDRY, WARM_STATUS
+}
+
+# Only the resources that carry the owner identity are touched on claim
+CLAIM_APPLY_ARGS = [
+    "-refresh=false",
+    "-target=azurerm_resource_group.rg",
+    "-target=azuread_application.deployment_app",
+    "-target=azuread_application_password.deployment_secret",
+    "-replace=azuread_application_password.deployment_secret",
+]
+
+
+def warm_pool_specs() -> List[Tuple[str, str, bool]]:
+    """Parse WARM_POOL_SPECS into (location, model, include_search) tuples."""
+    specs = []
+    for spec in WARM_POOL_SPECS:
+        parts = spec.split(":")
+        if len(parts) < 2:
+            print(f"Ignoring invalid warm pool spec '{spec}' (expected region:model[:search])")
+            continue
+        specs.append((parts[0], parts[1], len(parts) > 2 and parts[2].lower() == "search"))
+    return specs
+
+
+def warm_pool_enabled() -> bool:
+    return WARM_POOL_SIZE > 0 and bool(warm_pool_specs())
+
+
+def pool_key(location: str, model: str, include_search: bool) -> str:
+    """Identifier of the pool serving requests with these parameters."""
+    return f"{location}:{model}" + (":search" if include_search else "")
+
+
+# Refills run from the periodic loop and after claims; never both at once
+_refill_lock = asyncio.Lock()
+# Refills started after claims (kept referenced until they finish)
+_refills: Set[asyncio.Task] = set()
+
+
+async def refill_warm_pool(
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> int:
+    """Queue new pool members for every spec below WARM_POOL_SIZE.
+
+    Args:
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+
+    Returns:
+        Number of environments queued
+    """
+    created = 0
+    async with _refill_lock:
+        for location, model, include_search in warm_pool_specs():
+            key = pool_key(location, model, include_search)
+            members = query_deployments(warm_pool=key)
+            missing = WARM_POOL_SIZE - sum(1 for row in members.values() if row.get("status") in FILLING_STATUSES)
+            if missing <= 0:
+                continue
+            taken = {
+                row.get("name") for row in get_all_deployments().values()
+                if row.get("status") != DeploymentStatus.DESTROYED
+            }
+            expiration = (date.today() + timedelta(days=WARM_POOL_SECRET_DAYS)).isoformat()
+            for env_base, names in build_batch_names(
+                WARM_POOL_NAME_PREFIX, missing,
+                max_base_length=MAX_RESOURCE_GROUP_LENGTH, taken_bases=taken,
+            ):
+                record = new_deployment_record({
+                    "resource_group_base_clean": env_base,
+                    "location": location,
+                    "include_search": include_search,
+                    "openai_model_name": model,
+                    "subscription_id": "",
+                    "service_principal_name": f"{WARM_POOL_SERVICE_PRINCIPAL}-{env_base}",
+                    "secret_expiration_date": expiration,
+                }, names)
+                record["warm_pool"] = key
+                record["params"]["tags"] = {"warm-pool": key}
+                deployment_id = str(uuid.uuid4())
+                deployments[deployment_id] = record
+                await enqueue_deployment(
+                    deployment_id, deployments, deployment_states_dir, terraform_dir, PRIORITY_WARM_POOL
+                )
+                created += 1
+    return created
+
+
+async def run_warm_pool(
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> None:
+    """Keep the pool topped up every WARM_POOL_REFILL_INTERVAL seconds (runs until cancelled)."""
+    while True:
+        try:
+            created = await refill_warm_pool(deployments, deployment_states_dir, terraform_dir)
+            if created:
+                print(f"Warm pool: queued {created} environments")
+        except Exception as e:
+            print(f"Warm pool refill failed: {e}")
+        await asyncio.sleep(WARM_POOL_REFILL_INTERVAL)
+
+
+def get_warm_pool_status() -> Dict[str, Any]:
+    """Ready and filling member counts per configured spec."""
+    pools = {}
+    for location, model, include_search in warm_pool_specs():
+        key = pool_key(location, model, include_search)
+        statuses = [row.get("status") for row in query_deployments(warm_pool=key).values()]
+        pools[key] = {
+            "target": WARM_POOL_SIZE,
+            "ready": statuses.count(WARM_STATUS),
+            "filling": sum(1 for s in statuses if s in FILLING_STATUSES and s != WARM_STATUS),
+        }
+    return {"enabled": warm_pool_enabled(), "pools": pools}
+
+
+async def claim_warm_environment(
+    validated_params: Dict[str, Any],
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> Optional[str]:
+    """Hand a warm environment matching the request to the requester.
+
+    The member is marked claimed before this returns; re-tagging and the
+    service principal rotation are queued on the deployment scheduler,
+    followed by a refill of the pool.
+
+    Args:
+        validated_params: Output of validation_service.validate_deployment_form
+        deployments: Global deployments dictionary (for state updates)
+        deployment_states_dir: Base directory for deployment persistence
+        terraform_dir: Directory containing terraform configuration files
+
+    Returns:
+        deployment_id of the claimed environment, or None if none is ready
+    """
+    if not warm_pool_enabled():
+        return None
+    key = pool_key(
+        validated_params["location"], validated_params["openai_model_name"], validated_params["include_search"]
+    )
+    subscription_id = validated_params["subscription_id"]
+    claimed_id = None
+    for deployment_id in query_deployments(status=WARM_STATUS, warm_pool=key):
+        record = deployments.get(deployment_id)
+        if not record or record.get("status") != WARM_STATUS:
+            continue
+        if subscription_id and record["params"].get("subscription_id") != subscription_id:
+            continue
+        # No await since the status check, so no other request can claim it too
+        record["status"] = DeploymentStatus.CLAIMING
+        claimed_id = deployment_id
+        break
+    if claimed_id is None:
+        return None
+
+    record = deployments[claimed_id]
+    record["claimed_at"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    if validated_params.get("expires_at"):
+        record["expires_at"] = validated_params["expires_at"]
+    record["params"].update({
+        "service_principal_name": validated_params["service_principal_name"],
+        "secret_expiration_date": validated_params["secret_expiration_date"],
+        "tags": {
+            "warm-pool": key,
+            "lab": validated_params["resource_group_base_clean"],
+            "service-principal": validated_params["service_principal_name"],
+        },
+    })
+    reset_deployment_logs(claimed_id)  # Pool fill history kept as deployment.log.1
+    append_log(claimed_id, f"[POOL] Claimed warm environment RG-{record['params']['resource_group_base']} from pool {key}")
+    await save_deployment_state_async(claimed_id, record)
+
+    params = record["params"]
+    position = deployment_scheduler.submit(
+        claimed_id,
+        lambda: _finish_claim(claimed_id, deployments, deployment_states_dir, terraform_dir),
+        subscription=params.get("subscription_id") or "",
+        region=params.get("location") or "",
+        priority=PRIORITY_DEPLOY,
+    )
+    if position is not None:
+        append_log(claimed_id, f"[QUEUE] Waiting for a free deployment slot (position {position})")
+    return claimed_id
+
+
+async def _finish_claim(
+    deployment_id: str,
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> None:
+    record = deployments[deployment_id]
+    deployment_dir = deployment_states_dir / deployment_id
+    timeline = DeploymentTimeline(record, "claim")
+
+    def log_callback(line: str):
+        append_log(deployment_id, line)
+
+    try:
+        await ensure_azure_login(deployment_id, deployments, record["params"], timeline)
+        record["module_version"] = await prepare_module_workspace(
+            deployment_dir, terraform_dir, module_version=record.get("module_version"),
+            log_callback=log_callback, timeline=timeline
+        )
+        write_tfvars_file(deployment_dir, generate_tfvars_content(record["params"], record["names"]))
+        append_log(deployment_id, "[POOL] Re-tagging resource group and rotating service principal secret")
+        with span(timeline, "claim_apply"):
+            await terraform_apply(
+                deployment_dir, log_callback=log_callback, max_retries=2,
+                progress=start_progress(deployment_id, "apply"), extra_args=CLAIM_APPLY_ARGS,
+                timeline=timeline
+            )
+        outputs = await run_blocking(parse_terraform_outputs, deployment_dir, label="terraform_output")
+        record["outputs"].update(outputs)
+        record["status"] = DeploymentStatus.COMPLETED
+        append_log(deployment_id, "Deployment completed successfully")
+    except Exception as e:  # noqa
+        record["status"] = DeploymentStatus.ERROR
+        append_log(deployment_id, f"ERROR while claiming warm environment: {e}")
+        invalidate_auth_cache()
+    finally:
+        if deployment_dir.exists():
+            await run_blocking(cleanup_terraform_files, deployment_dir, label="cleanup_terraform_files")
+        await save_deployment_state_async(deployment_id, record, record.get("outputs", {}))
+        release_deployment_logs(deployment_id)
+        clear_progress(deployment_id)
+    # Runs once this job has returned, so the refill does not hold the claim's scheduler slot
+    task = asyncio.create_task(_refill_after_claim(deployments, deployment_states_dir, terraform_dir))
+    _refills.add(task)
+    task.add_done_callback(_refills.discard)
+
+
+async def _refill_after_claim(
+    deployments: Dict[str, Dict],
+    deployment_states_dir: Path,
+    terraform_dir: Path
+) -> None:
+    try:
+        await refill_warm_pool(deployments, deployment_states_dir, terraform_dir)
+    except Exception as e:
+        print(f"Warm pool refill failed: {e}")
@@ -4,9 +4,15 @@ File operations utilities for Azure AI Multi-Environment Manager.
 This module provides functions for file operations, terraform file management,
 and deployment logging.
 """
+import hashlib
+import os
 import shutil
+import tempfile
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
+
+# Shared files of a module snapshot that workspaces link to (besides the .tf files)
+SNAPSHOT_SHARED_ENTRIES = (".terraform", ".terraform.lock.hcl")
 
 
 def copy_terraform_files(source_dir: Path, dest_dir: Path) -> None:
@@ -25,19 +31,93 @@ def copy_terraform_files(source_dir: Path, dest_dir: Path) -> None:
         shutil.copy2(tf_file, dest_dir / tf_file.name)
 
 
+def terraform_module_version(source_dir: Path) -> str:
+    """Content hash of the .tf files in a directory (names and bytes).
+    
+    Args:
+        source_dir: Directory containing .tf files
+        
+    Returns:
+        Short hex digest identifying this exact module content
+    """
+    digest = hashlib.sha256()
+    for tf_file in sorted(source_dir.glob("*.tf")):
+        digest.update(tf_file.name.encode("utf-8") + b"\0")
+        digest.update(tf_file.read_bytes() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def snapshot_terraform_module(
+    source_dir: Path, snapshots_dir: Path, version: Optional[str] = None
+) -> Tuple[str, Path]:
+    """Create (once) an immutable, content-addressed copy of a terraform module.
+    
+    Args:
+        source_dir: Directory containing the current .tf files
+        snapshots_dir: Parent directory of all module snapshots
+        version: Reuse an existing snapshot version instead of hashing source_dir
+        
+    Returns:
+        Tuple of (module_version, snapshot_dir)
+    """
+    if version and (snapshots_dir / version).is_dir():
+        return version, snapshots_dir / version
+    version = terraform_module_version(source_dir)
+    snapshot_dir = snapshots_dir / version
+    if snapshot_dir.is_dir():
+        return version, snapshot_dir
+    snapshots_dir.mkdir(parents=True, exist_ok=True)
+    # Build in a scratch dir and rename so concurrent callers never see a partial snapshot
+    scratch = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=snapshots_dir))
+    copy_terraform_files(source_dir, scratch)
+    try:
+        os.rename(scratch, snapshot_dir)
+    except OSError:
+        shutil.rmtree(scratch, ignore_errors=True)  # Another caller won the race
+    return version, snapshot_dir
+
+
+def link_module_snapshot(snapshot_dir: Path, dest_dir: Path) -> None:
+    """Point a deployment workspace at a module snapshot via symlinks.
+    
+    Links every .tf file plus the snapshot's initialized ``.terraform`` dir and
+    lock file, so the workspace needs neither copies nor its own init. Falls
+    back to copying .tf files where symlinks are unavailable.
+    
+    Args:
+        snapshot_dir: Snapshot created by snapshot_terraform_module
+        dest_dir: Deployment workspace directory
+    """
+    dest_dir.mkdir(exist_ok=True)
+    cleanup_terraform_files(dest_dir)
+    entries = [f.name for f in snapshot_dir.glob("*.tf")] + list(SNAPSHOT_SHARED_ENTRIES)
+    for name in entries:
+        target = snapshot_dir / name
+        link = dest_dir / name
+        if link.is_symlink() or link.is_file():
+            link.unlink()
+        elif link.is_dir():
+            shutil.rmtree(link)  # Workspace-local .terraform from before snapshots existed
+        if name in SNAPSHOT_SHARED_ENTRIES and not target.exists():
+            continue
+        try:
+            link.symlink_to(target, target_is_directory=target.is_dir())
+        except OSError:
+            if target.is_dir():
+                shutil.copytree(target, link)
+            else:
+                shutil.copy2(target, link)
+
+
 def cleanup_terraform_files(deployment_dir: Path) -> None:
-    """Remove .tf files from deployment directory after successful operations.
+    """Remove .tf files and saved plans from deployment directory after operations.
     
     Keeps only terraform.tfstate and terraform.tfvars files for potential future operations.
     
     Args:
         deployment_dir: Directory to clean up
     """
-    tf_files = deployment_dir.glob("*.tf")
+    tf_files = list(deployment_dir.glob("*.tf")) + list(deployment_dir.glob("*.tfplan"))
     for tf_file in tf_files:
         if tf_file.exists():
             tf_file.unlink()
-
-
-# Note: append_log function moved back to main.py temporarily to avoid circular imports
-# Will be refactored properly in later phases when we create proper logging service
\ No newline at end of file
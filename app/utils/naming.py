@@ -6,7 +6,7 @@ with appropriate length constraints and random suffixes.
 """
 import random
 import string
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 
 
 def random_suffix(length: int = 5) -> str:
@@ -59,4 +59,46 @@ def build_names(base: str) -> Dict[str, str]:
         "log_analytics_workspace_name": law,
         "project_name": project,
         "suffix": suf,
-    }
\ No newline at end of file
+    }
+
+
+def build_batch_names(
+    base: str,
+    count: int,
+    max_base_length: int = 15,
+    taken_bases: Optional[Iterable[str]] = None,
+) -> List[Tuple[str, Dict[str, str]]]:
+    """Pre-generate collision-free names for a batch of environments.
+
+    Each environment gets its own base ``<base><NN>`` (truncated so the index
+    always fits in ``max_base_length``) and a random suffix that is unique
+    within the batch, so no two environments share any resource name.
+
+    Args:
+        base: Shared base name for the batch (will be sanitized)
+        count: Number of environments
+        max_base_length: Maximum length of each environment base name
+        taken_bases: Environment bases already in use (skipped)
+
+    Returns:
+        List of (environment_base, names) tuples in batch order
+    """
+    base_s = sanitize_base(base)
+    width = max(2, len(str(count)))
+    taken = set(taken_bases or ())
+    used_suffixes = set()
+    result = []
+    index = 0
+    while len(result) < count:
+        index += 1
+        digits = f"{index:0{width}d}"
+        env_base = base_s[: max(0, max_base_length - len(digits))] + digits
+        if env_base in taken:
+            continue
+        taken.add(env_base)
+        names = build_names(env_base)
+        while names["suffix"] in used_suffixes:
+            names = build_names(env_base)
+        used_suffixes.add(names["suffix"])
+        result.append((env_base, names))
+    return result
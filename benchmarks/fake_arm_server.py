@@ -0,0 +1,281 @@
+"""
+Local stand-in for the Azure Resource Manager REST endpoints the app calls.
+
+``FakeArmServer`` is a threaded stdlib HTTP server that answers what
+app/services/arm_client.py sends: the Entra ID client-credentials token
+request, Cognitive Services / Storage ``listKeys``, Search
+``listQueryKeys`` and resource group ``DELETE`` with a 202 + Location
+long-running operation. Pointing AZURE_ARM_ENDPOINT and AZURE_AUTHORITY_HOST
+at it (``environment()``) lets the benchmarks drive the REST key path
+instead of the az fallback.
+
+Knobs (environment variables, read per request):
+    FAKE_ARM_LATENCY        seconds per request (default 0.05)
+    FAKE_ARM_FAIL_RATE      probability a listKeys call returns 429 (default 0)
+    FAKE_ARM_DELETE_POLLS   202 responses before a delete completes (default 2)
+    FAKE_SEED               seed for failure injection (default: random)
+
+Usage:
+    python -m benchmarks.fake_arm_server --port 8799
+    python -m benchmarks.fake_arm_server --check --iterations 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+# Tokens handed out by the token endpoint (plus any AZURE_ARM_TOKEN in use)
+TOKEN_PREFIX = "fake-arm-token-"
+KEYS_PATH = re.compile(
+    r"^/subscriptions/[^/]+/resourceGroups/[^/]+/providers/"
+    r"(Microsoft\.CognitiveServices/accounts|Microsoft\.Storage/storageAccounts|Microsoft\.Search/searchServices)"
+    r"/([^/]+)/(listKeys|listQueryKeys)$",
+    re.IGNORECASE,
+)
+GROUP_PATH = re.compile(r"^/subscriptions/[^/]+/resourcegroups/([^/]+)$", re.IGNORECASE)
+TOKEN_PATH = re.compile(r"^/[^/]+/oauth2/v2\.0/token$")
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _keys_body(provider: str, name: str) -> Dict[str, Any]:
+    provider = provider.lower()
+    if provider.startswith("microsoft.cognitiveservices"):
+        return {"key1": f"fake-{name}-key-1", "key2": f"fake-{name}-key-2"}
+    if provider.startswith("microsoft.storage"):
+        return {"keys": [{"keyName": "key1", "value": "ZmFrZQ==", "permissions": "FULL"}]}
+    return {"value": [{"name": "default", "key": f"fake-{name}-query-key"}]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeArmServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, like ARM
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _send(self, status: int, body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token in self.server.tokens or token == os.getenv("AZURE_ARM_TOKEN"):
+            return True
+        self.server.count("unauthorized")
+        self._send(401, {"error": {"code": "InvalidAuthenticationToken", "message": "The access token is invalid."}})
+        return False
+
+    def _route(self) -> Tuple[str, Dict[str, str]]:
+        path, _, query = self.path.partition("?")
+        params = dict(part.split("=", 1) for part in query.split("&") if "=" in part)
+        return path, params
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        time.sleep(_env_float("FAKE_ARM_LATENCY", 0.05))
+        path, _ = self._route()
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if TOKEN_PATH.match(path):
+            self.server.count("token")
+            token = self.server.issue_token()
+            return self._send(200, {"token_type": "Bearer", "expires_in": 3600, "access_token": token})
+        match = KEYS_PATH.match(path)
+        if not match:
+            return self._send(404, {"error": {"code": "NotFound", "message": path}})
+        if not self._authorized():
+            return
+        if self.server.rng.random() < _env_float("FAKE_ARM_FAIL_RATE", 0):
+            self.server.count("throttled")
+            return self._send(429, {"error": {"code": "TooManyRequests", "message": "Rate limit exceeded"}})
+        self.server.count(match.group(3))
+        self._send(200, _keys_body(match.group(1), match.group(2)))
+
+    def do_DELETE(self) -> None:  # noqa: N802 - stdlib naming
+        time.sleep(_env_float("FAKE_ARM_LATENCY", 0.05))
+        path, _ = self._route()
+        match = GROUP_PATH.match(path)
+        if not match:
+            return self._send(404, {"error": {"code": "NotFound", "message": path}})
+        if not self._authorized():
+            return
+        self.server.count("delete")
+        operation = self.server.start_operation()
+        self._send(202, headers={
+            "Location": f"{self.server.base_url}/operations/{operation}?api-version=2021-04-01",
+            "Retry-After": "0",
+        })
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        time.sleep(_env_float("FAKE_ARM_LATENCY", 0.05))
+        path, _ = self._route()
+        if not path.startswith("/operations/"):
+            return self._send(404, {"error": {"code": "NotFound", "message": path}})
+        if not self._authorized():
+            return
+        self.server.count("poll")
+        if self.server.poll_operation(path.rsplit("/", 1)[1]):
+            return self._send(200)
+        self._send(202, headers={"Location": f"{self.server.base_url}{self.path}", "Retry-After": "0"})
+
+
+class FakeArmServer(ThreadingHTTPServer):
+    """Fake ARM + token endpoint on 127.0.0.1, served from a daemon thread."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        seed = os.getenv("FAKE_SEED")
+        self.rng = random.Random(seed) if seed is not None else random.Random()
+        self.requests: Counter = Counter()
+        self.tokens = set()
+        self._operations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def environment(self) -> Dict[str, str]:
+        """Settings that send arm_client (client-credentials flow) to this server."""
+        return {
+            "AZURE_KEYS_BACKEND": "arm",
+            "AZURE_ARM_ENDPOINT": self.base_url,
+            "AZURE_AUTHORITY_HOST": self.base_url,
+            "AZURE_TENANT_ID": "22222222-2222-2222-2222-222222222222",
+            "AZURE_CLIENT_ID": "fake-client",
+            "AZURE_CLIENT_SECRET": "fake-secret",
+        }
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def issue_token(self) -> str:
+        token = TOKEN_PREFIX + uuid.uuid4().hex
+        with self._lock:
+            self.tokens.add(token)
+        return token
+
+    def revoke_tokens(self) -> None:
+        """Invalidate every issued token (the next request gets a 401)."""
+        with self._lock:
+            self.tokens.clear()
+
+    def start_operation(self) -> str:
+        operation = uuid.uuid4().hex
+        with self._lock:
+            self._operations[operation] = int(_env_float("FAKE_ARM_DELETE_POLLS", 2))
+        return operation
+
+    def poll_operation(self, operation: str) -> bool:
+        """Return True once the operation has been polled often enough to be done."""
+        with self._lock:
+            remaining = self._operations.get(operation, 0)
+            if remaining <= 1:
+                self._operations.pop(operation, None)
+                return True
+            self._operations[operation] = remaining - 1
+            return False
+
+    def start(self) -> "FakeArmServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-arm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+async def run_check(server: FakeArmServer, iterations: int) -> Dict[str, float]:
+    """Exercise every arm_client call against the fake and time key retrieval.
+
+    Must run after server.environment() has been applied to os.environ (the
+    app reads its configuration at import time).
+    """
+    from app.services import arm_client
+    from app.services.azure_service import fetch_service_credentials
+
+    subscription, group = "00000000-0000-0000-0000-000000000000", "RG-check"
+    assert arm_client.arm_backend_enabled(), "httpx missing or AZURE_KEYS_BACKEND=az"
+
+    keys = await arm_client.list_ai_services_keys(subscription, group, "ai-check")
+    assert keys["key1"] == "fake-ai-check-key-1", keys
+    storage = await arm_client.list_storage_keys(subscription, group, "stcheck")
+    assert storage["keys"][0]["value"] == "ZmFrZQ==", storage
+    search = await arm_client.list_search_query_keys(subscription, group, "srch-check")
+    assert search["value"][0]["key"] == "fake-srch-check-query-key", search
+    assert server.requests["token"] == 1, "token should be fetched once and reused"
+
+    # A revoked token is refreshed once and the request retried
+    server.revoke_tokens()
+    await arm_client.list_ai_services_keys(subscription, group, "ai-check")
+    assert server.requests["unauthorized"] == 1 and server.requests["token"] == 2, server.requests
+
+    assert await arm_client.delete_resource_group(subscription, group) is True
+    assert server.requests["poll"] >= 1, "delete should poll the operation Location"
+
+    names = {"ai_services_name": "ai-check", "storage_account_name": "stcheck", "search_service_name": "srch-check"}
+    credentials = await fetch_service_credentials(names, group, True, subscription)
+    assert all(credentials.values()), credentials
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch_service_credentials(names, group, True, subscription) for _ in range(iterations)))
+    elapsed = time.perf_counter() - started
+    await arm_client.arm_client.aclose()
+    return {
+        "iterations": iterations,
+        "credential_fetches_per_s": round(iterations / elapsed, 1),
+        "requests": dict(server.requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Azure Resource Manager server")
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on (0 = any free port)")
+    parser.add_argument("--check", action="store_true", help="Exercise app/services/arm_client.py against it and exit")
+    parser.add_argument("--iterations", type=int, default=100, help="Concurrent credential fetches timed by --check")
+    args = parser.parse_args()
+
+    server = FakeArmServer(args.port).start()
+    if not args.check:
+        print(f"Fake ARM listening on {server.base_url}")
+        for key, value in server.environment().items():
+            print(f"export {key}={value}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        server.stop()
+        return
+
+    os.environ.update(server.environment())
+    try:
+        results = asyncio.run(run_check(server, args.iterations))
+    finally:
+        server.stop()
+    print(f"arm_client check passed: {results['credential_fetches_per_s']} credential fetches/s "
+          f"over {results['iterations']} concurrent fetches")
+    print(f"requests {results['requests']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Stand-in ``terraform`` and ``az`` executables for offline benchmarks.
+
+``install(bin_dir)`` writes two small wrappers that re-enter this module, so
+putting ``bin_dir`` first on PATH makes the app drive the fakes instead of the
+real CLIs. The fakes behave like the commands the app runs: terraform emits
+``-json`` events, writes saved plans and a version 4 local state with the
+outputs of terraform/outputs.tf, and az returns the JSON shapes of the
+account / keys / connection-string commands.
+
+Knobs (environment variables, read on every invocation):
+    FAKE_TF_LATENCY         seconds per plan/apply/destroy, spread across resources (default 2)
+    FAKE_TF_INIT_LATENCY    seconds per init (default 0.5)
+    FAKE_TF_RESOURCES       resources in the fake configuration; scales event/output volume (default 25)
+    FAKE_TF_LOG_LINES       extra plain log lines per command (default 0)
+    FAKE_TF_CONFLICT_RATE   probability an apply hits a retryable 409 Conflict, once per workspace (default 0)
+    FAKE_TF_TIMEOUT_RATE    probability an apply fails with a non-retryable timeout (default 0)
+    FAKE_AZ_LATENCY         seconds per az call (default 0.3)
+    FAKE_AZ_FAIL_RATE       probability a key/credential az call fails (default 0)
+    FAKE_SEED               seed for failure injection (default: random)
+
+POSIX only (the wrappers are shell scripts).
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+STATE_FILE = "terraform.tfstate"
+# Marks a workspace whose one injected conflict has already happened
+CONFLICT_MARKER = ".fake-conflict"
+# Core resources; role assignments are added until FAKE_TF_RESOURCES is reached
+CORE_RESOURCES = [
+    "azurerm_resource_group.rg",
+    "azurerm_log_analytics_workspace.law",
+    "azurerm_application_insights.appins",
+    "azurerm_storage_account.stg",
+    "azapi_resource.hub",
+    "azapi_resource.project",
+    "azurerm_cognitive_deployment.model",
+    "time_sleep.wait_project_identities",
+    "time_sleep.wait_for_hub_stability",
+    "azuread_application.deployment_app",
+    "azuread_service_principal.deployment_sp",
+    "azuread_application_password.deployment_secret",
+]
+
+
+def install(bin_dir: Path) -> Path:
+    """Write ``terraform`` and ``az`` wrappers into bin_dir and return it."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    module = Path(__file__).resolve()
+    for tool in ("terraform", "az"):
+        wrapper = bin_dir / tool
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{module}" {tool} "$@"\n', encoding="utf-8")
+        wrapper.chmod(0o755)
+    return bin_dir
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _rng(salt: str) -> random.Random:
+    seed = os.getenv("FAKE_SEED")
+    if seed is None:
+        return random.Random()
+    # Deterministic per workspace and call, different across workspaces
+    return random.Random(f"{seed}:{os.getcwd()}:{salt}")
+
+
+def _emit(event_type: str, message: str, json_mode: bool, **fields) -> None:
+    if json_mode:
+        print(json.dumps({"@level": "info", "@message": message, "type": event_type, **fields}), flush=True)
+    else:
+        print(message, flush=True)
+
+
+def _tfvars() -> Dict[str, str]:
+    tfvars = Path("terraform.tfvars")
+    if not tfvars.exists():
+        return {}
+    return dict(re.findall(r'^(\w+)\s*=\s*"([^"]*)"', tfvars.read_text(encoding="utf-8"), re.MULTILINE))
+
+
+def _addresses() -> List[str]:
+    count = int(_env_float("FAKE_TF_RESOURCES", 25))
+    addresses = CORE_RESOURCES[:count]
+    addresses += [f"azurerm_role_assignment.fake[{i}]" for i in range(max(0, count - len(addresses)))]
+    return addresses
+
+
+def _resource_id(address: str, variables: Dict[str, str]) -> str:
+    group = f"/subscriptions/{variables.get('subscription_id') or '00000000-0000-0000-0000-000000000000'}" \
+            f"/resourceGroups/{variables.get('rg_name', 'RG-fake')}"
+    if address == "azurerm_resource_group.rg":
+        return group
+    return f"{group}/providers/Fake.Provider/{address.replace('[', '-').replace(']', '')}"
+
+
+def _outputs(variables: Dict[str, str]) -> Dict[str, str]:
+    ais = variables.get("ai_services_name", "fakeais")
+    return {
+        "ai_services_name": ais,
+        "ai_services_endpoint": f"https://{ais}.cognitiveservices.azure.com/",
+        "openai_endpoint": f"https://{ais}.openai.azure.com/",
+        "openai_deployment_name": variables.get("model_deployment_name", "gpt-4.1"),
+        "openai_model_name": variables.get("openai_model_name", "gpt-4.1"),
+        "storage_account_name": variables.get("storage_account_name", "fakestg"),
+        "foundry_project_name": variables.get("foundry_project_name", "fakeprj"),
+        "foundry_project_endpoint": f"https://{ais}.services.ai.azure.com/api/projects/fake",
+        "service_principal_app_id": "11111111-1111-1111-1111-111111111111",
+        "service_principal_secret": f"fake-secret-{int(time.time())}",
+        "tenant_id": "22222222-2222-2222-2222-222222222222",
+    }
+
+
+def _write_state(addresses: List[str], variables: Dict[str, str], outputs: Dict[str, str]) -> None:
+    resources = []
+    for address in addresses:
+        resource_type, name = address.split(".", 1)
+        attributes = {"id": _resource_id(address, variables)}
+        if resource_type == "azurerm_resource_group":
+            attributes["name"] = variables.get("rg_name", "RG-fake")
+        elif resource_type == "azuread_application":
+            attributes = {"id": "/applications/fake", "client_id": outputs["service_principal_app_id"]}
+        resources.append({
+            "mode": "managed", "type": resource_type, "name": name.split("[")[0],
+            "instances": [{"attributes": attributes}],
+        })
+    previous = json.loads(Path(STATE_FILE).read_text(encoding="utf-8")) if Path(STATE_FILE).exists() else {}
+    state = {
+        "version": 4, "terraform_version": "1.9.0", "serial": previous.get("serial", 0) + 1,
+        "lineage": "fake-toolchain",
+        "outputs": {k: {"value": v, "type": "string"} for k, v in outputs.items()},
+        "resources": resources,
+    }
+    Path(STATE_FILE).write_text(json.dumps(state), encoding="utf-8")
+
+
+def _state_addresses() -> List[str]:
+    if not Path(STATE_FILE).exists():
+        return []
+    state = json.loads(Path(STATE_FILE).read_text(encoding="utf-8"))
+    return [f"{r['type']}.{r['name']}" for r in state.get("resources", [])]
+
+
+def _log_noise(count: int) -> None:
+    for i in range(count):
+        print(f"fake-provider: debug line {i} " + "x" * 60, flush=True)
+
+
+def terraform(args: List[str]) -> int:
+    command = args[0] if args else ""
+    json_mode = "-json" in args
+    variables = _tfvars()
+    latency = _env_float("FAKE_TF_LATENCY", 2)
+    _log_noise(int(_env_float("FAKE_TF_LOG_LINES", 0)))
+
+    if command == "init":
+        time.sleep(_env_float("FAKE_TF_INIT_LATENCY", 0.5))
+        Path(".terraform").mkdir(exist_ok=True)
+        print("Terraform has been successfully initialized!", flush=True)
+        return 0
+
+    if command == "output":
+        print(json.dumps({k: {"value": v, "type": "string", "sensitive": False}
+                          for k, v in _outputs(variables).items()}))
+        return 0
+
+    if command == "plan":
+        addresses = _addresses()
+        time.sleep(latency / 4)
+        for address in addresses:
+            _emit("planned_change", f"{address}: Plan to create", json_mode,
+                  change={"resource": {"addr": address}, "action": "create"})
+        _emit("change_summary", f"Plan: {len(addresses)} to add, 0 to change, 0 to destroy.", json_mode,
+              changes={"add": len(addresses), "change": 0, "remove": 0, "operation": "plan"})
+        out = next((a.split("=", 1)[1] for a in args if a.startswith("-out=")), None)
+        if out:
+            Path(out).write_text(json.dumps(addresses), encoding="utf-8")
+        return 0
+
+    if command == "apply":
+        addresses = _addresses()
+        targets = [a.split("=", 1)[1] for a in args if a.startswith("-target=")]
+        plan_files = [a for a in args[1:] if not a.startswith("-")]
+        if plan_files:
+            addresses = json.loads(Path(plan_files[0]).read_text(encoding="utf-8"))
+        pending = [a for a in addresses if a in targets] if targets else addresses
+        if not plan_files:
+            time.sleep(latency / 4)  # Implicit plan
+        rng = _rng(f"apply:{len(_state_addresses())}")
+        conflict_at = None
+        if not Path(CONFLICT_MARKER).exists() and rng.random() < _env_float("FAKE_TF_CONFLICT_RATE", 0):
+            conflict_at = rng.randrange(len(pending))
+            Path(CONFLICT_MARKER).touch()
+        timeout_at = rng.randrange(len(pending)) if rng.random() < _env_float("FAKE_TF_TIMEOUT_RATE", 0) else None
+        done = []
+        step = (latency * 3 / 4) / max(1, len(pending))
+        for index, address in enumerate(pending):
+            _emit("apply_start", f"{address}: Creating...", json_mode,
+                  hook={"resource": {"addr": address}, "action": "create"})
+            time.sleep(step)
+            if index in (conflict_at, timeout_at):
+                conflict = index == conflict_at
+                summary = ("A resource with the ID already exists" if conflict
+                           else "waiting for creation: context deadline exceeded")
+                detail = ("409 Conflict: provisioning state is not terminal" if conflict
+                          else "polling timed out after 30m0s")
+                _emit("apply_errored", f"{address}: Creation errored", json_mode,
+                      hook={"resource": {"addr": address}, "elapsed_seconds": step})
+                _emit("diagnostic", f"Error: {summary}", json_mode,
+                      diagnostic={"severity": "error", "summary": summary, "detail": detail, "address": address})
+                _write_state(done, variables, _outputs(variables))
+                return 1
+            _emit("apply_complete", f"{address}: Creation complete", json_mode,
+                  hook={"resource": {"addr": address}, "elapsed_seconds": step})
+            done.append(address)
+        _write_state(addresses, variables, _outputs(variables))
+        _emit("change_summary", f"Apply complete! Resources: {len(pending)} added, 0 changed, 0 destroyed.",
+              json_mode, changes={"add": len(pending), "change": 0, "remove": 0, "operation": "apply"})
+        return 0
+
+    if command == "destroy":
+        addresses = _addresses()
+        step = latency / max(1, len(addresses))
+        for address in reversed(addresses):
+            _emit("apply_start", f"{address}: Destroying...", json_mode,
+                  hook={"resource": {"addr": address}, "action": "delete"})
+            time.sleep(step)
+            _emit("apply_complete", f"{address}: Destruction complete", json_mode,
+                  hook={"resource": {"addr": address}, "elapsed_seconds": step})
+        _write_state([], variables, {})
+        _emit("change_summary", f"Destroy complete! Resources: {len(addresses)} destroyed.", json_mode,
+              changes={"add": 0, "change": 0, "remove": len(addresses), "operation": "destroy"})
+        return 0
+
+    return 0  # validate, providers mirror, version, ...
+
+
+def az(args: List[str]) -> int:
+    line = " ".join(args)
+    time.sleep(_env_float("FAKE_AZ_LATENCY", 0.3))
+    subscription = {"id": "00000000-0000-0000-0000-000000000000", "name": "Fake Subscription",
+                    "isDefault": True, "tenantId": "22222222-2222-2222-2222-222222222222"}
+    if line.startswith("account show"):
+        print(json.dumps(subscription))
+    elif line.startswith("account list"):
+        print(json.dumps([subscription]))
+    elif line.startswith(("account set", "group delete", "ad app delete", "login")):
+        pass
+    elif line.startswith("account get-access-token"):
+        print(json.dumps({"accessToken": "fake-token", "expires_on": int(time.time()) + 3600}))
+    elif _rng(line).random() < _env_float("FAKE_AZ_FAIL_RATE", 0):
+        print("ERROR: (TooManyRequests) Rate limit exceeded", file=sys.stderr)
+        return 1
+    elif line.startswith("cognitiveservices account keys list"):
+        print(json.dumps({"key1": "fake-key-1", "key2": "fake-key-2"}))
+    elif line.startswith("storage account show-connection-string"):
+        print(json.dumps({"connectionString": "DefaultEndpointsProtocol=https;AccountName=fake;AccountKey=ZmFrZQ=="}))
+    elif line.startswith("storage account keys list"):
+        print(json.dumps([{"keyName": "key1", "value": "ZmFrZQ=="}]))
+    elif line.startswith("search query-key list"):
+        print(json.dumps([{"name": "default", "key": "fake-search-key"}]))
+    else:
+        print(f"ERROR: fake az does not implement '{line}'", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    tool, tool_args = sys.argv[1], sys.argv[2:]
+    sys.exit(terraform(tool_args) if tool == "terraform" else az(tool_args))
@@ -0,0 +1,180 @@
+"""
+In-memory footprint of deployment records: plain dicts vs slotted dataclasses.
+
+Builds N realistic metadata.json payloads (params, resource names, ~15
+outputs and a deploy timeline), then loads them the way the deployment cache
+does: once as the plain ``json.loads`` dicts the runtime used to keep, and
+once as ``DeploymentState`` records. Reported per record:
+
+    traced bytes      Python allocations still held after loading all N records
+    encode time       serializing a record for metadata.json (json, and orjson if installed)
+    decode time       json.loads plus (for records) DeploymentState.from_dict
+
+Outputs and the timeline stay plain containers in both layouts, so the
+saving comes from the record, params and names objects and from field names
+and statuses no longer being stored per record.
+
+Usage:
+    python -m benchmarks.memory_benchmark --count 10000
+    python -m benchmarks.memory_benchmark --count 10000 --json memory.json
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from app.models.deployment import DeploymentState
+from app.utils.naming import build_names
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+STATUSES = ["completed", "completed", "completed", "warm", "error", "destroyed"]
+REGIONS = ["eastus", "westeurope", "swedencentral", "uksouth"]
+PHASES = [("auth", 0.4), ("copy", 0.01), ("init", 6.0), ("plan", 35.0), ("apply", 480.0), ("outputs", 0.05),
+          ("credentials_ai_keys", 1.2), ("credentials_storage", 1.1), ("cleanup", 0.02)]
+
+
+def deployment_record(index: int) -> Dict[str, Any]:
+    """Runtime record of one completed deployment as plain data (values vary per record, like real data)."""
+    base = f"lab-{index:05d}"
+    names = build_names(base)
+    region = REGIONS[index % len(REGIONS)]
+    started = 1_760_000_000 + index * 60
+    timeline, offset = [], 0.0
+    for phase, seconds in PHASES:
+        timeline.append({
+            "phase": phase, "kind": "phase", "operation": "deploy",
+            "start": time.strftime("%Y-%m-%dT%H:%M:%S.000", time.gmtime(started + offset)),
+            "end": time.strftime("%Y-%m-%dT%H:%M:%S.000", time.gmtime(started + offset + seconds)),
+            "duration": seconds, "exit_code": 0, "attempt": None,
+        })
+        offset += seconds
+    outputs = {
+        "openai_endpoint": f"https://{names['ai_services_name']}.openai.azure.com/",
+        "azure_openai_key": f"{index:032x}",
+        "openai_deployment_name": "gpt-4.1",
+        "azure_foundry_project_url": f"https://{names['ai_services_name']}.services.ai.azure.com/api/projects/{names['project_name']}",
+        "ai_services_endpoint": f"https://{names['ai_services_name']}.cognitiveservices.azure.com/",
+        "storage_account_name": names["storage_account_name"],
+        "storage_connection_string": f"DefaultEndpointsProtocol=https;AccountName={names['storage_account_name']};AccountKey={index:064x}",
+        "app_insights_connection_string": f"InstrumentationKey={index:032x};IngestionEndpoint=https://{region}.in.applicationinsights.azure.com/",
+        "app_insights_name": names["app_insights_name"],
+        "log_analytics_workspace_name": names["log_analytics_workspace_name"],
+        "resource_group_name": f"RG-{base}",
+        "service_principal_app_id": f"{index:08x}-0000-0000-0000-000000000000",
+        "service_principal_secret": f"secret~{index:040x}",
+        "tenant_id": "00000000-0000-0000-0000-000000000000",
+        "subscription_id": "11111111-1111-1111-1111-111111111111",
+    }
+    return {
+        "status": STATUSES[index % len(STATUSES)],
+        "outputs": outputs,
+        "names": names,
+        "params": {
+            "resource_group_base": base,
+            "location": region,
+            "include_search": False,
+            "enable_model_deployment": True,
+            "openai_model_name": "gpt-4.1",
+            "openai_model_version": "2025-04-14",
+            "openai_deployment_sku": "GlobalStandard",
+            "model_deployment_name": "gpt-4.1",
+            "subscription_id": "11111111-1111-1111-1111-111111111111",
+            "service_principal_name": f"sp-{base}",
+            "secret_expiration_date": "2027-01-01",
+        },
+        "batch_id": f"{index // 20:012x}",
+        "module_version": "3f9a2c1d7e4b",
+        "expires_at": "2026-12-31T18:00:00",
+        "timeline": timeline,
+    }
+
+
+def _metadata_payload(index: int) -> bytes:
+    return json.dumps({"deployment_id": f"{index:032x}", "deployment_data": deployment_record(index)}).encode()
+
+
+def _traced_bytes_per_record(payloads: List[bytes], load: Callable[[bytes], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [load(payload) for payload in payloads]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del records
+    return held / len(payloads)
+
+
+def _seconds_per_record(items: List[Any], fn: Callable[[Any], Any]) -> float:
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - started) / len(items)
+
+
+def run_benchmark(count: int) -> Dict[str, float]:
+    payloads = [_metadata_payload(index) for index in range(count)]
+
+    def load_dict(payload: bytes) -> Dict[str, Any]:
+        return json.loads(payload)["deployment_data"]
+
+    def load_record(payload: bytes) -> DeploymentState:
+        return DeploymentState.from_dict(json.loads(payload)["deployment_data"])
+
+    dict_bytes = _traced_bytes_per_record(payloads, load_dict)
+    record_bytes = _traced_bytes_per_record(payloads, load_record)
+
+    dicts = [load_dict(payload) for payload in payloads]
+    records = [load_record(payload) for payload in payloads]
+    results = {
+        "count": count,
+        "dict_bytes_per_record": round(dict_bytes),
+        "dataclass_bytes_per_record": round(record_bytes),
+        "saved_bytes_per_record": round(dict_bytes - record_bytes),
+        "saved_percent": round(100 * (dict_bytes - record_bytes) / dict_bytes, 1),
+        "saved_mb_total": round((dict_bytes - record_bytes) * count / 2 ** 20, 2),
+        "dict_decode_us": round(_seconds_per_record(payloads, load_dict) * 1e6, 2),
+        "dataclass_decode_us": round(_seconds_per_record(payloads, load_record) * 1e6, 2),
+        "dict_encode_json_us": round(_seconds_per_record(dicts, json.dumps) * 1e6, 2),
+        "dataclass_encode_json_us": round(_seconds_per_record(records, lambda r: json.dumps(r.to_dict())) * 1e6, 2),
+    }
+    if orjson is not None:
+        results["dict_encode_orjson_us"] = round(_seconds_per_record(dicts, orjson.dumps) * 1e6, 2)
+        # orjson serializes slotted dataclasses and str enums natively, no to_dict() needed
+        results["dataclass_encode_orjson_us"] = round(_seconds_per_record(records, orjson.dumps) * 1e6, 2)
+    return results
+
+
+def _print_report(results: Dict[str, float]) -> None:
+    print(f"records         {results['count']}")
+    print(f"memory          dict {results['dict_bytes_per_record']:8d} B   dataclass {results['dataclass_bytes_per_record']:8d} B   "
+          f"saved {results['saved_bytes_per_record']} B/record ({results['saved_percent']}%, "
+          f"{results['saved_mb_total']} MiB total)")
+    print(f"decode          dict {results['dict_decode_us']:8.2f} us  dataclass {results['dataclass_decode_us']:8.2f} us")
+    print(f"encode json     dict {results['dict_encode_json_us']:8.2f} us  dataclass {results['dataclass_encode_json_us']:8.2f} us")
+    if "dict_encode_orjson_us" in results:
+        print(f"encode orjson   dict {results['dict_encode_orjson_us']:8.2f} us  "
+              f"dataclass {results['dataclass_encode_orjson_us']:8.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark memory per deployment record: dicts vs slotted dataclasses")
+    parser.add_argument("--count", type=int, default=10000, help="Number of deployment records")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.count)
+    _print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Plan vs apply wall time across a batch of lab environments.
+
+Creates N isolated workspaces from the same terraform configuration (only the
+tfvars differ), plans them all in parallel into saved plan files, then applies
+the saved plans with the deployment concurrency limit, and reports both
+phases. ``--baseline`` additionally times the old single-step
+``terraform apply`` on fresh workspaces for comparison.
+
+By default a synthetic configuration of builtin ``terraform_data`` resources
+is used, so the benchmark runs offline without Azure credentials. Point
+``--terraform-dir`` at a real configuration (with a matching ``--tfvars``
+template) to measure actual deployments.
+
+Usage:
+    python -m benchmarks.plan_apply_benchmark --count 10 --resources 30
+    python -m benchmarks.plan_apply_benchmark --count 10 --baseline
+"""
+import argparse
+import asyncio
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.config import MAX_CONCURRENT_DEPLOYMENTS, TERRAFORM_MAX_PREPLANS
+from app.services.terraform_service import PLAN_FILE_NAME, run_terraform_command
+from app.utils.file_operations import copy_terraform_files
+
+SYNTHETIC_CONFIG = """
+variable "name" {
+  type = string
+}
+
+variable "resource_count" {
+  type = number
+}
+
+resource "terraform_data" "resource" {
+  count = var.resource_count
+  input = "${var.name}-${count.index}"
+}
+"""
+
+
+async def _timed(cmd: List[str], cwd: Path) -> float:
+    started = time.monotonic()
+    await run_terraform_command(cmd, cwd=cwd)
+    return time.monotonic() - started
+
+
+async def _bounded(limit: int, jobs: List) -> List[float]:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(job):
+        async with semaphore:
+            return await job
+
+    return await asyncio.gather(*(run(job) for job in jobs))
+
+
+def _create_workspaces(root: Path, terraform_dir: Path, count: int, tfvars: str, resources: int, tag: str) -> List[Path]:
+    workspaces = []
+    for index in range(1, count + 1):
+        workspace = root / f"{tag}{index:02d}"
+        workspace.mkdir(parents=True)
+        copy_terraform_files(terraform_dir, workspace)
+        (workspace / "terraform.tfvars").write_text(
+            tfvars.format(name=f"lab{index:02d}", resources=resources), encoding="utf-8"
+        )
+        workspaces.append(workspace)
+    return workspaces
+
+
+def _summary(label: str, durations: List[float], wall: float) -> str:
+    return (
+        f"{label:<18} wall {wall:7.2f}s | per env mean {statistics.mean(durations):6.2f}s "
+        f"p50 {statistics.median(durations):6.2f}s max {max(durations):6.2f}s"
+    )
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, float]:
+    root = Path(tempfile.mkdtemp(prefix="plan-apply-bench-"))
+    terraform_dir = args.terraform_dir
+    if terraform_dir is None:
+        terraform_dir = root / "config"
+        terraform_dir.mkdir()
+        (terraform_dir / "main.tf").write_text(SYNTHETIC_CONFIG, encoding="utf-8")
+    tfvars = args.tfvars.read_text(encoding="utf-8") if args.tfvars else 'name = "{name}"\nresource_count = {resources}\n'
+    init = ["terraform", "init", "-input=false"]
+    results: Dict[str, float] = {}
+    try:
+        workspaces = _create_workspaces(root, terraform_dir, args.count, tfvars, args.resources, "split")
+        await _bounded(args.parallel_plans, [_timed(init, w) for w in workspaces])
+
+        started = time.monotonic()
+        plan_times = await _bounded(args.parallel_plans, [
+            _timed(["terraform", "plan", "-input=false", f"-out={PLAN_FILE_NAME}"], w) for w in workspaces
+        ])
+        results["plan_wall"] = time.monotonic() - started
+        print(_summary(f"plan (x{args.parallel_plans})", plan_times, results["plan_wall"]))
+
+        started = time.monotonic()
+        apply_times = await _bounded(args.parallel_applies, [
+            _timed(["terraform", "apply", "-auto-approve", PLAN_FILE_NAME], w) for w in workspaces
+        ])
+        results["apply_wall"] = time.monotonic() - started
+        print(_summary(f"apply plan (x{args.parallel_applies})", apply_times, results["apply_wall"]))
+
+        if args.baseline:
+            baseline = _create_workspaces(root, terraform_dir, args.count, tfvars, args.resources, "single")
+            await _bounded(args.parallel_plans, [_timed(init, w) for w in baseline])
+            started = time.monotonic()
+            single_times = await _bounded(args.parallel_applies, [
+                _timed(["terraform", "apply", "-auto-approve"], w) for w in baseline
+            ])
+            results["single_apply_wall"] = time.monotonic() - started
+            print(_summary(f"apply (x{args.parallel_applies})", single_times, results["single_apply_wall"]))
+            print(
+                f"Apply phase with saved plans: {results['apply_wall']:.2f}s vs "
+                f"{results['single_apply_wall']:.2f}s plan+apply per slot"
+            )
+    finally:
+        if args.keep:
+            print(f"Workspaces kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark split terraform plan/apply across a batch")
+    parser.add_argument("--count", type=int, default=5, help="Number of environments")
+    parser.add_argument("--resources", type=int, default=20, help="Resources per synthetic environment")
+    parser.add_argument("--terraform-dir", type=Path, default=None, help="Real configuration to benchmark")
+    parser.add_argument("--tfvars", type=Path, default=None, help="tfvars template with {name} / {resources}")
+    parser.add_argument("--parallel-plans", type=int, default=max(1, TERRAFORM_MAX_PREPLANS))
+    parser.add_argument("--parallel-applies", type=int, default=max(1, MAX_CONCURRENT_DEPLOYMENTS))
+    parser.add_argument("--baseline", action="store_true", help="Also time single-step apply")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary workspaces")
+    asyncio.run(run_benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
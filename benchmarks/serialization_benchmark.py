@@ -0,0 +1,116 @@
+"""
+Encode/decode time of realistic metadata.json payloads per JSON serializer.
+
+Builds the metadata.json documents save_deployment_state writes for a
+freshly queued deployment (no outputs, no timeline) and for a completed one
+(~15 outputs, deploy timeline including terraform command spans), then times
+every available serializer, compact and pretty-printed. The ``before`` row
+is the previous format: stdlib ``json.dump(indent=2)`` with the outputs also
+duplicated inside ``deployment_data``. Reported per payload:
+
+    encode    serializer.dumps of the document
+    decode    serializer.loads of the encoded bytes
+    size      encoded bytes
+
+Usage:
+    python -m benchmarks.serialization_benchmark
+    python -m benchmarks.serialization_benchmark --iterations 5000 --json serialization.json
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.models.deployment import DeploymentState
+from app.services.serialization import OrjsonSerializer, Serializer, StdlibJsonSerializer, orjson
+from benchmarks.memory_benchmark import deployment_record
+
+
+def _metadata(record: DeploymentState, duplicate_outputs: bool = False) -> Dict[str, Any]:
+    """Document as written by persistence_service.save_deployment_state."""
+    data = record.to_dict()
+    if not duplicate_outputs:
+        data.pop("outputs", None)
+    return {
+        "deployment_id": "6f1c0d6e-3c1b-4f8e-9d52-0b7f6c1e2a9d",
+        "deployment_data": data,
+        "outputs": record.outputs,
+        "saved_at": "2026-10-17T09:30:00Z",
+        "has_state": True,
+        "status": record.status,
+    }
+
+
+def _payloads() -> Dict[str, DeploymentState]:
+    completed = DeploymentState.from_dict(deployment_record(7))
+    retries = [
+        {**span, "phase": f"terraform {span['phase']}", "kind": "command", "attempt": attempt}
+        for span in completed.timeline if span["phase"] in ("init", "plan", "apply")
+        for attempt in (1, 2)
+    ]
+    completed.timeline.extend(retries)
+    queued = DeploymentState.from_dict({**deployment_record(8), "status": "queued", "outputs": {}})
+    queued.timeline = None
+    return {"queued": queued, "completed": completed}
+
+
+def _time_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best
+
+
+def run_benchmark(iterations: int) -> List[Dict[str, Any]]:
+    serializers: List[Serializer] = [StdlibJsonSerializer()]
+    if orjson is not None:
+        serializers.append(OrjsonSerializer())
+
+    rows = []
+    for payload_name, record in _payloads().items():
+        document = _metadata(record)
+        old_document = json.loads(json.dumps(_metadata(record, duplicate_outputs=True)))
+        encoded_old = json.dumps(old_document, indent=2).encode()
+        rows.append({
+            "payload": payload_name, "serializer": "before", "pretty": True,
+            "encode_us": round(_time_per_call(lambda: json.dumps(old_document, indent=2), iterations) * 1e6, 2),
+            "decode_us": round(_time_per_call(lambda: json.loads(encoded_old), iterations) * 1e6, 2),
+            "bytes": len(encoded_old),
+        })
+        variants: List[Tuple[Serializer, bool]] = [(s, pretty) for s in serializers for pretty in (False, True)]
+        for serializer, pretty in variants:
+            encoded = serializer.dumps(document, pretty=pretty)
+            rows.append({
+                "payload": payload_name, "serializer": serializer.name, "pretty": pretty,
+                "encode_us": round(_time_per_call(lambda: serializer.dumps(document, pretty=pretty), iterations) * 1e6, 2),
+                "decode_us": round(_time_per_call(lambda: serializer.loads(encoded), iterations) * 1e6, 2),
+                "bytes": len(encoded),
+            })
+    return rows
+
+
+def _print_report(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'payload':<10} {'serializer':<10} {'pretty':<7} {'encode us':>10} {'decode us':>10} {'bytes':>8}")
+    for row in rows:
+        print(f"{row['payload']:<10} {row['serializer']:<10} {str(row['pretty']):<7} "
+              f"{row['encode_us']:>10.2f} {row['decode_us']:>10.2f} {row['bytes']:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON serializers on metadata.json payloads")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.iterations)
+    _print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+End-to-end deploy/destroy throughput of the web app on a fake toolchain.
+
+Installs the stand-in ``terraform`` and ``az`` executables from
+benchmarks/fake_toolchain.py, starts the fake ARM server from
+benchmarks/fake_arm_server.py for service key retrieval (``--keys-backend
+az`` uses the az fallback instead), points the app at a temporary state directory
+and drives the real FastAPI application in-process (httpx ASGI transport,
+including its lifespan): N concurrent ``POST /deploy`` requests, each
+followed by polling ``GET /status/{id}`` until it finishes, then a
+``POST /destroy/{id}`` for every completed environment. Reported:
+
+    deploys / destroys per minute   wall time from first request to last terminal status
+    event loop lag                  overshoot of a 50 ms sleep ticker (p99 / max)
+    status latency                  p50 / p99 of every /status request made while polling
+    memory per deployment           traced Python allocations still held after the deploy phase
+
+``--json`` writes the results, ``--baseline`` compares against an earlier
+results file and exits non-zero when a metric is worse than ``--tolerance``.
+Requires httpx. POSIX only (fake toolchain wrappers are shell scripts).
+
+Usage:
+    python -m benchmarks.throughput_benchmark --count 20 --latency 2
+    python -m benchmarks.throughput_benchmark --count 20 --json baseline.json
+    python -m benchmarks.throughput_benchmark --count 20 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.fake_arm_server import FakeArmServer
+from benchmarks.fake_toolchain import install
+
+DEPLOY_DONE_STATUSES = {"completed", "error"}
+DESTROY_DONE_STATUSES = {"destroyed", "destroy_error"}
+REGIONS = ["eastus", "westeurope", "swedencentral", "eastus2", "uksouth", "japaneast"]
+LAG_TICK = 0.05
+# metric -> True if higher is better
+COMPARED_METRICS = {
+    "deploys_per_min": True,
+    "destroys_per_min": True,
+    "loop_lag_p99_ms": False,
+    "status_p50_ms": False,
+    "status_p99_ms": False,
+    "memory_per_deployment_kb": False,
+}
+
+
+def _configure_environment(args: argparse.Namespace, root: Path) -> Optional[FakeArmServer]:
+    """Point the app and the fakes at the temp dir; must run before the app is imported.
+
+    Returns:
+        The started fake ARM server (None with ``--keys-backend az``)
+    """
+    bin_dir = install(root / "bin")
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ.update({
+        "DEPLOYMENT_STATES_DIR": str(root / "deployment_states"),
+        "TERRAFORM_CACHE_DIR": str(root / "terraform-cache"),
+        "AZURE_CONFIG_DIR": str(root / "azure"),
+        "TERRAFORM_RETRY_BASE_DELAY": "0.2",
+        "TERRAFORM_PREWARM_ON_STARTUP": "0",
+        "REAPER_INTERVAL": "0",
+        "WARM_POOL_SIZE": "0",
+        "MAX_CONCURRENT_DEPLOYMENTS": str(args.concurrency),
+        "MAX_DEPLOYMENTS_PER_SUBSCRIPTION": str(args.concurrency),
+        "MAX_DEPLOYMENTS_PER_REGION": "0",
+        "FAKE_TF_LATENCY": str(args.latency),
+        "FAKE_TF_INIT_LATENCY": str(args.init_latency),
+        "FAKE_TF_RESOURCES": str(args.resources),
+        "FAKE_TF_LOG_LINES": str(args.log_lines),
+        "FAKE_TF_CONFLICT_RATE": str(args.conflict_rate),
+        "FAKE_TF_TIMEOUT_RATE": str(args.timeout_rate),
+        "FAKE_AZ_LATENCY": str(args.az_latency),
+        "FAKE_AZ_FAIL_RATE": str(args.az_fail_rate),
+        "FAKE_ARM_LATENCY": str(args.arm_latency),
+        "FAKE_ARM_FAIL_RATE": str(args.az_fail_rate),
+    })
+    if args.seed is not None:
+        os.environ["FAKE_SEED"] = str(args.seed)
+    if args.keys_backend == "az":
+        os.environ["AZURE_KEYS_BACKEND"] = "az"
+        return None
+    server = FakeArmServer().start()
+    os.environ.update(server.environment())
+    return server
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _monitor_loop_lag(samples: List[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(LAG_TICK)
+        samples.append(max(0.0, loop.time() - started - LAG_TICK))
+
+
+async def _wait_for(client, deployment_id: str, done: set, interval: float, latencies: List[float]) -> str:
+    while True:
+        started = time.perf_counter()
+        response = await client.get(f"/status/{deployment_id}")
+        latencies.append(time.perf_counter() - started)
+        status = response.json().get("status")
+        if status in done:
+            return status
+        await asyncio.sleep(interval)
+
+
+async def _deploy(client, index: int, run_tag: str, args: argparse.Namespace, latencies: List[float]) -> Optional[str]:
+    response = await client.post("/deploy", data={
+        "resource_group_base": f"b{run_tag}{index:03d}",
+        "location": REGIONS[index % len(REGIONS)],
+        "openai_model_name": "gpt-4.1",
+        "service_principal_name": f"sp-bench-{index:03d}",
+        "secret_expiration_date": (date.today() + timedelta(days=30)).isoformat(),
+        **({"include_search": "on"} if args.search else {}),
+    })
+    location = response.headers.get("location", "")
+    if response.status_code != 302 or not location.startswith("/deployment/"):
+        print(f"Deploy {index} rejected: HTTP {response.status_code}")
+        return None
+    deployment_id = location.rsplit("/", 1)[1]
+    await _wait_for(client, deployment_id, DEPLOY_DONE_STATUSES, args.poll_interval, latencies)
+    return deployment_id
+
+
+async def _destroy(client, deployment_id: str, args: argparse.Namespace, latencies: List[float]) -> str:
+    response = await client.post(f"/destroy/{deployment_id}")
+    if response.status_code != 200:
+        print(f"Destroy {deployment_id} rejected: HTTP {response.status_code}")
+        return "rejected"
+    return await _wait_for(client, deployment_id, DESTROY_DONE_STATUSES, args.poll_interval, latencies)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, float]:
+    import httpx
+    from app.main import DEPLOYMENTS, app
+
+    run_tag = f"{int(time.time()) % 100000:05d}"
+    lag_samples: List[float] = []
+    status_latencies: List[float] = []
+    stop = asyncio.Event()
+    results: Dict[str, float] = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            monitor = asyncio.create_task(_monitor_loop_lag(lag_samples, stop))
+            tracemalloc.start()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+            started = time.monotonic()
+            deployed = await asyncio.gather(*(
+                _deploy(client, index, run_tag, args, status_latencies) for index in range(args.count)
+            ))
+            deploy_wall = time.monotonic() - started
+            memory_after = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            statuses = [DEPLOYMENTS[d]["status"] for d in deployed if d]
+            completed = [d for d in deployed if d and DEPLOYMENTS[d]["status"] == "completed"]
+            print(f"deploy   {len(completed)}/{args.count} completed in {deploy_wall:7.2f}s "
+                  f"({statuses.count('error')} errors)")
+
+            destroy_wall, destroyed = 0.0, []
+            if completed and not args.skip_destroy:
+                started = time.monotonic()
+                destroy_statuses = await asyncio.gather(*(
+                    _destroy(client, d, args, status_latencies) for d in completed
+                ))
+                destroy_wall = time.monotonic() - started
+                destroyed = [s for s in destroy_statuses if s == "destroyed"]
+                print(f"destroy  {len(destroyed)}/{len(completed)} destroyed in {destroy_wall:7.2f}s")
+
+            stop.set()
+            await monitor
+
+    results.update({
+        "count": args.count,
+        "deploys_completed": len(completed),
+        "deploy_errors": args.count - len(completed),
+        "deploys_per_min": round(len(completed) / deploy_wall * 60, 2) if deploy_wall else 0.0,
+        "destroys_per_min": round(len(destroyed) / destroy_wall * 60, 2) if destroy_wall else None,
+        "loop_lag_p99_ms": round(_percentile(lag_samples, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lag_samples, default=0.0) * 1000, 2),
+        "status_requests": len(status_latencies),
+        "status_p50_ms": round(_percentile(status_latencies, 50) * 1000, 2),
+        "status_p99_ms": round(_percentile(status_latencies, 99) * 1000, 2),
+        "memory_per_deployment_kb": round((memory_after - memory_before) / max(1, args.count) / 1024, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+    return results
+
+
+def _print_report(results: Dict[str, float], offload: Dict[str, Dict[str, float]]) -> None:
+    print(f"throughput      {results['deploys_per_min']:8.2f} deploys/min  {results['destroys_per_min'] or 0:8.2f} destroys/min")
+    print(f"event loop lag  p99 {results['loop_lag_p99_ms']:7.2f} ms   max {results['loop_lag_max_ms']:7.2f} ms")
+    print(f"/status         p50 {results['status_p50_ms']:7.2f} ms   p99 {results['status_p99_ms']:7.2f} ms "
+          f"({results['status_requests']} requests)")
+    print(f"memory          {results['memory_per_deployment_kb']:8.1f} KiB traced per deployment, "
+          f"peak RSS {results['peak_rss_mb']:.1f} MiB")
+    busiest = sorted(offload.items(), key=lambda item: item[1].get("total_seconds", 0), reverse=True)[:5]
+    for label, entry in busiest:
+        print(f"offloaded       {label:<22} " + " ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                                                      for k, v in entry.items()))
+
+
+def compare_to_baseline(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Metrics that are worse than the baseline by more than tolerance (a fraction)."""
+    regressions = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline.get(metric), results.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end deploy/destroy throughput on a fake toolchain")
+    parser.add_argument("--count", type=int, default=10, help="Number of concurrent deployments")
+    parser.add_argument("--concurrency", type=int, default=4, help="MAX_CONCURRENT_DEPLOYMENTS for the run")
+    parser.add_argument("--latency", type=float, default=2.0, help="Fake terraform seconds per plan/apply/destroy")
+    parser.add_argument("--init-latency", type=float, default=0.5, help="Fake terraform init seconds")
+    parser.add_argument("--az-latency", type=float, default=0.3, help="Fake az seconds per call")
+    parser.add_argument("--resources", type=int, default=25, help="Resources per fake environment")
+    parser.add_argument("--log-lines", type=int, default=0, help="Extra log lines per terraform command")
+    parser.add_argument("--conflict-rate", type=float, default=0.0, help="Probability of a retryable 409 per apply")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Probability of a fatal timeout per apply")
+    parser.add_argument("--az-fail-rate", type=float, default=0.0, help="Probability an az/ARM key call fails")
+    parser.add_argument("--keys-backend", choices=["arm", "az"], default="arm",
+                        help="Fetch service keys from the fake ARM server or through fake az")
+    parser.add_argument("--arm-latency", type=float, default=0.05, help="Fake ARM seconds per request")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for failure injection")
+    parser.add_argument("--search", action="store_true", help="Include the search service")
+    parser.add_argument("--poll-interval", type=float, default=0.25, help="Seconds between /status polls")
+    parser.add_argument("--skip-destroy", action="store_true", help="Only measure deploys")
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary state directory")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="throughput-bench-"))
+    arm_server = _configure_environment(args, root)
+    try:
+        results = asyncio.run(run_benchmark(args))
+        from app.services.executor_service import get_offload_stats
+        _print_report(results, get_offload_stats())
+        if arm_server:
+            print(f"fake ARM        {dict(arm_server.requests)}")
+    finally:
+        if arm_server:
+            arm_server.stop()
+        if args.keep:
+            print(f"State kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare_to_baseline(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
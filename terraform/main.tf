@@ -24,6 +24,7 @@ data "azurerm_search_service" "search_keys" {
 resource "azurerm_resource_group" "rg" {
   name     = var.rg_name
   location = var.location
+  tags     = var.tags
 }
 
 ###############################################
@@ -39,6 +39,12 @@ variable "log_analytics_workspace_name" {
   type = string
 }
 
+variable "tags" {
+  type        = map(string)
+  description = "Tags for the resource group (warm pool membership / claimed owner)."
+  default     = {}
+}
+
 variable "subscription_id" {
   type        = string
   description = "(Opcional) Forzar la suscripción usada por el provider azurerm; si vacío se intenta resolución via CLI Azure contexto." 